@@ -0,0 +1,84 @@
+import random
+from typing import Callable
+
+# Generators of formula families, as strings accepted by `Parser`. Every compound formula is bracketed, so the strings
+# do not depend on operator precedence.
+
+
+def random_k_cnf(variables: int, clauses: int | None = None, k=3, seed=0) -> str:
+    """ Return a random k-CNF over `variables` variables, each clause of `k` distinct variables, each negated with
+    probability 1/2. `clauses` - number of clauses (default: about 4.26 per variable, the hardest ratio for 3-CNF). """
+    rng = random.Random(seed)
+    if clauses is None:
+        clauses = round(4.26 * variables)
+
+    groups = []
+    for _ in range(clauses):
+        literals = [('!' if rng.random() < 0.5 else '') + f"x{i}" for i in rng.sample(range(variables), k)]
+        groups.append('[' + ', '.join(literals) + ']')
+
+    return '<' + ', '.join(groups) + '>'
+
+
+def pigeonhole(holes: int) -> str:
+    """ Return the (unsatisfiable) CNF stating that `holes + 1` pigeons sit in `holes` holes, no two sharing a hole,
+    where `p<i>h<j>` means pigeon `i` sits in hole `j`. """
+    groups = []
+
+    # Each pigeon sits in some hole
+    for i in range(holes + 1):
+        groups.append('[' + ', '.join(f"p{i}h{j}" for j in range(holes)) + ']')
+
+    # No two pigeons share a hole
+    for j in range(holes):
+        for i in range(holes + 1):
+            for other in range(i + 1, holes + 1):
+                groups.append(f"[!p{i}h{j}, !p{other}h{j}]")
+
+    return '<' + ', '.join(groups) + '>'
+
+
+def parity_chain(variables: int) -> str:
+    """ Return the exclusive-or of `variables` variables, as a left-nested chain. """
+    string = 'x0'
+    for i in range(1, variables):
+        string = f"({string} (+) x{i})"
+
+    return string
+
+
+def nested_equalities(depth: int) -> str:
+    """ Return a right-nested chain of `depth` equalities over distinct variables, every other one negated. """
+    string = f"x{depth}"
+    for i in range(depth - 1, -1, -1):
+        string = f"(x{i} = {'!' if i % 2 else ''}{string})"
+
+    return string
+
+
+def left_chain(length: int, variables=8) -> str:
+    """ Return a left-nested chain of `length` binary operators (cycling through and, or and implies), over `variables`
+    variables, so depth grows without the number of variables. """
+    operators = ('.', '+', '->')
+    string = 'x0'
+    for i in range(1, length + 1):
+        string = f"({string} {operators[i % len(operators)]} x{i % variables})"
+
+    return string
+
+
+def distinct_chain(length: int) -> str:
+    """ Return a left-nested chain of `length` binary operators (see `left_chain`) over `length + 1` distinct variables,
+    so the number of variables grows with the depth. """
+    return left_chain(length, length + 1)
+
+
+# Map of formula families; name => (generator taking a size, sizes to run, in increasing order)
+families: dict[str, tuple[Callable[[int], str], list[int]]] = {
+    'random_3cnf': (random_k_cnf, [8, 12, 16, 50]),
+    'pigeonhole': (pigeonhole, [2, 3, 5, 8]),
+    'parity_chain': (parity_chain, [4, 8, 12, 200]),
+    'nested_equalities': (nested_equalities, [4, 8, 12, 200]),
+    'left_chain': (left_chain, [10, 100, 1000, 10000]),
+    'distinct_chain': (distinct_chain, [10, 100, 1000, 10000]),
+}
@@ -0,0 +1,222 @@
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from benchmarks.generators import families
+from logic.algorithm import rank
+from logic.formula import Formula
+from logic.normal_form import NormalForm
+from logic.parser import Parser
+from logic.truth_table import TruthTable
+
+
+class BenchmarkRunner:
+    # Map of operations on parsed formulae; name => (function, maximum number of variables to run it on, or None)
+    operations: dict[str, tuple[Callable[[Formula], Any], int | None]] = {
+        'variables': (lambda formula: formula.get_variables(), None),
+        'simplify': (lambda formula: formula.simplify(), None),
+        'rank': (rank, None),
+        'cnf': (NormalForm.conjunctive_normal_form, 12),
+        'dnf': (NormalForm.disjunctive_normal_form, 12),
+        'truth_table': (lambda formula: TruthTable(formula).generate(), 16),
+    }
+
+    # Metrics compared against a baseline, which regress when they grow by more than the threshold; metric => smallest
+    # value compared, as smaller values are too noisy
+    compared_metrics: dict[str, float] = {
+        'time': 0.001,
+        'peak_memory': 1024,
+    }
+
+    def __init__(self, repeat=3, quick=False, family_names: list[str] | None = None,
+                 operation_names: list[str] | None = None):
+        """ Run each operation on each size of each formula family (see `benchmarks.generators.families`), as well as
+        parsing the family's string. Each operation is timed over `repeat` runs on freshly parsed formulae (so no
+        results are cached), taking the fastest, then run once more while tracing memory.
+        `quick` - if True, only run the smallest size of each family. """
+        self.repeat = repeat
+        self.quick = quick
+        self.family_names = list(families) if family_names is None else family_names
+        self.operation_names = list(BenchmarkRunner.operations) if operation_names is None else operation_names
+        self.parser = Parser()
+
+    @staticmethod
+    def get_depth(formula: Formula) -> int:
+        """ Return the number of nodes on the longest path from the formula to a leaf. """
+        return formula.reduce(lambda node, depths: 1 + max(depths, default=0))
+
+    @staticmethod
+    def count_nodes(result: Any) -> int | None:
+        """ Return the number of distinct sub-formulae of a formula, or None if not a formula. """
+        return len(result.post_order()) if isinstance(result, Formula) else None
+
+    def parse(self, string: str) -> Formula:
+        ok, formula = self.parser.parse(string)
+        if not ok:
+            raise ValueError(str(formula))
+
+        return formula
+
+    def measure(self, string: str, function: Callable[[Formula], Any] | None) -> dict[str, Any]:
+        """ Measure the given function on the formula parsed from the string, or parsing itself if None. Return the
+        fastest wall time (seconds), the peak memory traced (bytes), and the number of nodes of the result, or the
+        error raised. """
+        # Operations are given a freshly parsed formula each run, parsed outside of the measurement
+        prepare = (lambda: string) if function is None else (lambda: self.parse(string))
+        if function is None:
+            function = self.parse
+
+        try:
+            times = []
+            result_nodes = None
+            for _ in range(self.repeat + 1):
+                # Formulae are interned (see `FormulaMeta`), so the previous run's nodes must be released, otherwise
+                # they are reused along with their cached results
+                gc.collect()
+                argument = prepare()
+
+                # The last run traces memory
+                if len(times) == self.repeat:
+                    tracemalloc.start()
+                    try:
+                        function(argument)
+                        _, peak = tracemalloc.get_traced_memory()
+                    finally:
+                        tracemalloc.stop()
+
+                    break
+
+                start = time.perf_counter()
+                result = function(argument)
+                times.append(time.perf_counter() - start)
+
+                result_nodes = BenchmarkRunner.count_nodes(result)
+                del argument, result
+        except Exception as error:
+            return {'error': f"{error.__class__.__name__}: {error}"[:200]}
+
+        return {'time': min(times), 'peak_memory': peak, 'result_nodes': result_nodes}
+
+    def run(self, log: Callable[[str], None] | None = print) -> dict[str, Any]:
+        """ Run the benchmarks, returning the results, keyed `<family>/<size>/<operation>`, along with details of the
+        environment. `log` - called with a line per result. """
+        results = {}
+
+        for family in self.family_names:
+            generator, sizes = families[family]
+
+            for size in sizes[:1] if self.quick else sizes:
+                string = generator(size)
+                formula = self.parse(string)
+                variables = len(formula.get_variables())
+                depth = BenchmarkRunner.get_depth(formula)
+                nodes = BenchmarkRunner.count_nodes(formula)
+                del formula
+
+                measured = [('parse', None)] + [(name, BenchmarkRunner.operations[name]) for name in self.operation_names]
+                for name, operation in measured:
+                    key = f"{family}/{size}/{name}"
+
+                    if operation is not None and operation[1] is not None and variables > operation[1]:
+                        continue
+
+                    result = {'variables': variables, 'depth': depth, 'nodes': nodes,
+                              **self.measure(string, None if operation is None else operation[0])}
+                    results[key] = result
+
+                    if log is not None:
+                        log(BenchmarkRunner.format_result(key, result))
+
+        return {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+
+    @staticmethod
+    def format_result(key: str, result: dict[str, Any]) -> str:
+        if 'error' in result:
+            return f"{key}: {result['error']}"
+
+        line = f"{key}: {result['time'] * 1000:.3f} ms, {result['peak_memory'] / 1024:.1f} KiB, {result['nodes']} nodes"
+        if result['result_nodes'] is not None:
+            line += f" -> {result['result_nodes']} nodes"
+
+        return line
+
+    @staticmethod
+    def compare(results: dict[str, Any], baseline: dict[str, Any], threshold=1.25) -> list[str]:
+        """ Compare results against a baseline, returning a line per regression: a metric which grew by more than the
+        threshold (as a ratio, see `compared_metrics`), a change in the number of result nodes, or a new error. """
+        regressions = []
+
+        for key, result in results['results'].items():
+            if key not in baseline['results']:
+                continue
+
+            old = baseline['results'][key]
+            if 'error' in result:
+                if 'error' not in old:
+                    regressions.append(f"{key}: {result['error']}")
+
+                continue
+
+            if 'error' in old:
+                continue
+
+            for metric, minimum in BenchmarkRunner.compared_metrics.items():
+                if result[metric] >= minimum and result[metric] > old[metric] * threshold:
+                    regressions.append(f"{key}: {metric} {old[metric]:.6g} -> {result[metric]:.6g} "
+                                       f"({result[metric] / old[metric]:.2f}x)")
+
+            if result['result_nodes'] != old['result_nodes']:
+                regressions.append(f"{key}: result nodes {old['result_nodes']} -> {result['result_nodes']}")
+
+        return regressions
+
+
+def main(arguments: list[str] | None = None) -> int:
+    """ Run the benchmarks from the command line. Return 1 if there were regressions against the baseline. """
+    parser = argparse.ArgumentParser(description="Benchmark operations on families of formulae.")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--baseline', help="compare the results against this JSON file, written by --output")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="ratio over the baseline reported as a regression (default: 1.25)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs timed per operation (default: 3)")
+    parser.add_argument('--quick', action='store_true', help="only run the smallest size of each family")
+    parser.add_argument('--families', help=f"comma-separated families (default: {','.join(families)})")
+    parser.add_argument('--operations', help=f"comma-separated operations (default: "
+                                             f"{','.join(BenchmarkRunner.operations)})")
+    options = parser.parse_args(arguments)
+
+    runner = BenchmarkRunner(options.repeat, options.quick,
+                             None if options.families is None else options.families.split(','),
+                             None if options.operations is None else options.operations.split(','))
+    results = runner.run()
+
+    if options.output is not None:
+        with open(options.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if options.baseline is not None:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+
+        regressions = BenchmarkRunner.compare(results, baseline, options.threshold)
+        print()
+        print(f"{len(regressions)} regression(s) against {options.baseline}")
+        for line in regressions:
+            print(line)
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,9 @@
 from logic.algorithm import rank
 from logic.formula import Formula
+from logic.operators import Negation
 from logic.parser import Parser
 from logic.normal_form import NormalForm
+from logic.sat import Solver, equivalent, entails
 from logic.truth_table import TruthTable
 
 
@@ -16,6 +18,9 @@ class CLI:
     OPTION_RANK = "8"
     OPTION_NORMAL_FORM = "9"
     OPTION_SUBSTITUTE = "10"
+    OPTION_SATISFIABILITY = "11"
+    OPTION_LOAD_FILE = "12"
+    OPTION_COMPARE = "13"
     OPTION_QUIT = "q"
 
     def __init__(self):
@@ -48,6 +53,12 @@ class CLI:
                 self.to_normal_form()
             elif option == CLI.OPTION_SUBSTITUTE:
                 self.substitute_saved_formulae()
+            elif option == CLI.OPTION_SATISFIABILITY:
+                self.check_satisfiability()
+            elif option == CLI.OPTION_LOAD_FILE:
+                self.load_file()
+            elif option == CLI.OPTION_COMPARE:
+                self.compare_formulae()
             elif option == CLI.OPTION_QUIT:
                 break
             else:
@@ -69,6 +80,9 @@ class CLI:
         print(f"{CLI.OPTION_RANK} - Calculate proposition's rank.")
         print(f"{CLI.OPTION_NORMAL_FORM} - Convert to normal form.")
         print(f"{CLI.OPTION_SUBSTITUTE} - Substitute saved propositions.")
+        print(f"{CLI.OPTION_SATISFIABILITY} - Check satisfiability and validity.")
+        print(f"{CLI.OPTION_LOAD_FILE} - Load propositions from a file.")
+        print(f"{CLI.OPTION_COMPARE} - Check equivalence and entailment of two propositions.")
         print(f"{CLI.OPTION_QUIT} - Quit.")
 
     def print_saved(self):
@@ -133,7 +147,17 @@ class CLI:
         symbol = input("Enter symbol of proposition to evaluate: ")
 
         if symbol in self.saved_propositions:
-            result = self.saved_propositions[symbol].eval({})
+            function = self.saved_propositions[symbol].compile()
+
+            values = []
+            for variable in function.variables:
+                value = input(f"Provide truth value of '{variable}' [T/F]: ")
+                while value not in ('T', 'F'):
+                    value = input('Invalid response. Please enter [T/F]: ')
+
+                values.append(value == 'T')
+
+            result = function(*values)
             print(f"{symbol} = {result}")
         else:
             print("Symbol not bound in memory.")
@@ -156,7 +180,6 @@ class CLI:
 
             table = TruthTable(self.saved_propositions[symbol])
             table.set_bindings(bindings)
-            table.generate()
             table.print()
         else:
             print("Symbol not bound in memory.")
@@ -190,7 +213,7 @@ class CLI:
         print(f"rank({symbol}) = {rank(formula)}")
 
     def to_normal_form(self):
-        form = input("Convert to CNF or DNF? [cnf/dnf/both] ").lower()
+        form = input("Convert to CNF or DNF? [cnf/dnf/both/tseitin] ").lower()
         symbol = input("Enter proposition to fetch from memory: ")
 
         if symbol not in self.saved_propositions:
@@ -204,6 +227,14 @@ class CLI:
             print(f"CNF: {NormalForm.conjunctive_normal_form(original)}")
             print(f"DNF: {NormalForm.disjunctive_normal_form(original)}")
             return
+        elif form == "tseitin":
+            # Equisatisfiable only, so do not offer to overwrite
+            converted, definitions = NormalForm.tseitin_conjunctive_normal_form(original)
+            print(f"Original: {original}")
+            print(f"CNF: {converted}")
+            for auxiliary, formula in definitions.items():
+                print(f"  {auxiliary}: {formula}")
+            return
         elif form == "cnf":
             converted = NormalForm.conjunctive_normal_form(original)
         elif form == "dnf":
@@ -244,6 +275,101 @@ class CLI:
             self.saved_propositions[symbol_base] = new_proposition
             print("Ok.")
 
+    def check_satisfiability(self):
+        symbol = input("Enter proposition to fetch from memory: ")
+
+        if symbol not in self.saved_propositions:
+            print("Symbol not bound in memory.")
+            return
+
+        formula = self.saved_propositions[symbol]
+        print(f"{symbol}: {formula}")
+
+        solver = Solver()
+        solver.add_formula(formula)
+        if solver.solve():
+            print(f"Satisfiable, e.g., {solver.get_model()}")
+        else:
+            print("Unsatisfiable.")
+
+        # Counter-models are models of the negation
+        solver = Solver()
+        solver.add_formula(Negation(formula))
+        if solver.solve():
+            print(f"Not valid, e.g., false under {solver.get_model()}")
+        else:
+            print("Valid (tautology).")
+
+    def compare_formulae(self):
+        symbol_a = input("Enter symbol of first proposition: ")
+        if symbol_a not in self.saved_propositions:
+            print("Symbol not bound in memory.")
+            return
+
+        symbol_b = input("Enter symbol of second proposition: ")
+        if symbol_b not in self.saved_propositions:
+            print("Symbol not bound in memory.")
+            return
+
+        a, b = self.saved_propositions[symbol_a], self.saved_propositions[symbol_b]
+        print(f"{symbol_a}: {a}")
+        print(f"{symbol_b}: {b}")
+
+        is_equivalent, counterexample = equivalent(a, b)
+        if is_equivalent:
+            print(f"{symbol_a} and {symbol_b} are equivalent.")
+            return
+
+        print(f"Not equivalent, e.g., under {counterexample}, {symbol_a} = {a.eval(counterexample)} and "
+              f"{symbol_b} = {b.eval(counterexample)}")
+
+        # Each direction of entailment
+        for premise, conclusion in ((symbol_a, symbol_b), (symbol_b, symbol_a)):
+            holds, counterexample = entails(self.saved_propositions[premise], self.saved_propositions[conclusion])
+            if holds:
+                print(f"{premise} entails {conclusion}.")
+            else:
+                print(f"{premise} does not entail {conclusion}, e.g., under {counterexample}")
+
+    def load_file(self, path: str | None = None, prefix: str | None = None):
+        """ Load propositions from a file, one per line, saving each against the prefix followed by its line number. """
+        if path is None:
+            path = input("Enter path of file: ")
+
+        if prefix is None:
+            prefix = input("Enter symbol prefix [P]: ") or 'P'
+
+        try:
+            results = list(Parser.parse_file(path))
+        except (OSError, UnicodeDecodeError) as error:
+            print(f"Unable to read file: {error}")
+            return
+
+        loaded = {}
+        errors = []
+        for line, ok, result in results:
+            if ok:
+                loaded[f"{prefix}{line}"] = result
+            else:
+                errors.append(result)
+
+        # Confirm if overwrite
+        existing = sum(symbol in self.saved_propositions for symbol in loaded)
+        if existing:
+            if input(f"{existing} proposition(s) are already stored against these symbols. Overwrite? [y/n] ") != 'y':
+                return
+
+        self.saved_propositions.update(loaded)
+        print(f"Loaded {len(loaded)} proposition(s), {prefix}<line>.")
+
+        if errors:
+            print(f"{len(errors)} line(s) could not be parsed:")
+            for error in errors[:10]:
+                print(f"Line {error.line}: {error}")
+
+            if len(errors) > 10:
+                print("...")
+
 
 if __name__ == "__main__":
     app = CLI()
@@ -1,51 +1,76 @@
 from logic.formula import Formula
-from logic.generalised_operators import GeneralisedOperator
+from logic.generalised_operators import GeneralisedOperator, GeneralisedConjunction, GeneralisedDisjunction
 from logic.literals import Symbol, Top, Bottom
 from logic.operators import Negation, AndOperator, OrOperator, ImpliesOperator, ReverseImpliesOperator, NandOperator, \
     NorOperator, NotImpliesOperator, ReverseNotImpliesOperator, NonEqualityOperator, EqualityOperator
 
+# Kinds of formula, see `classify`
+LITERAL_FORMULA = 0
+ALPHA_FORMULA = 1
+BETA_FORMULA = 2
 
-def rank(formula: Formula) -> int:
-    """ Determine a formula's rank. """
+
+def rank(formula: Formula, ranks: dict[Formula, int] | None = None) -> int:
+    """ Determine a formula's rank. Ranks are computed on an explicit stack, so the depth of a formula is bounded only
+    by memory. `ranks` - if given, ranks already known, which is updated with those computed. """
+    if ranks is None:
+        ranks = {}
+
+    stack = [formula]
+    while stack:
+        current = stack[-1]
+        if current in ranks:
+            stack.pop()
+            continue
+
+        value, parts = get_rank_parts(current)
+        pending = [part for part in parts if part not in ranks]
+        if pending:
+            stack.extend(pending)
+            continue
+
+        stack.pop()
+        ranks[current] = value + sum(ranks[part] for part in parts)
+
+    return ranks[formula]
+
+
+def get_rank_parts(formula: Formula) -> tuple[int, list[Formula]]:
+    """ Return (n, parts) such that the formula's rank is n plus the sum of the ranks of the parts. """
     # r([x1, x2, ...]) = SUM r(r_i)
     if isinstance(formula, GeneralisedOperator):
-        return sum(map(rank, formula))
+        return 0, list(formula)
 
     # r(x) = rank(neg x) = 0
     if isinstance(formula, Symbol) or (isinstance(formula, Negation) and isinstance(formula.data, Symbol)):
-        return 0
+        return 0, []
 
     # r(top) = rank(bottom) = 0
     if isinstance(formula, Top) or isinstance(formula, Bottom):
-        return 0
+        return 0, []
 
     # r(neg top) = r(neg bottom) = 1
     if isinstance(formula, Negation) and (isinstance(formula.data, Top) or isinstance(formula.data, Bottom)):
-        return 1
+        return 1, []
 
     # r(neg neg X) = r(X)
     if isinstance(formula, Negation) and isinstance(formula.data, Negation):
-        return 1 + rank(formula.data.data)
+        return 1, [formula.data.data]
 
     # decompose if necessary
-    if isinstance(formula, GeneralisedOperator):
-        return rank(formula.decompose(True))
-
     if isinstance(formula, Negation) and isinstance(formula.data, GeneralisedOperator):
-        return rank(Negation(formula.data.decompose(True)))
+        return 0, [Negation(formula.data.decompose(True))]
 
     # Alpha/Beta formula
     a1, a2 = extract_alpha_formula(formula)
     if a1 is not None:
-        return 1 + rank(a1) + rank(a2)
+        return 1, [a1, a2]
 
     b1, b2 = extract_beta_formula(formula)
     if b1 is not None:
-        return 1 + rank(b1) + rank(b2)
+        return 1, [b1, b2]
 
-    print(formula)
-
-    raise ValueError
+    raise ValueError(f"cannot rank formula: {formula}")
 
 
 def extract_alpha_formula(formula: Formula) -> tuple[Formula | None, Formula | None]:
@@ -142,3 +167,53 @@ def extract_beta_formula(formula: Formula) -> tuple[Formula | None, Formula | No
     return None, None
 
 
+def classify(formula: Formula) -> tuple[int, list[Formula] | tuple[str, bool] | None]:
+    """ Classify a formula as a literal, returning (LITERAL_FORMULA, (symbol, value)) or (LITERAL_FORMULA, None) if it
+    is always true, or as an alpha or beta formula (ALPHA_FORMULA or BETA_FORMULA), returning its components.
+    Generalised operators are treated as n-ary alpha or beta formulae. """
+    if isinstance(formula, Symbol):
+        return LITERAL_FORMULA, (formula.symbol, True)
+
+    if isinstance(formula, Top):
+        return LITERAL_FORMULA, None
+
+    # Bottom is a beta formula with no components, i.e., is always false
+    if isinstance(formula, Bottom):
+        return BETA_FORMULA, []
+
+    if isinstance(formula, Negation):
+        data = formula.data
+
+        if isinstance(data, Symbol):
+            return LITERAL_FORMULA, (data.symbol, False)
+
+        if isinstance(data, Top):
+            return BETA_FORMULA, []
+
+        if isinstance(data, Bottom):
+            return LITERAL_FORMULA, None
+
+        if isinstance(data, Negation):
+            return ALPHA_FORMULA, [data.data]
+
+        if isinstance(data, GeneralisedConjunction):
+            return BETA_FORMULA, [Negation(part) for part in data]
+
+        if isinstance(data, GeneralisedDisjunction):
+            return ALPHA_FORMULA, [Negation(part) for part in data]
+
+    if isinstance(formula, GeneralisedConjunction):
+        return ALPHA_FORMULA, list(formula)
+
+    if isinstance(formula, GeneralisedDisjunction):
+        return BETA_FORMULA, list(formula)
+
+    a1, a2 = extract_alpha_formula(formula)
+    if a1 is not None:
+        return ALPHA_FORMULA, [a1, a2]
+
+    b1, b2 = extract_beta_formula(formula)
+    if b1 is not None:
+        return BETA_FORMULA, [b1, b2]
+
+    raise ValueError(f"cannot expand formula: {formula}")
@@ -0,0 +1,469 @@
+from __future__ import annotations
+
+from logic.formula import Formula
+from logic.generalised_operators import GeneralisedOperator
+from logic.literals import Symbol, Top, Bottom, Literal
+from logic.operators import Negation, BinaryOperator, AndOperator, OrOperator, ImpliesOperator
+
+# Terminal nodes
+FALSE = 0
+TRUE = 1
+
+
+class BDD:
+    """ Manager of reduced ordered binary decision diagrams. Nodes are integers indexing parallel arrays; every node
+    is unique per (variable, low, high) in the variable's unique table. Nodes are reference counted (by parent nodes and
+    `Function` handles) and garbage collected in bulk, as the manager grows. Variables may be reordered by sifting, which
+    rewrites nodes in place so existing handles stay valid. """
+
+    cache_size = 1 << 16  # Number of slots in the operation cache (a power of two)
+    gc_threshold = 1 << 14  # Number of nodes above which garbage is collected
+    max_growth = 1.2  # Sifting stops moving a variable in one direction once the size grows by this factor
+
+    def __init__(self, variables: list[str] | None = None):
+        self.variables: list[str] = []  # Variable => name
+        self.indices: dict[str, int] = {}  # Name => variable
+        self.levels: list[int] = []  # Variable => level in the order
+        self.order: list[int] = []  # Level => variable
+
+        # Nodes: variable, low (variable false) and high (variable true) children, reference count
+        self.node_var: list[int] = [-1, -1]
+        self.node_low: list[int] = [FALSE, TRUE]
+        self.node_high: list[int] = [FALSE, TRUE]
+        self.node_refs: list[int] = [1, 1]
+        self.free: list[int] = []  # Nodes available for reuse
+        self.unique: list[dict[tuple[int, int], int]] = []  # Variable => (low, high) => node
+        self.size = 0  # Number of internal nodes in the unique tables
+
+        # Operation cache, direct-mapped: a colliding entry evicts the previous one
+        self.cache: list[tuple[tuple, int] | None] = [None] * BDD.cache_size
+        self.threshold = BDD.gc_threshold
+
+        # Statistics
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.collections = 0
+
+        for variable in [] if variables is None else variables:
+            self.add_variable(variable)
+
+    def add_variable(self, name: str) -> int:
+        """ Get the variable of the given name, adding it at the bottom of the order if needed. """
+        if name in self.indices:
+            return self.indices[name]
+
+        variable = len(self.variables)
+        self.variables.append(name)
+        self.indices[name] = variable
+        self.levels.append(len(self.order))
+        self.order.append(variable)
+        self.unique.append({})
+        return variable
+
+    def level(self, node: int) -> int:
+        """ Get the level of a node's variable; terminals are below every variable. """
+        return len(self.order) if node <= TRUE else self.levels[self.node_var[node]]
+
+    def make_node(self, variable: int, low: int, high: int) -> int:
+        """ Return the unique node for (variable, low, high), creating it if needed. """
+        if low == high:
+            return low
+
+        table = self.unique[variable]
+        key = (low, high)
+        if key in table:
+            return table[key]
+
+        if self.free:
+            node = self.free.pop()
+            self.node_var[node], self.node_low[node], self.node_high[node] = variable, low, high
+            self.node_refs[node] = 0
+        else:
+            node = len(self.node_var)
+            self.node_var.append(variable)
+            self.node_low.append(low)
+            self.node_high.append(high)
+            self.node_refs.append(0)
+
+        self.node_refs[low] += 1
+        self.node_refs[high] += 1
+        table[key] = node
+        self.size += 1
+        return node
+
+    def ref(self, node: int):
+        self.node_refs[node] += 1
+
+    def deref(self, node: int):
+        self.node_refs[node] -= 1
+
+    def free_node(self, node: int):
+        """ Free a dead node, and any of its descendants which die as a result. """
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            del self.unique[self.node_var[node]][(self.node_low[node], self.node_high[node])]
+            self.free.append(node)
+            self.size -= 1
+
+            for child in (self.node_low[node], self.node_high[node]):
+                self.node_refs[child] -= 1
+                if child > TRUE and self.node_refs[child] == 0:
+                    pending.append(child)
+
+    def collect_garbage(self):
+        """ Free all nodes without references. Clears the operation cache, whose entries may name freed nodes. """
+        for table in self.unique:
+            for node in [node for node in table.values() if self.node_refs[node] == 0]:
+                # May have been freed as a descendant of a previous node
+                if self.node_refs[node] == 0 and table.get((self.node_low[node], self.node_high[node])) == node:
+                    self.free_node(node)
+
+        self.cache = [None] * BDD.cache_size
+        self.collections += 1
+
+    def maybe_collect_garbage(self):
+        """ Collect garbage if the manager has grown past its threshold, raising the threshold if little was freed. """
+        if self.size > self.threshold:
+            self.collect_garbage()
+
+            if self.size > self.threshold * 3 // 4:
+                self.threshold *= 2
+
+    def ite(self, f: int, g: int, h: int) -> int:
+        """ If-then-else: return the node of (f AND g) OR (NOT f AND h). Calls on cofactors are made on an explicit
+        stack, as they nest once per level of the order. """
+        results: list[int] = []  # Nodes of the calls made, in order
+
+        # Calls to make, (f, g, h, None), or nodes to make from the last two results, (f, g, h, variable)
+        stack: list[tuple[int, int, int, int | None]] = [(f, g, h, None)]
+
+        while stack:
+            f, g, h, variable = stack.pop()
+            key = (f, g, h)
+
+            if variable is not None:
+                high = results.pop()
+                node = self.make_node(variable, results.pop(), high)
+                self.cache[hash(key) & (BDD.cache_size - 1)] = (key, node)
+                results.append(node)
+                continue
+
+            # Terminal cases
+            if f == TRUE or g == h:
+                results.append(g)
+                continue
+
+            if f == FALSE:
+                results.append(h)
+                continue
+
+            if g == TRUE and h == FALSE:
+                results.append(f)
+                continue
+
+            entry = self.cache[hash(key) & (BDD.cache_size - 1)]
+            if entry is not None and entry[0] == key:
+                self.cache_hits += 1
+                results.append(entry[1])
+                continue
+
+            self.cache_misses += 1
+
+            # Shannon expansion on the top variable: the low cofactors' call is made first
+            top = min(self.level(f), self.level(g), self.level(h))
+            f0, f1 = self.cofactors(f, top)
+            g0, g1 = self.cofactors(g, top)
+            h0, h1 = self.cofactors(h, top)
+            stack += (f, g, h, self.order[top]), (f1, g1, h1, None), (f0, g0, h0, None)
+
+        return results[0]
+
+    def cofactors(self, node: int, level: int) -> tuple[int, int]:
+        """ Return the (low, high) cofactors of the node with respect to the variable at the given level. """
+        if self.level(node) == level:
+            return self.node_low[node], self.node_high[node]
+
+        return node, node
+
+    def negate(self, f: int) -> int:
+        return self.ite(f, FALSE, TRUE)
+
+    def apply(self, op: BinaryOperator, f: int, g: int) -> int:
+        """ Apply the truth function of the binary operator `op`, i.e., its `op` method, to two nodes. """
+        def restrict(value_false: bool, value_true: bool) -> int:
+            # op with its first argument fixed, as a function of g
+            if value_false == value_true:
+                return TRUE if value_true else FALSE
+
+            return g if value_true else self.negate(g)
+
+        return self.ite(f, restrict(op.op(True, False), op.op(True, True)),
+                        restrict(op.op(False, False), op.op(False, True)))
+
+    def variable(self, name: str) -> Function:
+        """ Return the function of a single variable. """
+        return Function(self, self.make_node(self.add_variable(name), FALSE, TRUE))
+
+    def constant(self, value: bool) -> Function:
+        return Function(self, TRUE if value else FALSE)
+
+    def from_formula(self, formula: Formula) -> Function:
+        """ Build the BDD of a formula. New variables are added in sorted order. """
+        for name in sorted(formula.get_variables()):
+            self.add_variable(name)
+
+        self.maybe_collect_garbage()
+        return Function(self, self.build(formula))
+
+    def build(self, formula: Formula) -> int:
+        """ Build the node of a formula bottom-up, each distinct sub-formula once (see `build_node`). """
+        return formula.reduce(self.build_node)
+
+    def build_node(self, formula: Formula, children: list[int]) -> int:
+        """ Build the node of a formula, given the nodes of its children. """
+        if isinstance(formula, Literal):
+            value = formula.eval_const()
+            if value is not None:
+                return TRUE if value else FALSE
+
+            return self.make_node(self.add_variable(formula.symbol), FALSE, TRUE)
+
+        if isinstance(formula, Negation):
+            return self.negate(children[0])
+
+        if isinstance(formula, BinaryOperator):
+            return self.apply(formula, *children)
+
+        if isinstance(formula, GeneralisedOperator):
+            neutral = formula.get_neutral()
+            node = TRUE if neutral else FALSE
+
+            for child in children:
+                node = self.ite(node, child, FALSE) if neutral else self.ite(node, TRUE, child)
+
+            return node
+
+        raise ValueError(f"cannot build BDD of formula: {formula}")
+
+    def to_formula(self, node: int) -> Formula:
+        """ Convert a node to a formula, by Shannon expansion on each node's variable. """
+        formulae: dict[int, Formula] = {FALSE: Bottom(), TRUE: Top()}
+        stack = [node]
+
+        while stack:
+            current = stack[-1]
+            if current in formulae:
+                stack.pop()
+                continue
+
+            low, high = self.node_low[current], self.node_high[current]
+            pending = [child for child in (low, high) if child not in formulae]
+            if pending:
+                stack.extend(pending)
+                continue
+
+            stack.pop()
+            symbol = Symbol(self.variables[self.node_var[current]])
+            low, high = formulae[low], formulae[high]
+
+            if isinstance(high, Top) and isinstance(low, Bottom):
+                formula = symbol
+            elif isinstance(high, Bottom) and isinstance(low, Top):
+                formula = Negation(symbol)
+            elif isinstance(low, Bottom):
+                formula = AndOperator(symbol, high)
+            elif isinstance(high, Top):
+                formula = OrOperator(symbol, low)
+            elif isinstance(high, Bottom):
+                formula = AndOperator(Negation(symbol), low)
+            elif isinstance(low, Top):
+                formula = ImpliesOperator(symbol, high)
+            else:
+                formula = OrOperator(AndOperator(symbol, high), AndOperator(Negation(symbol), low))
+
+            formulae[current] = formula
+
+        return formulae[node]
+
+    def count_models(self, node: int) -> int:
+        """ Return the number of assignments to all of the manager's variables which satisfy the node. """
+        counts: dict[int, int] = {FALSE: 0, TRUE: 1}
+        stack = [node]
+
+        # Count assignments to the variables from a node's level downwards
+        while stack:
+            current = stack[-1]
+            if current in counts:
+                stack.pop()
+                continue
+
+            low, high = self.node_low[current], self.node_high[current]
+            pending = [child for child in (low, high) if child not in counts]
+            if pending:
+                stack.extend(pending)
+                continue
+
+            stack.pop()
+            level = self.level(current)
+            counts[current] = (counts[low] << (self.level(low) - level - 1)) + \
+                              (counts[high] << (self.level(high) - level - 1))
+
+        return counts[node] << self.level(node)
+
+    def eval(self, node: int, symbols: dict[str, bool]) -> bool:
+        """ Evaluate the node under the given assignment. """
+        while node > TRUE:
+            node = self.node_high[node] if symbols[self.variables[self.node_var[node]]] else self.node_low[node]
+
+        return node == TRUE
+
+    def get_model(self, node: int) -> dict[str, bool] | None:
+        """ Return an assignment to the variables on some path to TRUE, or None if the node is FALSE. """
+        if node == FALSE:
+            return None
+
+        model = {}
+        while node != TRUE:
+            name = self.variables[self.node_var[node]]
+            if self.node_low[node] != FALSE:
+                model[name] = False
+                node = self.node_low[node]
+            else:
+                model[name] = True
+                node = self.node_high[node]
+
+        return model
+
+    def swap(self, level: int):
+        """ Swap the variables at `level` and `level + 1`, rewriting nodes in place so they keep their functions. """
+        x, y = self.order[level], self.order[level + 1]
+
+        # Nodes of x with a child labelled y must become nodes of y
+        table = self.unique[x]
+        moved = [node for node in table.values()
+                 if self.node_var[self.node_low[node]] == y or self.node_var[self.node_high[node]] == y]
+        for node in moved:
+            del table[(self.node_low[node], self.node_high[node])]
+
+        self.order[level], self.order[level + 1] = y, x
+        self.levels[x], self.levels[y] = level + 1, level
+
+        for node in moved:
+            low, high = self.node_low[node], self.node_high[node]
+            f00, f01 = (self.node_low[low], self.node_high[low]) if self.node_var[low] == y else (low, low)
+            f10, f11 = (self.node_low[high], self.node_high[high]) if self.node_var[high] == y else (high, high)
+
+            # Children are created before releasing the old ones, which they may share nodes with
+            new_low = self.make_node(x, f00, f10)
+            new_high = self.make_node(x, f01, f11)
+            self.node_refs[new_low] += 1
+            self.node_refs[new_high] += 1
+
+            for child in (low, high):
+                self.node_refs[child] -= 1
+                if child > TRUE and self.node_refs[child] == 0:
+                    self.free_node(child)
+
+            self.node_var[node], self.node_low[node], self.node_high[node] = y, new_low, new_high
+            self.unique[y][(new_low, new_high)] = node
+
+    def sift(self):
+        """ Reorder variables by sifting: move each variable, largest first, through every level and leave it where
+        the BDD was smallest. """
+        self.collect_garbage()
+
+        counts = [len(table) for table in self.unique]
+        for variable in sorted(range(len(self.variables)), key=lambda v: -counts[v]):
+            level = self.levels[variable]
+            best_size, best_level = self.size, level
+            limit = self.size * BDD.max_growth
+
+            # Down to the bottom, then up to the top
+            while level < len(self.order) - 1 and self.size <= limit:
+                self.swap(level)
+                level += 1
+                if self.size < best_size:
+                    best_size, best_level = self.size, level
+
+            while level > 0 and self.size <= limit:
+                self.swap(level - 1)
+                level -= 1
+                if self.size < best_size:
+                    best_size, best_level = self.size, level
+
+            # Back to the best level
+            while level < best_level:
+                self.swap(level)
+                level += 1
+
+            while level > best_level:
+                self.swap(level - 1)
+                level -= 1
+
+        self.cache = [None] * BDD.cache_size
+
+    def get_order(self) -> list[str]:
+        """ Return variable names from the top level down. """
+        return [self.variables[variable] for variable in self.order]
+
+
+class Function:
+    def __init__(self, manager: BDD, node: int):
+        """ Handle to a BDD node, holding a reference to it while alive. """
+        self.manager = manager
+        self.node = node
+        manager.ref(node)
+
+    def __del__(self):
+        self.manager.deref(self.node)
+
+    def ite(self, then: Function, otherwise: Function) -> Function:
+        """ Return the function (self AND then) OR (NOT self AND otherwise). """
+        # Operands are referenced by handles, so collecting garbage is safe
+        self.manager.maybe_collect_garbage()
+        return Function(self.manager, self.manager.ite(self.node, then.node, otherwise.node))
+
+    def __and__(self, other: Function) -> Function:
+        return self.ite(other, self.manager.constant(False))
+
+    def __or__(self, other: Function) -> Function:
+        return self.ite(self.manager.constant(True), other)
+
+    def __xor__(self, other: Function) -> Function:
+        return self.ite(~other, other)
+
+    def __invert__(self) -> Function:
+        return self.ite(self.manager.constant(False), self.manager.constant(True))
+
+    def __eq__(self, other):
+        # Reduced ordered BDDs are canonical: equivalent functions share a node
+        return isinstance(other, Function) and self.manager is other.manager and self.node == other.node
+
+    def __hash__(self):
+        return hash(self.node)
+
+    def is_true(self) -> bool:
+        return self.node == TRUE
+
+    def is_false(self) -> bool:
+        return self.node == FALSE
+
+    def is_constant(self) -> bool:
+        return self.node <= TRUE
+
+    def count_models(self) -> int:
+        """ Return the number of satisfying assignments to all of the manager's variables. """
+        return self.manager.count_models(self.node)
+
+    def get_model(self) -> dict[str, bool] | None:
+        return self.manager.get_model(self.node)
+
+    def eval(self, symbols: dict[str, bool]) -> bool:
+        return self.manager.eval(self.node, symbols)
+
+    def to_formula(self) -> Formula:
+        return self.manager.to_formula(self.node)
+
+    def __str__(self):
+        return str(self.to_formula())
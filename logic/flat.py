@@ -0,0 +1,301 @@
+from array import array
+from typing import Iterable, Iterator, Callable
+
+from logic.formula import Formula
+from logic.generalised_operators import GeneralisedConjunction, GeneralisedDisjunction
+from logic.literals import Symbol, Top, Bottom
+from logic.operators import AndOperator, NandOperator, OrOperator, NorOperator, ImpliesOperator, NotImpliesOperator, \
+    ReverseImpliesOperator, ReverseNotImpliesOperator, EqualityOperator, NonEqualityOperator, Negation
+from logic.truth_table import TruthTable
+
+
+class FlatFormula:
+    # Opcodes
+    TOP = 0
+    BOTTOM = 1
+    SYMBOL = 2
+    NEGATION = 3
+    CONJUNCTION = 4  # Generalised conjunction
+    DISJUNCTION = 5  # Generalised disjunction
+    AND = 6  # Binary operators follow
+    NAND = 7
+    OR = 8
+    NOR = 9
+    IMPLIES = 10
+    NOT_IMPLIES = 11
+    REVERSE_IMPLIES = 12
+    REVERSE_NOT_IMPLIES = 13
+    EQUALITY = 14
+    NON_EQUALITY = 15
+
+    # Map of formula classes; class => opcode
+    formula_opcodes: dict[type(Formula), int] = {
+        Top: TOP,
+        Bottom: BOTTOM,
+        Symbol: SYMBOL,
+        Negation: NEGATION,
+        GeneralisedConjunction: CONJUNCTION,
+        GeneralisedDisjunction: DISJUNCTION,
+        AndOperator: AND,
+        NandOperator: NAND,
+        OrOperator: OR,
+        NorOperator: NOR,
+        ImpliesOperator: IMPLIES,
+        NotImpliesOperator: NOT_IMPLIES,
+        ReverseImpliesOperator: REVERSE_IMPLIES,
+        ReverseNotImpliesOperator: REVERSE_NOT_IMPLIES,
+        EqualityOperator: EQUALITY,
+        NonEqualityOperator: NON_EQUALITY,
+    }
+
+    # Map of opcodes; opcode => class
+    opcode_classes: dict[int, type(Formula)] = {opcode: cls for cls, opcode in formula_opcodes.items()}
+
+    # Map of opcodes with a fixed number of children; opcode => Python source of the node's value (0 or 1), given the
+    # values of its children, see `get_source`
+    opcode_sources: dict[int, str] = {
+        TOP: '1',
+        BOTTOM: '0',
+        NEGATION: '{0} ^ 1',
+        AND: '{0} & {1}',
+        NAND: '({0} & {1}) ^ 1',
+        OR: '{0} | {1}',
+        NOR: '({0} | {1}) ^ 1',
+        IMPLIES: '({0} ^ 1) | {1}',
+        NOT_IMPLIES: '{0} & ({1} ^ 1)',
+        REVERSE_IMPLIES: '{0} | ({1} ^ 1)',
+        REVERSE_NOT_IMPLIES: '({0} ^ 1) & {1}',
+        EQUALITY: '{0} ^ {1} ^ 1',
+        NON_EQUALITY: '{0} ^ {1}',
+    }
+
+    def __init__(self, formula: Formula):
+        """ Flatten the formula into parallel arrays, one entry per distinct sub-formula in topological order (children
+        before parents, the formula itself last). Children are stored as a compressed list: the children of node `i`
+        are `children[offsets[i]:offsets[i + 1]]`. """
+        self.opcodes = array('B')  # Node => opcode
+        self.offsets = array('I', [0])  # Node => offset of its first child in `children`
+        self.children = array('I')  # Child node indices
+        self.variables = array('i')  # Node => variable id, or -1 if not a symbol
+        self.names: list[str] = []  # Variable id => symbol
+
+        nodes: dict[int, int] = {}  # id(sub-formula) => node
+        ids: dict[str, int] = {}  # Symbol => variable id
+
+        for node in formula.post_order():
+            nodes[id(node)] = len(self.opcodes)
+            self.opcodes.append(FlatFormula.formula_opcodes[node.__class__])
+
+            if isinstance(node, Symbol):
+                if node.symbol not in ids:
+                    ids[node.symbol] = len(self.names)
+                    self.names.append(node.symbol)
+
+                self.variables.append(ids[node.symbol])
+            else:
+                self.variables.append(-1)
+
+            self.children.extend(nodes[id(child)] for child in node.get_children())
+            self.offsets.append(len(self.children))
+
+    def __len__(self):
+        """ Return the number of nodes. """
+        return len(self.opcodes)
+
+    def get_variables(self) -> set[str]:
+        """ Return set of all variables occurring in the formula """
+        return set(self.names)
+
+    def eval_bitwise(self, columns: list[int], mask: int) -> int:
+        """ Evaluate the formula over packed columns of assignments (see `Formula.eval_bitwise`), given the column of
+        each variable id. """
+        values = [0] * len(self.opcodes)
+        self.eval_nodes(range(len(self.opcodes)), values, columns, mask)
+        return values[-1]
+
+    def eval_nodes(self, nodes: Iterable[int], values: list[int], columns: list[int], mask: int):
+        """ Evaluate the given nodes, in order, over packed columns (see `eval_bitwise`), storing each node's value in
+        `values`. The values of their children must be present. """
+        opcodes, offsets, children, variables = self.opcodes, self.offsets, self.children, self.variables
+
+        for i in nodes:
+            opcode = opcodes[i]
+            start = offsets[i]
+
+            if opcode >= FlatFormula.AND:
+                a = values[children[start]]
+                b = values[children[start + 1]]
+
+                if opcode == FlatFormula.AND:
+                    value = a & b
+                elif opcode == FlatFormula.OR:
+                    value = a | b
+                elif opcode == FlatFormula.IMPLIES:
+                    value = (a ^ mask) | b
+                elif opcode == FlatFormula.EQUALITY:
+                    value = a ^ b ^ mask
+                elif opcode == FlatFormula.NON_EQUALITY:
+                    value = a ^ b
+                elif opcode == FlatFormula.NAND:
+                    value = (a & b) ^ mask
+                elif opcode == FlatFormula.NOR:
+                    value = (a | b) ^ mask
+                elif opcode == FlatFormula.NOT_IMPLIES:
+                    value = a & (b ^ mask)
+                elif opcode == FlatFormula.REVERSE_IMPLIES:
+                    value = a | (b ^ mask)
+                else:
+                    value = (a ^ mask) & b
+
+            elif opcode == FlatFormula.SYMBOL:
+                value = columns[variables[i]]
+
+            elif opcode == FlatFormula.NEGATION:
+                value = values[children[start]] ^ mask
+
+            elif opcode == FlatFormula.CONJUNCTION:
+                value = mask
+                for j in range(start, offsets[i + 1]):
+                    value &= values[children[j]]
+
+            elif opcode == FlatFormula.DISJUNCTION:
+                value = 0
+                for j in range(start, offsets[i + 1]):
+                    value |= values[children[j]]
+
+            else:
+                value = mask if opcode == FlatFormula.TOP else 0
+
+            values[i] = value
+
+    def eval(self, symbols: dict[str, bool] | list[bool]) -> bool:
+        """ Evaluate the formula given the value of each symbol, or of each variable id. """
+        if isinstance(symbols, dict):
+            symbols = [symbols[name] for name in self.names]
+
+        return self.eval_bitwise([int(value) for value in symbols], 1) == 1
+
+    def get_truth_table(self, variables: list[str] | None = None) -> int:
+        """ Return the packed result column of the formula's truth table (see `TruthTable.generate_bitwise`), over the
+        given variables (default: sorted variables), the first being the most significant. """
+        if variables is None:
+            variables = sorted(self.names)
+
+        n = len(variables)
+        position = {variable: i for i, variable in enumerate(variables)}
+        return self.eval_bitwise([TruthTable.column(position[name], n) for name in self.names], (1 << (1 << n)) - 1)
+
+    def get_dependents(self) -> list[list[int]]:
+        """ Return, for each variable id, the nodes whose value depends on the variable, in topological order. """
+        parents: list[list[int]] = [[] for _ in range(len(self.opcodes))]
+        for i in range(len(self.opcodes)):
+            for j in range(self.offsets[i], self.offsets[i + 1]):
+                parents[self.children[j]].append(i)
+
+        dependents = [[] for _ in range(len(self.names))]
+
+        for i, variable in enumerate(self.variables):
+            if variable < 0:
+                continue
+
+            # Nodes reachable from the symbol via parents
+            found = {i}
+            stack = [i]
+            while stack:
+                for parent in parents[stack.pop()]:
+                    if parent not in found:
+                        found.add(parent)
+                        stack.append(parent)
+
+            dependents[variable] = sorted(found)
+
+        return dependents
+
+    def get_source(self, i: int) -> str:
+        """ Return Python source of the value (0 or 1) of the given node, reading the values of its children from `_v`
+        and the value of each variable id from `_c`. """
+        opcode = self.opcodes[i]
+        arguments = [f"_v[{self.children[j]}]" for j in range(self.offsets[i], self.offsets[i + 1])]
+
+        if opcode == FlatFormula.SYMBOL:
+            return f"_c[{self.variables[i]}]"
+
+        if opcode == FlatFormula.CONJUNCTION:
+            return ' & '.join(arguments) if arguments else '1'
+
+        if opcode == FlatFormula.DISJUNCTION:
+            return ' | '.join(arguments) if arguments else '0'
+
+        return FlatFormula.opcode_sources[opcode].format(*arguments)
+
+    def compile_update(self, nodes: Iterable[int]) -> Callable[[list[int], list[int]], None]:
+        """ Compile a function evaluating the given nodes in order, given the list of node values (where it stores their
+        values) and the value of each variable id. """
+        body = ''.join(f"    _v[{i}] = {self.get_source(i)}\n" for i in nodes)
+        source = "def _update(_v, _c):\n" + body + "    return\n"
+
+        namespace = {}
+        exec(compile(source, '<flat formula>', 'exec'), namespace)
+        return namespace['_update']
+
+    def iter_gray(self, variables: list[str], symbols: dict[str, bool] | None = None) -> Iterator[tuple[int, bool]]:
+        """ Evaluate the formula for every assignment of the given variables, in Gray-code order, yielding (row,
+        result), where rows are numbered as in `TruthTable` (the first variable is the most significant). As exactly one
+        variable changes between rows, only the nodes depending on it are evaluated again, by a function compiled per
+        variable (see `compile_update`). Variables on which most nodes depend evaluate every node instead.
+        `symbols` - values of the formula's other variables. """
+        n = len(variables)
+        position = {variable: i for i, variable in enumerate(variables)}
+
+        columns = []
+        for name in self.names:
+            if name in position:
+                columns.append(0)
+            elif symbols is not None and name in symbols:
+                columns.append(int(symbols[name]))
+            else:
+                raise ValueError(f"variable not provided: {name}")
+
+        ids = {name: i for i, name in enumerate(self.names)}
+        dependents = self.get_dependents()
+        update_all = self.compile_update(range(len(self.opcodes)))
+
+        # Variable id, and function updating its dependents, when each bit of the row changes (the last variable is bit 0)
+        flips = []
+        for variable in reversed(variables):
+            if variable not in ids:
+                flips.append((None, None))
+            elif 2 * len(dependents[ids[variable]]) > len(self.opcodes):
+                flips.append((ids[variable], update_all))
+            else:
+                flips.append((ids[variable], self.compile_update(dependents[ids[variable]])))
+
+        values = [0] * len(self.opcodes)
+        update_all(values, columns)
+        yield 0, values[-1] == 1
+
+        row = 0
+        for step in range(1, 1 << n):
+            # Gray code: the bit flipped is the lowest set bit of the step
+            bit = (step & -step).bit_length() - 1
+            row ^= 1 << bit
+
+            variable, update = flips[bit]
+            if variable is not None:
+                columns[variable] ^= 1
+                update(values, columns)
+
+            yield row, values[-1] == 1
+
+    def to_formula(self) -> Formula:
+        """ Rebuild the formula as a tree of objects. """
+        formulae: list[Formula] = []
+
+        for i, opcode in enumerate(self.opcodes):
+            if opcode == FlatFormula.SYMBOL:
+                formulae.append(Symbol(self.names[self.variables[i]]))
+            else:
+                children = self.children[self.offsets[i]:self.offsets[i + 1]]
+                formulae.append(FlatFormula.opcode_classes[opcode](*(formulae[child] for child in children)))
+
+        return formulae[-1]
@@ -1,40 +1,425 @@
 from __future__ import annotations
+import weakref
+from typing import Callable, Any, TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from logic.symbol_table import SymbolTable
+
+
+class FormulaMeta(type):
+    # Live formulae, keyed by (class, constructor arguments)
+    interned: weakref.WeakValueDictionary[tuple, Formula] = weakref.WeakValueDictionary()
+
+    def __call__(cls, *args):
+        """ Hash-cons formulae: constructing a formula structurally identical to a live one returns the existing
+        instance. As sub-formulae are interned too, equality is identity and the hash is computed once. """
+        key = (cls, args)
+        formula = FormulaMeta.interned.get(key)
+
+        if formula is None:
+            formula = super().__call__(*args)
+            object.__setattr__(formula, '_hash', hash(key))
+            FormulaMeta.interned[key] = formula
+
+        return formula
+
+
+class Formula(metaclass=FormulaMeta):
+    """ Base of all formulae. Formulae are interned (see `FormulaMeta`) so must not be mutated once constructed.
+
+    Nodes are slotted; each subclass declares `__slots__` for its own fields. Once constructed, assigning to a node
+    raises AttributeError, so nodes may be shared safely. Traversals (`eval`, `simplify`, `__str__`, ...) are
+    iterative, visiting sub-formulae in post-order (see `post_order`) and combining the results of a node's children
+    with the node's `*_node` method, so the depth of a formula is bounded only by memory. Shared sub-formulae are
+    visited once. """
+
+    # Hash, cached constant value (see `eval_const`), cached variables (see `get_variables`), cached simplification (see
+    # `simplify`), cached compiled functions (see `compile`)
+    __slots__ = ('_hash', '_const', '_variables', '_simplified', '_compiled', '__weakref__')
+
+    def __setattr__(self, name, value):
+        # Fields may only be assigned while constructing, i.e., before the node is interned
+        if hasattr(self, '_hash'):
+            raise AttributeError(f"cannot assign '{name}': formulae are immutable")
+
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"cannot delete '{name}': formulae are immutable")
+
+    def get_children(self) -> tuple[Formula, ...] | list[Formula]:
+        """ Return the immediate sub-formulae of this node. """
+        return ()
+
+    def post_order(self, prune: Callable[[Formula], bool] | None = None) -> list[Formula]:
+        """ Return the distinct sub-formulae of this formula, including itself, each after its children.
+        `prune` - if given, sub-formulae for which this returns True are skipped, along with their children. """
+        order = []
+        if prune is not None and prune(self):
+            return order
+
+        visited = {id(self)}
+        stack = [(self, iter(self.get_children()))]
+        push, pop = stack.append, stack.pop
+
+        while stack:
+            node, children = stack[-1]
+
+            for child in children:
+                if id(child) not in visited and (prune is None or not prune(child)):
+                    visited.add(id(child))
+                    push((child, iter(child.get_children())))
+                    break
+            else:
+                pop()
+                order.append(node)
+
+        return order
+
+    def reduce(self, function: Callable[[Formula, list], Any]) -> Any:
+        """ Compute `function(node, values of the node's children)` for every sub-formula, bottom-up, and return the
+        value of this formula. """
+        values = {}
+        for node in self.post_order():
+            values[id(node)] = function(node, [values[id(child)] for child in node.get_children()])
+
+        return values[id(self)]
 
-class Formula:
     def eval_const(self) -> bool | None:
         """ Evaluate the given node without symbols """
+        # Formulae are immutable, so each node's constant value is cached
+        if not hasattr(self, '_const'):
+            for node in self.post_order(lambda formula: hasattr(formula, '_const')):
+                object.__setattr__(node, '_const', node.eval_const_node([child._const for child in node.get_children()]))
+
+        return self._const
+
+    def eval_const_node(self, arguments: list[bool | None]) -> bool | None:
+        """ Evaluate this node without symbols, given the constant values of its children. """
+        # Please override
         raise NotImplementedError
 
     def eval(self, symbols: dict[str, bool]) -> bool:
         """ Evaluate the given node with the given symbols """
+        # Children are evaluated left to right, stopping once a node's value is decided (see `eval_short_circuit`), so
+        # symbols are only looked up (or prompted for, see `Symbol`) if needed. Shared sub-formulae are evaluated once.
+        values: dict[int, bool] = {}
+        stack = [(self, self.get_children(), [])]  # Node, its children, values of the children evaluated so far
+
+        while stack:
+            node, children, arguments = stack[-1]
+
+            if len(arguments) == len(children):
+                value = node.eval_node(arguments, symbols)
+            else:
+                value = node.eval_short_circuit(arguments) if arguments else None
+
+                if value is None:
+                    # Evaluate the next child
+                    child = children[len(arguments)]
+                    if id(child) in values:
+                        arguments.append(values[id(child)])
+                    else:
+                        stack.append((child, child.get_children(), []))
+
+                    continue
+
+            stack.pop()
+            values[id(node)] = value
+
+            if stack:
+                stack[-1][2].append(value)
+
+        return values[id(self)]
+
+    def eval_node(self, arguments: list[bool], symbols: dict[str, bool]) -> bool:
+        """ Evaluate this node with the given symbols, given the values of its children. """
         # Please override
         raise NotImplementedError
 
-    def substitute(self, symbol: str, formula: Formula) -> Formula:
-        """ Substitude all instances of the given symbol with the formula. """
+    def eval_short_circuit(self, arguments: list[bool]) -> bool | None:
+        """ Return the value of this node if decided by the values of its first children alone, else None. """
+        return None
+
+    def eval_bitwise(self, symbols: dict[str, int], mask: int) -> int:
+        """ Evaluate the given node over packed columns of assignments: bit `i` of each symbol's column is its value
+        in row `i`, and `mask` has a bit set for every row. Return the packed result column. """
+        return self.reduce(lambda node, arguments: node.eval_bitwise_node(arguments, symbols, mask))
+
+    def eval_bitwise_node(self, arguments: list[int], symbols: dict[str, int], mask: int) -> int:
+        """ Evaluate this node over packed columns, given the packed columns of its children. """
         # Please override
         raise NotImplementedError
 
-    def get_variables(self) -> set[str]:
+    def substitute(self, symbol: str, formula: Formula) -> Formula:
+        """ Substitude all instances of the given symbol with the formula. """
+        if not self.depends_on(symbol):
+            return self
+
+        # Nodes whose children are unchanged are left as they are (see `substitute_node`)
+        values = {}
+        for node in self.post_order():
+            arguments = [values[id(child)] for child in node.get_children()]
+            values[id(node)] = node.substitute_node(arguments, symbol, formula)
+
+        return values[id(self)]
+
+    def substitute_node(self, arguments: list[Formula], symbol: str, formula: Formula) -> Formula:
+        """ Substitute the given symbol in this node, given its children with the symbol substituted. """
+        for argument, child in zip(arguments, self.get_children()):
+            if argument is not child:
+                return self.__class__(*arguments)
+
+        return self
+
+    def get_variables(self) -> frozenset[str]:
         """ Return set of all variables occurring in this formula """
-        # Please override
-        raise NotImplementedError
+        # Formulae are immutable, so the variables are cached, but only on the node asked: caching every sub-formula's
+        # variables would hold memory quadratic in the length of a chain of distinct variables. Sub-formulae whose
+        # variables are already cached are not visited.
+        if not hasattr(self, '_variables'):
+            variables = set()
+
+            def cached(formula: Formula) -> bool:
+                if hasattr(formula, '_variables'):
+                    variables.update(formula._variables)
+                    return True
+
+                return False
+
+            for node in self.post_order(cached):
+                variables.update(node.get_variables_node())
+
+            object.__setattr__(self, '_variables', frozenset(variables))
+
+        return self._variables
+
+    def get_variables_node(self) -> frozenset[str]:
+        """ Return the variables occurring in this node itself, i.e., not in its children. """
+        return frozenset()
+
+    def depends_on(self, symbol: str) -> bool:
+        """ Return whether the given symbol occurs in this formula. """
+        # Search the formula, stopping at the first occurrence, unless its variables are already cached
+        visited = {id(self)}
+        stack = [self]
+
+        while stack:
+            node = stack.pop()
+
+            if hasattr(node, '_variables'):
+                if symbol in node._variables:
+                    return True
+
+                continue
+
+            if symbol in node.get_variables_node():
+                return True
+
+            for child in node.get_children():
+                if id(child) not in visited:
+                    visited.add(id(child))
+                    stack.append(child)
+
+        return False
 
     def equals(self, other: Formula) -> bool:
         """ Return whether this formula is the same (syntactically) as the given formula """
-        # Please override
-        raise NotImplementedError
+        # Formulae are interned, so syntactic equality is identity
+        return self is other
 
     def simplify(self) -> Formula:
         """ Simplify the given formula (i.e., resolve 'a + a'). Note, does not do any complex re-arranging. """
-        # Check if constant; that'd be silly
-        value = self.eval_const()
-        if value is not None:
-            from logic.literals import Literal
-            return Literal.from_bool(value)
+        from logic.literals import Literal
+
+        # Each node is simplified once and its result cached (None if it is already simplified). Rewritten nodes are
+        # simplified again until nothing changes; only their new sub-formulae are visited.
+        if not hasattr(self, '_simplified'):
+            self.eval_const()
 
+            for node in self.post_order(lambda formula: hasattr(formula, '_simplified')):
+                arguments = [child if child._simplified is None else child._simplified for child in node.get_children()]
+
+                # Check if constant; that'd be silly
+                if node._const is not None:
+                    simplified = Literal.from_bool(node._const)
+                else:
+                    simplified = node.simplify_node(arguments)
+
+                    # Unless only the children were replaced, simplify the rewritten formula
+                    if simplified.__class__ is not node.__class__ or \
+                            any(child is not argument for child, argument in zip(simplified.get_children(), arguments)):
+                        simplified = simplified.simplify()
+
+                if simplified is node:
+                    object.__setattr__(node, '_simplified', None)
+                else:
+                    object.__setattr__(node, '_simplified', simplified)
+
+                    if not hasattr(simplified, '_simplified'):
+                        object.__setattr__(simplified, '_simplified', None)
+
+        return self if self._simplified is None else self._simplified
+
+    def simplify_node(self, arguments: list[Formula]) -> Formula:
+        """ Simplify this non-constant node, given its simplified children. """
         return self
 
+    def __str__(self):
+        # Expand nodes into their parts until only strings remain
+        parts = []
+        stack: list[str | Formula] = [self]
+
+        while stack:
+            part = stack.pop()
+
+            if part.__class__ is str:
+                parts.append(part)
+            else:
+                stack.extend(part.get_string_parts()[::-1])
+
+        return ''.join(parts)
+
+    def get_string_parts(self) -> list[str | Formula]:
+        """ Return this node's string representation as a list of strings and children. """
+        # Please override
+        raise NotImplementedError
+
+    def compile(self, variables: list[str] | None = None, bitmask=False) -> Callable[..., bool]:
+        """ Compile this formula into a flat Python function taking one positional boolean per variable, in the order
+        given by `variables` (default: sorted variables). Variables not occurring in the formula are accepted and
+        ignored. The function is cached per formula and variable order.
+        `bitmask` - if True, the function instead takes a single integer, whose bit `i` is the value of `variables[i]`. """
+        cache: dict[tuple | None, Callable[..., bool]] | None = getattr(self, '_compiled', None)
+        if cache is None:
+            cache = {}
+            object.__setattr__(self, '_compiled', cache)
+        elif variables is None and not bitmask and None in cache:
+            return cache[None]
+
+        if variables is None:
+            variables = sorted(self.get_variables())
+
+            if not bitmask:
+                cache[None] = function = self.compile(variables)
+                return function
+
+        key = (tuple(variables), bitmask)
+        if key in cache:
+            return cache[key]
+
+        missing = self.get_variables().difference(key[0])
+        if missing:
+            raise ValueError(f"variables not provided: {', '.join(sorted(missing))}")
+
+        context = CompileContext(key[0], bitmask)
+        expression, _ = self.compile_source(context)
+        cache[key] = function = context.build(expression)
+        return function
+
+    def eval_assignment(self, assignment: list[bool] | int, table: SymbolTable) -> bool:
+        """ Evaluate the given node with the value of each variable given by its id in the table: either a list, or a
+        bitmask whose bit `i` is the value of variable `i`. """
+        if isinstance(assignment, int):
+            return table.get_function(self, True)(assignment)
+
+        return table.get_function(self)(*assignment)
+
+    def compile_source(self, context: CompileContext) -> tuple[str, int]:
+        """ Return Python source evaluating this formula, and its nesting depth, for `compile`. """
+        return self.reduce(lambda node, arguments: node.compile_node(arguments, context))
+
+    def compile_node(self, arguments: list[tuple[str, int]], context: CompileContext) -> tuple[str, int]:
+        """ Return Python source evaluating this node, and its nesting depth, given the source of its children. """
+        # Please override
+        raise NotImplementedError
+
     def __eq__(self, other):
-        return isinstance(other, Formula) and self.equals(other)
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # Reconstruct through the constructor so copies and unpickled formulae are interned. Compound formulae are
+        # reduced to their flat list of distinct sub-formulae, as pickling nested arguments would recurse once per level
+        if not self.get_children():
+            return self.__class__, self.get_arguments()
+
+        indices = {}
+        nodes = []
+        for node in self.post_order():
+            indices[id(node)] = len(nodes)
+            children = tuple(indices[id(child)] for child in node.get_children())
+            nodes.append((node.__class__, children, () if children else node.get_arguments()))
+
+        return rebuild_formula, (nodes,)
+
+    def get_arguments(self) -> tuple:
+        """ Return the arguments this formula was constructed with. """
+        # Please override
+        raise NotImplementedError
+
+
+def rebuild_formula(nodes: list[tuple[type[Formula], tuple[int, ...], tuple]]) -> Formula:
+    """ Rebuild a formula reduced by `Formula.__reduce__`: nodes are (class, indices of children, other constructor
+    arguments), each after its children, the formula itself last. """
+    formulae = []
+    for cls, children, arguments in nodes:
+        formulae.append(cls(*(formulae[child] for child in children)) if children else cls(*arguments))
+
+    return formulae[-1]
+
+
+class CompileContext:
+    # Nesting depth at which a sub-expression is hoisted into a local; CPython's parser caps nesting at 200
+    max_depth = 50
+
+    def __init__(self, variables: tuple[str, ...], bitmask=False):
+        """ Context used when compiling a formula: maps variables onto parameters and collects hoisted locals.
+        `bitmask` - if True, variables are read from the bits of a single parameter. """
+        self.variables = variables
+        self.bitmask = bitmask
+        self.indices = {variable: i for i, variable in enumerate(variables)}
+        self.parameters = {variable: f"_{i}" for variable, i in self.indices.items()}
+        self.used: dict[str, None] = {}  # Variables referenced, in order
+        self.lines: list[str] = []
+
+    def parameter(self, variable: str) -> str:
+        """ Get the name of the parameter bound to the given variable. """
+        self.used[variable] = None
+        return self.parameters[variable]
+
+    def expression(self, source: str, depth: int) -> tuple[str, int]:
+        """ Register an expression of the given depth. Too-deep expressions are assigned to a local beforehand (losing
+        short-circuiting for that sub-expression only). """
+        if depth < CompileContext.max_depth:
+            return source, depth
+
+        local = f"_t{len(self.lines)}"
+        self.lines.append(f"{local} = {source}")
+        return local, 0
+
+    def build(self, expression: str) -> Callable[..., bool]:
+        """ Build the function returning the given expression. """
+        body = [*self.lines, f"return {expression}"]
+
+        if self.bitmask:
+            # Extract each variable used from its bit
+            body[:0] = [f"{self.parameters[variable]} = _m >> {self.indices[variable]} & 1 == 1"
+                        for variable in self.used]
+            parameters = '_m'
+        else:
+            parameters = ', '.join(self.parameters.values())
+
+        source = f"def _compiled({parameters}):\n" + ''.join(f"    {line}\n" for line in body)
+
+        namespace = {}
+        exec(compile(source, '<formula>', 'exec'), namespace)
+
+        function = namespace['_compiled']
+        function.variables = self.variables
+        return function
@@ -1,53 +1,80 @@
-from typing import override
+from __future__ import annotations
+from typing import override, Iterator
 
-from logic.formula import Formula
+from logic.formula import Formula, CompileContext
 from logic.operators import Operator, Negation, AndOperator, OrOperator, BinaryOperator
 from logic.literals import Literal, Top, Bottom
 
 
-class GeneralisedOperator(Operator, list):
-    def __init__(self, formulae: list[Formula], open_tag: str, close_tag: str):
-        super().__init__(formulae)
-        self.open_tag = open_tag
-        self.close_tag = close_tag
+class GeneralisedOperator(Operator):
+    """ Generalised operator over a tuple of formulae, which it may be used as (indexed, iterated, etc.). """
+    __slots__ = ('formulae',)
+    open_tag: str  # Display tags; set by each operator
+    close_tag: str
 
-    def __str__(self):
-        return self.open_tag + ','.join(map(str, self)) + self.close_tag
+    def __init__(self, *formulae: Formula):
+        super().__init__()
+        self.formulae = formulae
 
-    @override
-    def get_variables(self):
-        return set().union(*(formula.get_variables() for formula in self))
+    def __len__(self):
+        return len(self.formulae)
+
+    def __iter__(self) -> Iterator[Formula]:
+        return iter(self.formulae)
+
+    def __getitem__(self, item):
+        return self.formulae[item]
+
+    def __contains__(self, item):
+        return item in self.formulae
 
     @override
-    def equals(self, other: Formula) -> bool:
-        if not isinstance(other, self.__class__) or len(self) != len(other):
-            return False
+    def get_string_parts(self) -> list[str | Formula]:
+        parts: list[str | Formula] = [self.open_tag]
+        for i, formula in enumerate(self.formulae):
+            if i > 0:
+                parts.append(',')
 
-        for i in range(len(self)):
-            if not self[i].equals(other[i]):
-                return False
+            parts.append(formula)
 
-        return True
+        parts.append(self.close_tag)
+        return parts
+
+    @override
+    def get_children(self) -> tuple[Formula, ...]:
+        return self.formulae
+
+    @override
+    def get_arguments(self) -> tuple:
+        return self.formulae
 
     def get_neutral(self) -> bool:
         """ Get neutral element """
         # Please override
         raise NotImplementedError
 
-    def remove_empty_nested(self):
-        """ Nested generalised formulae: remove empty formulae """
-        i = 0
-        while i < len(self):
-            formula = self[i]
+    @override
+    def compile_node(self, arguments: list[tuple[str, int]], context: CompileContext) -> tuple[str, int]:
+        if len(arguments) == 0:
+            return str(self.get_neutral()), 0
+
+        sources, depths = zip(*arguments)
+        joiner = ' and ' if self.get_neutral() else ' or '
+        return context.expression('(' + joiner.join(sources) + ')', 1 + max(depths))
 
+    def remove_empty_nested(self) -> GeneralisedOperator:
+        """ Nested generalised formulae: return a copy with empty formulae removed """
+        formulae = []
+        for formula in self:
             if isinstance(formula, GeneralisedOperator):
-                formula.remove_empty_nested()
+                formula = formula.remove_empty_nested()
 
                 if len(formula) == 0:
-                    self.pop(i)
                     continue
 
-            i += 1
+            formulae.append(formula)
+
+        return self.__class__(*formulae)
 
     def decompose(self, all_generalised=False) -> Formula:
         """ Decompose to a sequence of binary operators which represent the same thing.
@@ -85,18 +112,8 @@ class GeneralisedOperator(Operator, list):
         return clause
 
     @override
-    def substitute(self, symbol: str, formula: Formula) -> Formula:
-        return self.__class__(*[el.substitute(symbol, formula) for el in self])
-
-    @override
-    def simplify(self) -> Formula:
-        # Check if constant
-        value = self.eval_const()
-        if value is not None:
-            return Literal.from_bool(value)
-
-        # Simplify all formulae
-        formulae = [formula.simplify() for formula in self]
+    def simplify_node(self, arguments: list[Formula]) -> Formula:
+        formulae = arguments
 
         # Atomic?
         if len(formulae) == 1:
@@ -121,16 +138,15 @@ class GeneralisedOperator(Operator, list):
 
 
 class GeneralisedConjunction(GeneralisedOperator):
-    def __init__(self, *formulae):
-        super().__init__(formulae, '⟨', '⟩')
+    __slots__ = ()
+    open_tag = '⟨'
+    close_tag = '⟩'
 
     @override
-    def eval_const(self):
+    def eval_const_node(self, arguments: list[bool | None]) -> bool | None:
         encountered_none = False
 
-        for formula in self:
-            ans = formula.eval_const()
-
+        for ans in arguments:
             if ans is None:
                 encountered_none = True
 
@@ -144,34 +160,43 @@ class GeneralisedConjunction(GeneralisedOperator):
         return True
 
     @override
-    def eval(self, symbols):
-        for formula in self:
-            if not formula.eval(symbols):
-                return False
+    def eval_node(self, arguments: list[bool], symbols: dict[str, bool]) -> bool:
+        return all(arguments)
 
-        return True
+    @override
+    def eval_short_circuit(self, arguments: list[bool]) -> bool | None:
+        # A false argument decides the conjunction
+        return False if not arguments[-1] else None
+
+    @override
+    def eval_bitwise_node(self, arguments: list[int], symbols: dict[str, int], mask: int) -> int:
+        result = mask
+        for column in arguments:
+            result &= column
+
+        return result
 
     @override
     def _simplify(self, formulae: list[Formula]) -> Formula | None:
         new_formulae = []
+        seen = set()
 
         for formula in formulae:
             # Remove Top
             if isinstance(formula, Top):
-                found_top = True
                 continue
 
             # Does this instance already exist?
-            if formula in new_formulae:
+            if formula in seen:
                 continue
 
             # Does the negation occur in new_formulae?
-            if any(map(lambda f: (isinstance(f, Negation) and formula.equals(f.data)) or
-                                 (isinstance(formula, Negation) and formula.data.equals(f)), new_formulae)):
+            if Negation(formula) in seen or (isinstance(formula, Negation) and formula.data in seen):
                 return Bottom()
 
             # Preserve element
             new_formulae.append(formula)
+            seen.add(formula)
 
         return GeneralisedConjunction(*new_formulae)
 
@@ -181,16 +206,15 @@ class GeneralisedConjunction(GeneralisedOperator):
 
 
 class GeneralisedDisjunction(GeneralisedOperator):
-    def __init__(self, *formulae):
-        super().__init__(formulae, '[', ']')
+    __slots__ = ()
+    open_tag = '['
+    close_tag = ']'
 
     @override
-    def eval_const(self):
+    def eval_const_node(self, arguments: list[bool | None]) -> bool | None:
         encountered_none = False
 
-        for formula in self:
-            ans = formula.eval_const()
-
+        for ans in arguments:
             if ans is None:
                 encountered_none = True
 
@@ -200,12 +224,21 @@ class GeneralisedDisjunction(GeneralisedOperator):
         return None if encountered_none else False
 
     @override
-    def eval(self, symbols):
-        for formula in self:
-            if formula.eval(symbols):
-                return True
+    def eval_node(self, arguments: list[bool], symbols: dict[str, bool]) -> bool:
+        return any(arguments)
 
-        return False
+    @override
+    def eval_short_circuit(self, arguments: list[bool]) -> bool | None:
+        # A true argument decides the disjunction
+        return True if arguments[-1] else None
+
+    @override
+    def eval_bitwise_node(self, arguments: list[int], symbols: dict[str, int], mask: int) -> int:
+        result = 0
+        for column in arguments:
+            result |= column
+
+        return result
 
     @override
     def get_neutral(self) -> bool:
@@ -214,24 +247,24 @@ class GeneralisedDisjunction(GeneralisedOperator):
     @override
     def _simplify(self, formulae: list[Formula]) -> Formula | None:
         new_formulae = []
+        seen = set()
 
         for formula in formulae:
             # Remove Bottom
             if isinstance(formula, Bottom):
-                found_bottom = True
                 continue
 
             # Does this instance already exist?
-            if formula in new_formulae:
+            if formula in seen:
                 continue
 
             # Does the negation occur in new_formulae?
-            if any(map(lambda f: (isinstance(f, Negation) and formula.equals(f.data)) or
-                                 (isinstance(formula, Negation) and formula.data.equals(f)), new_formulae)):
+            if Negation(formula) in seen or (isinstance(formula, Negation) and formula.data in seen):
                 return Top()
 
             # Preserve element
             new_formulae.append(formula)
+            seen.add(formula)
 
         return GeneralisedDisjunction(*new_formulae)
 
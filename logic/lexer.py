@@ -0,0 +1,146 @@
+from typing import Any
+
+from logic.literals import Symbol, Top, Bottom
+from logic.operators import AndOperator, OrOperator, ImpliesOperator, ReverseImpliesOperator, EqualityOperator, \
+    BinaryOperator, NonEqualityOperator
+
+
+class Token:
+    # Kinds of token
+    NEGATION = 0  # Negation of a literal or group
+    LITERAL = 1  # Top, bottom or symbol; value is the literal
+    OPEN = 2  # '(', '[' or '<'; value is the tag
+    CLOSE = 3  # ')', ']' or '>'; value is the tag
+    COMMA = 4
+    OPERATOR = 5  # Binary operator, possibly negated; value is the operator's class
+    UNKNOWN = 6  # Unrecognised input; ends the tokens (preceded by a NEGATION if an operator was negated)
+    END = 7  # End of input
+
+    def __init__(self, kind: int, value: Any, index: int):
+        """ Token of the given kind, starting at `index` in the input. """
+        self.kind = kind
+        self.value = value
+        self.index = index
+
+
+class Lexer:
+    # Map of binary operators; string => operator
+    binary_operators: dict[str, type(BinaryOperator)] = {
+        '&': AndOperator,
+        '.': AndOperator,
+        '^': AndOperator,
+        '|': OrOperator,
+        '+': OrOperator,
+        'v': OrOperator,
+        '->': ImpliesOperator,
+        '<-': ReverseImpliesOperator,
+        '=': EqualityOperator,
+        '(+)': NonEqualityOperator,
+    }
+
+    negations = ('!', '¬', '~')
+    open_tags = ('(', '[', '<')
+    close_tags = (')', ']', '>')
+
+    def __init__(self, string: str):
+        """ Split the given string into tokens, in a single pass. """
+        self.string = string
+
+    def tokenize(self) -> list[Token]:
+        """ Return the tokens of the string, ending with an END token (or an UNKNOWN token, followed by END, at the
+        first unrecognised input). Which tokens are recognised depends on whether an operand or an operator is expected
+        next, as, e.g., '<' opens a generalised conjunction but '<-' is an operator.
+
+        Spaces may appear anywhere between tokens, except before a negation or an opening tag at the start of the input
+        or after a negation: there, as in the grammar, they may only precede a literal. """
+        string = self.string
+        length = len(string)
+        tokens = []
+        index = 0
+        operand = True  # Is an operand (rather than an operator) expected?
+        separated = False  # Does the last token allow spaces before any operand?
+
+        while True:
+            start = index
+            while index < length and string[index] == ' ':
+                index += 1
+
+            spaced = index > start
+
+            if index >= length:
+                tokens.append(Token(Token.END, None, index))
+                return tokens
+
+            char = string[index]
+
+            if char in Lexer.close_tags:
+                tokens.append(Token(Token.CLOSE, char, index))
+                index += 1
+                operand = False
+
+            elif char == ',':
+                tokens.append(Token(Token.COMMA, char, index))
+                index += 1
+                operand = True
+                separated = True
+
+            elif operand:
+                if spaced and not separated and (char in Lexer.negations or char in Lexer.open_tags):
+                    break
+
+                if char in Lexer.negations:
+                    tokens.append(Token(Token.NEGATION, char, index))
+                    index += 1
+                    separated = False
+
+                elif char in Lexer.open_tags:
+                    tokens.append(Token(Token.OPEN, char, index))
+                    index += 1
+                    separated = True
+
+                elif char in (Top.symbol, 'T', '1'):
+                    tokens.append(Token(Token.LITERAL, Top(), index))
+                    index += 1
+                    operand = False
+
+                elif char in (Bottom.symbol, 'F', '0'):
+                    tokens.append(Token(Token.LITERAL, Bottom(), index))
+                    index += 1
+                    operand = False
+
+                elif char.isalpha():
+                    start = index
+                    index += 1
+                    while index < length and string[index].isalnum():
+                        index += 1
+
+                    tokens.append(Token(Token.LITERAL, Symbol(string[start:index]), start))
+                    operand = False
+
+                else:
+                    break
+
+            else:
+                # Operator, which may be negated once
+                start = index
+                negated = char in Lexer.negations
+                if negated:
+                    index += 1
+
+                for symbol, op in Lexer.binary_operators.items():
+                    if string.startswith(symbol, index):
+                        tokens.append(Token(Token.OPERATOR, op.get_negated() if negated else op, start))
+                        index += len(symbol)
+                        operand = True
+                        separated = True
+                        break
+                else:
+                    # Keep the negation, so errors may refer to either it or what follows
+                    if negated:
+                        tokens.append(Token(Token.NEGATION, char, start))
+
+                    break
+
+        tokens.append(Token(Token.UNKNOWN, None, index))
+        tokens.append(Token(Token.END, None, length))
+        return tokens
@@ -1,9 +1,11 @@
 from __future__ import annotations
 from typing import override
-from logic.formula import Formula
+from logic.formula import Formula, CompileContext
 
 
 class Literal(Formula):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
 
@@ -11,8 +13,13 @@ class Literal(Formula):
     def from_bool(boolean: bool) -> Literal:
         return Top() if boolean else Bottom()
 
+    @override
+    def get_string_parts(self) -> list[str | Formula]:
+        return [str(self)]
+
 
 class Top(Literal):
+    __slots__ = ()
     symbol = '⊤'
 
     def __init__(self):
@@ -22,27 +29,28 @@ class Top(Literal):
         return Top.symbol
 
     @override
-    def get_variables(self):
-        return set()
+    def eval_const_node(self, arguments: list[bool | None]) -> bool | None:
+        return True
 
     @override
-    def eval_const(self):
+    def eval_node(self, arguments: list[bool], symbols: dict[str, bool]) -> bool:
         return True
 
     @override
-    def eval(self, symbols: set[str]):
-        return True
+    def eval_bitwise_node(self, arguments: list[int], symbols: dict[str, int], mask: int) -> int:
+        return mask
 
     @override
-    def equals(self, other: Formula) -> bool:
-        return isinstance(other, Top)
+    def compile_node(self, arguments: list[tuple[str, int]], context: CompileContext) -> tuple[str, int]:
+        return 'True', 0
 
     @override
-    def substitute(self, symbol: str, formula: Formula) -> Formula:
-        return self
+    def get_arguments(self) -> tuple:
+        return ()
 
 
 class Bottom(Literal):
+    __slots__ = ()
     symbol = '⊥'
 
     def __init__(self):
@@ -52,27 +60,29 @@ class Bottom(Literal):
         return Bottom.symbol
 
     @override
-    def get_variables(self):
-        return set()
+    def eval_const_node(self, arguments: list[bool | None]) -> bool | None:
+        return False
 
     @override
-    def eval_const(self):
+    def eval_node(self, arguments: list[bool], symbols: dict[str, bool]) -> bool:
         return False
 
     @override
-    def eval(self, symbols: set[str]):
-        return False
+    def eval_bitwise_node(self, arguments: list[int], symbols: dict[str, int], mask: int) -> int:
+        return 0
 
     @override
-    def equals(self, other: Formula) -> bool:
-        return isinstance(other, Bottom)
+    def compile_node(self, arguments: list[tuple[str, int]], context: CompileContext) -> tuple[str, int]:
+        return 'False', 0
 
     @override
-    def substitute(self, symbol: str, formula: Formula) -> Formula:
-        return self
+    def get_arguments(self) -> tuple:
+        return ()
 
 
 class Symbol(Literal):
+    __slots__ = ('symbol',)
+
     def __init__(self, symbol: str):
         super().__init__()
         self.symbol = symbol
@@ -81,12 +91,12 @@ class Symbol(Literal):
         return self.symbol
 
     @override
-    def eval_const(self):
+    def eval_const_node(self, arguments: list[bool | None]) -> bool | None:
         # Value of symbol is not const
         return None
 
     @override
-    def eval(self, symbols: dict[str, bool]):
+    def eval_node(self, arguments: list[bool], symbols: dict[str, bool]) -> bool:
         if self.symbol in symbols:
             return symbols[self.symbol]
 
@@ -105,13 +115,21 @@ class Symbol(Literal):
         return value
 
     @override
-    def substitute(self, symbol: str, formula: Formula) -> Formula:
+    def eval_bitwise_node(self, arguments: list[int], symbols: dict[str, int], mask: int) -> int:
+        return symbols[self.symbol]
+
+    @override
+    def compile_node(self, arguments: list[tuple[str, int]], context: CompileContext) -> tuple[str, int]:
+        return context.parameter(self.symbol), 0
+
+    @override
+    def substitute_node(self, arguments: list[Formula], symbol: str, formula: Formula) -> Formula:
         return formula if self.symbol == symbol else self
 
     @override
-    def get_variables(self):
-        return {self.symbol}
+    def get_variables_node(self) -> frozenset[str]:
+        return frozenset((self.symbol,))
 
     @override
-    def equals(self, other: Formula) -> bool:
-        return isinstance(other, Symbol) and self.symbol == other.symbol
+    def get_arguments(self) -> tuple:
+        return self.symbol,
@@ -0,0 +1,175 @@
+from typing import Iterable
+
+from logic.formula import Formula
+from logic.generalised_operators import GeneralisedConjunction, GeneralisedDisjunction
+from logic.literals import Symbol
+from logic.operators import Negation
+from logic.truth_table import TruthTable
+
+# Cube: (values, mask) of rows, where bits set in the mask are free, and the other bits are fixed to those of the values
+# (which are 0 wherever the mask is set). Rows are numbered as in `TruthTable`: the first variable is most significant.
+Cube = tuple[int, int]
+
+
+class Minimizer:
+    def __init__(self, variables: list[str], ones: Iterable[int], dont_cares: Iterable[int] = ()):
+        """ Two-level minimizer of the function over the given variables which is true on the rows `ones` and may take
+        either value on the rows `dont_cares`, see `disjunctive_normal_form` and `conjunctive_normal_form`. """
+        self.variables = variables
+        self.dont_cares = set(dont_cares)
+        self.ones = set(ones) - self.dont_cares
+
+    @staticmethod
+    def get_set_rows(packed: int) -> list[int]:
+        """ Return the rows whose bits are set in the given packed column. """
+        return [row for row, bit in enumerate(format(packed, 'b')[::-1]) if bit == '1']
+
+    @staticmethod
+    def from_formula(formula: Formula, dont_care: Formula | None = None, variables: list[str] | None = None) \
+            -> 'Minimizer':
+        """ Create a minimizer of the given formula, which may take either value wherever `dont_care` is true.
+        `variables` - variables of the function (default: sorted variables of both formulae). """
+        if variables is None:
+            variables = set(formula.get_variables())
+            if dont_care is not None:
+                variables.update(dont_care.get_variables())
+
+            variables = sorted(variables)
+
+        n = len(variables)
+        mask = (1 << (1 << n)) - 1
+        columns = {variable: TruthTable.column(i, n) for i, variable in enumerate(variables)}
+
+        ones = Minimizer.get_set_rows(formula.eval_bitwise(columns, mask))
+        dont_cares = () if dont_care is None else Minimizer.get_set_rows(dont_care.eval_bitwise(columns, mask))
+        return Minimizer(variables, ones, dont_cares)
+
+    @staticmethod
+    def from_truth_table(table: TruthTable, dont_cares: Iterable[int] = ()) -> 'Minimizer':
+        """ Create a minimizer of the given generated truth table, which may take either value on the rows
+        `dont_cares`. """
+        if table.packed_results is not None:
+            ones = Minimizer.get_set_rows(table.packed_results)
+        else:
+            ones = [row for row, (_, result) in enumerate(table.results) if result]
+
+        return Minimizer(table.variables, ones, dont_cares)
+
+    def get_prime_implicants(self, rows: set[int]) -> list[Cube]:
+        """ Return the prime implicants of the function true on the given rows (and the don't-care rows), by merging
+        cubes which differ in one fixed variable until no more merge (Quine-McCluskey). """
+        n = len(self.variables)
+        cubes = {(row, 0) for row in rows | self.dont_cares}
+        primes = []
+
+        while cubes:
+            merged = set()
+            combined = set()
+
+            for values, mask in cubes:
+                for i in range(n):
+                    bit = 1 << i
+
+                    # Merge with the cube whose variable `i` is 1 rather than 0
+                    if not (values | mask) & bit and (values | bit, mask) in cubes:
+                        merged.add((values, mask | bit))
+                        combined.add((values, mask))
+                        combined.add((values | bit, mask))
+
+            primes.extend(cubes - combined)
+            cubes = merged
+
+        primes.sort()
+        return primes
+
+    @staticmethod
+    def get_cube_rows(cube: Cube) -> Iterable[int]:
+        """ Return the rows in the given cube. """
+        values, mask = cube
+        free = mask
+
+        while True:
+            yield values | free
+
+            if free == 0:
+                break
+
+            free = (free - 1) & mask
+
+    def get_cover(self, rows: set[int], primes: list[Cube]) -> list[Cube]:
+        """ Choose prime implicants covering the given rows: essential primes first, then greedily those covering the
+        most uncovered rows (preferring fewer literals), finally removing any made redundant. """
+        covers = {prime: [row for row in Minimizer.get_cube_rows(prime) if row in rows] for prime in primes}
+        covered_by: dict[int, list[Cube]] = {row: [] for row in rows}
+        for prime in primes:
+            for row in covers[prime]:
+                covered_by[row].append(prime)
+
+        cover = []
+        uncovered = set(rows)
+        gains = {prime: len(covers[prime]) for prime in primes if covers[prime]}  # Prime => uncovered rows it covers
+
+        def select(prime: Cube):
+            cover.append(prime)
+
+            for row in covers[prime]:
+                if row in uncovered:
+                    uncovered.remove(row)
+
+                    for other in covered_by[row]:
+                        gains[other] -= 1
+                        if gains[other] == 0:
+                            del gains[other]
+
+        # Essential primes: the only cover of some row
+        for row in sorted(rows):
+            if row in uncovered and len(covered_by[row]) == 1:
+                select(covered_by[row][0])
+
+        while uncovered:
+            select(max(gains, key=lambda prime: (gains[prime], prime[1].bit_count())))
+
+        # Remove primes whose rows are all covered by others, latest chosen first
+        counts = {row: 0 for row in rows}
+        for prime in cover:
+            for row in covers[prime]:
+                counts[row] += 1
+
+        for prime in reversed(cover[:]):
+            if all(counts[row] > 1 for row in covers[prime]):
+                cover.remove(prime)
+
+                for row in covers[prime]:
+                    counts[row] -= 1
+
+        return cover
+
+    def minimize(self, rows: set[int]) -> list[Cube]:
+        """ Return a near-minimal list of cubes covering the given rows, and otherwise only don't-care rows. """
+        return self.get_cover(rows, self.get_prime_implicants(rows))
+
+    def get_literals(self, cube: Cube, negate=False) -> list[tuple[int, bool]]:
+        """ Return the literals fixed by the given cube (or their negations) as (variable index, value), in order of
+        variable. """
+        values, mask = cube
+        n = len(self.variables)
+        return [(i, (values >> (n - 1 - i) & 1 == 1) != negate) for i in range(n) if not mask >> (n - 1 - i) & 1]
+
+    def get_groups(self, cubes: list[Cube], negate=False) -> list[list[Formula]]:
+        """ Convert cubes to lists of symbols and negated symbols (see `get_literals`), ordered by their literals: by
+        variable, positive first. """
+        groups = sorted([(i, not value) for i, value in self.get_literals(cube, negate)] for cube in cubes)
+        return [[Negation(Symbol(self.variables[i])) if negated else Symbol(self.variables[i]) for i, negated in group]
+                for group in groups]
+
+    def disjunctive_normal_form(self) -> GeneralisedDisjunction:
+        """ Return a near-minimal DNF of the function: a disjunction of prime implicants. """
+        groups = self.get_groups(self.minimize(self.ones))
+        return GeneralisedDisjunction(*(GeneralisedConjunction(*group) for group in groups))
+
+    def conjunctive_normal_form(self) -> GeneralisedConjunction:
+        """ Return a near-minimal CNF of the function: a conjunction of clauses, each the negation of a prime implicant
+        of the function's complement. """
+        zeros = set(range(1 << len(self.variables))) - self.ones - self.dont_cares
+        groups = self.get_groups(self.minimize(zeros), True)
+        return GeneralisedConjunction(*(GeneralisedDisjunction(*group) for group in groups))
@@ -0,0 +1,280 @@
+from fractions import Fraction
+
+from logic.algorithm import classify, LITERAL_FORMULA, ALPHA_FORMULA
+from logic.formula import Formula
+from logic.normal_form import TseitinEncoder, Clause
+from logic.operators import Negation
+from logic.symbol_table import SymbolTable
+
+
+class ModelCounter:
+    def __init__(self):
+        """ Exact model counter (#SAT): DPLL over clauses, with unit propagation, splitting the clauses into components
+        which share no variables (whose counts multiply), and a cache of the counts of components already seen. """
+        self.table = SymbolTable()
+        self.cache: dict[frozenset[Clause], int] = {}  # Component => number of models over its variables
+
+        # Statistics
+        self.decisions = 0
+        self.cache_hits = 0
+
+    def get_literal(self, literal: Formula) -> int:
+        """ Convert a symbol or negated symbol to a literal (see `Clause`). """
+        if isinstance(literal, Negation):
+            return -self.get_literal(literal.data)
+
+        return self.table.add(literal.symbol) + 1
+
+    def get_clauses(self, formula: Formula, bindings: dict[str, bool] | None = None) -> list[Clause]:
+        """ Convert the formula to clauses. Conjuncts which are already clauses are taken as they are, and the others
+        encoded via `TseitinEncoder`, using full equivalences so that each auxiliary variable is determined by the
+        formula's variables, and the number of models is preserved. Bound variables occurring in the formula are fixed
+        by unit clauses. """
+        encoder = TseitinEncoder(polarity=False, reserved=formula.get_variables())
+        clauses = []
+        stack = [formula]
+
+        while stack:
+            part = stack.pop()
+            kind, parts = classify(part)
+
+            if kind == LITERAL_FORMULA:
+                if parts is not None:
+                    symbol, value = parts
+                    literal = self.table.add(symbol) + 1
+                    clauses.append(frozenset((literal if value else -literal,)))
+
+            elif kind == ALPHA_FORMULA:
+                stack.extend(parts)
+
+            else:
+                literals = [classify(literal) for literal in parts]
+
+                if all(kind == LITERAL_FORMULA for kind, _ in literals):
+                    # Drop clauses containing true
+                    if all(literal is not None for _, literal in literals):
+                        clauses.append(frozenset((self.table.add(symbol) + 1) * (1 if value else -1)
+                                                 for _, (symbol, value) in literals))
+                else:
+                    encoder.encode(part)
+
+        clauses.extend(frozenset(map(self.get_literal, clause)) for clause in encoder.clauses)
+
+        if bindings is not None:
+            for symbol in formula.get_variables():
+                if symbol in bindings:
+                    literal = self.table.add(symbol) + 1
+                    clauses.append(frozenset((literal if bindings[symbol] else -literal,)))
+
+        return clauses
+
+    def count_formula(self, formula: Formula, bindings: dict[str, bool] | None = None) -> int:
+        """ Return the number of assignments to the formula's unbound variables which satisfy it, given the bound
+        symbols, as would be counted in its truth table (see `TruthTable.set_bindings`). """
+        # Every variable of the formula is counted, even if absent from the clauses, as are the auxiliary variables of
+        # its encoding. The table also holds the variables of formulae counted before, which are not.
+        self.table.add_formula(formula)
+        clauses = self.get_clauses(formula, bindings)
+
+        variables = {self.table.get_id(symbol) + 1 for symbol in formula.get_variables()}
+        variables.update(abs(literal) for clause in clauses for literal in clause)
+        return self.count(clauses, variables)
+
+    @staticmethod
+    def assign(clauses: list[Clause], literal: int) -> list[Clause] | None:
+        """ Return the clauses with the given literal made true: satisfied clauses are removed, and the negated literal
+        removed from the rest. Return None if a clause becomes empty. """
+        result = []
+
+        for clause in clauses:
+            if literal in clause:
+                continue
+
+            if -literal in clause:
+                clause = clause.difference((-literal,))
+                if not clause:
+                    return None
+
+            result.append(clause)
+
+        return result
+
+    @staticmethod
+    def propagate(clauses: list[Clause]) -> tuple[list[Clause], set[int]] | None:
+        """ Assign the literals of unit clauses until none remain. Return the remaining clauses and the variables
+        assigned, or None if a clause became empty. """
+        assigned = set()
+
+        if any(not clause for clause in clauses):
+            return None
+
+        while True:
+            units = {next(iter(clause)) for clause in clauses if len(clause) == 1}
+            if not units:
+                return clauses, assigned
+
+            for literal in units:
+                if -literal in units:
+                    return None
+
+                clauses = ModelCounter.assign(clauses, literal)
+                if clauses is None:
+                    return None
+
+                assigned.add(abs(literal))
+
+    @staticmethod
+    def get_components(clauses: list[Clause]) -> list[tuple[list[Clause], dict[int, int]]]:
+        """ Partition the clauses into components, no two of which share a variable. Return each component's clauses,
+        and the number of its clauses each of its variables occurs in. """
+        # Clauses containing each variable
+        occurrences: dict[int, list[Clause]] = {}
+        for clause in clauses:
+            for variable in map(abs, clause):
+                if variable in occurrences:
+                    occurrences[variable].append(clause)
+                else:
+                    occurrences[variable] = [clause]
+
+        # Search outwards from each variable not yet in a component, via the clauses containing it
+        components = []
+        seen_variables: set[int] = set()
+        seen_clauses: set[Clause] = set()
+
+        for start in occurrences:
+            if start in seen_variables:
+                continue
+
+            seen_variables.add(start)
+            queue = [start]
+            component = []
+
+            for variable in queue:
+                for clause in occurrences[variable]:
+                    if clause in seen_clauses:
+                        continue
+
+                    seen_clauses.add(clause)
+                    component.append(clause)
+
+                    for other in map(abs, clause):
+                        if other not in seen_variables:
+                            seen_variables.add(other)
+                            queue.append(other)
+
+            components.append((component, {variable: len(occurrences[variable]) for variable in queue}))
+
+        return components
+
+    def count(self, clauses: list[Clause], variables: set[int]) -> int:
+        """ Return the number of assignments to the given variables (including every variable of the clauses) which
+        satisfy the clauses. Branches and components are tracked on an explicit stack (see `ComponentProduct` and
+        `ComponentBranch`), so the depth of the search is bounded only by memory. """
+        stack: list[ComponentProduct | ComponentBranch] = []
+        value = self.split(clauses, variables, stack)  # Value of the frame last finished, or None if one was pushed
+
+        while stack:
+            frame = stack[-1]
+
+            if isinstance(frame, ComponentProduct):
+                if value is not None:
+                    frame.total *= value
+
+                # A component without models leaves none to multiply
+                if frame.components and frame.total != 0:
+                    value = self.branch(*frame.components.pop(), stack)
+                    continue
+
+                stack.pop()
+                value = frame.total << frame.free
+
+            else:
+                if value is not None:
+                    frame.total += value
+
+                if frame.literals:
+                    assigned = ModelCounter.assign(frame.clauses, frame.literals.pop())
+                    value = 0 if assigned is None else self.split(assigned, frame.variables, stack)
+                    continue
+
+                stack.pop()
+                value = self.cache[frame.key] = frame.total
+
+        return value
+
+    def split(self, clauses: list[Clause], variables: set[int], stack: list) -> int | None:
+        """ Propagate the clauses and split them into components, pushing a `ComponentProduct` counting the models of
+        the given variables. Return the number of models instead if it is known without branching. """
+        propagated = ModelCounter.propagate(clauses)
+        if propagated is None:
+            return 0
+
+        clauses, assigned = propagated
+        components = ModelCounter.get_components(clauses)
+
+        # Variables in no clause are unconstrained
+        free = len(variables) - len(assigned) - sum(len(occurrences) for _, occurrences in components)
+
+        if not components:
+            return 1 << free
+
+        stack.append(ComponentProduct(components, free))
+        return None
+
+    def branch(self, clauses: list[Clause], occurrences: dict[int, int], stack: list) -> int | None:
+        """ Push a `ComponentBranch` counting the models of a component over its variables, unless its count is cached,
+        in which case return it. `occurrences` - the number of clauses each variable of the component occurs in. """
+        key = frozenset(clauses)
+        if key in self.cache:
+            self.cache_hits += 1
+            return self.cache[key]
+
+        # Branch on the variable occurring most often
+        variable = max(occurrences, key=occurrences.get)
+        variables = set(occurrences)
+        variables.remove(variable)
+        self.decisions += 1
+
+        stack.append(ComponentBranch(key, variable, variables))
+        return None
+
+    def get_statistics(self) -> dict[str, int]:
+        """ Return the counters of the counts so far. """
+        return {
+            'decisions': self.decisions,
+            'cache hits': self.cache_hits,
+            'cached components': len(self.cache),
+        }
+
+
+class ComponentProduct:
+    def __init__(self, components: list[tuple[list[Clause], dict[int, int]]], free: int):
+        """ Frame of `ModelCounter.count`: the number of models of clauses split into the given components, whose counts
+        multiply (see `ModelCounter.get_components`). `free` - number of unconstrained variables, each doubling the
+        count. """
+        self.components = components  # Components still to count
+        self.free = free
+        self.total = 1  # Product of the counts of the components counted so far
+
+
+class ComponentBranch:
+    def __init__(self, key: frozenset[Clause], variable: int, variables: set[int]):
+        """ Frame of `ModelCounter.count`: the number of models of a component (`key`), summed over both values of the
+        variable branched on. `variables` - the component's other variables. """
+        self.key = key
+        self.clauses = list(key)
+        self.literals = [-variable, variable]  # Literals still to assign
+        self.variables = variables
+        self.total = 0  # Sum of the counts of the branches counted so far
+
+
+def count_models(formula: Formula, bindings: dict[str, bool] | None = None) -> int:
+    """ Return the number of assignments to the formula's unbound variables which satisfy it, without enumerating
+    them. """
+    return ModelCounter().count_formula(formula, bindings)
+
+
+def get_model_fraction(formula: Formula, bindings: dict[str, bool] | None = None) -> Fraction:
+    """ Return the fraction of assignments to the formula's unbound variables which satisfy it. """
+    free = [variable for variable in formula.get_variables() if bindings is None or variable not in bindings]
+    return Fraction(count_models(formula, bindings), 1 << len(free))
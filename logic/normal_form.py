@@ -1,10 +1,12 @@
-from typing import Callable
-
-from logic.algorithm import extract_alpha_formula, extract_beta_formula
+from logic.algorithm import classify, LITERAL_FORMULA, ALPHA_FORMULA, BETA_FORMULA
 from logic.formula import Formula
 from logic.generalised_operators import GeneralisedConjunction, GeneralisedDisjunction, GeneralisedOperator
-from logic.literals import Bottom, Top
+from logic.literals import Bottom, Top, Symbol, Literal
 from logic.operators import Negation, BinaryOperator
+from logic.symbol_table import SymbolTable
+
+# Clause: literals of an inner group; variable `i` of a symbol table is literal `i + 1`, and its negation `-(i + 1)`
+Clause = frozenset[int]
 
 
 class NormalForm:
@@ -13,6 +15,7 @@ class NormalForm:
         self.inner: type[GeneralisedConjunction | GeneralisedDisjunction] | None = None
         self.outer: type[GeneralisedConjunction | GeneralisedDisjunction] | None = None
         self.inner_op: BinaryOperator | None = None
+        self.table: SymbolTable | None = None  # Ids of variables, see `Clause`
 
     def configure(self,
                   inner: type[GeneralisedConjunction | GeneralisedDisjunction],
@@ -34,140 +37,74 @@ class NormalForm:
         self.inner_op = self.inner.get_operator()
         self.outer = GeneralisedDisjunction
 
-    def split_formula(self, parts: list[Formula], outer_formulae: list[GeneralisedOperator], outer_index: int,
-                      inner_index_skip: int):
-        """ Given a list of formulae, create a split in outer_formula. `outer_index` points to the current outer
-        formula; copy all segments but `inner_index_skip`. """
-        copy_segment = outer_formulae[outer_index][:inner_index_skip] + outer_formulae[outer_index][inner_index_skip+1:]
-
-        for part in parts:
-            outer_formulae.append(self.inner(*copy_segment, part))
-            self.prepare_formula(outer_formulae, len(outer_formulae) - 1, len(copy_segment))
-
-    def prepare_formula(self, outer_formulae: list[GeneralisedOperator], outer_index: int, inner_index=0,
-                        inner_index_upper: int | None = None):
-        """ Prepare formula for algorithm: replace all `inner_op` with commas,
-        resolve generalised (con/dis)junctions. """
-        formulae = outer_formulae[outer_index]
-
-        while (inner_index_upper is None or inner_index < inner_index_upper) and inner_index < len(formulae):
-            formula: Formula = formulae[inner_index]
-
-            # Operator: separate via commas
-            if isinstance(formula, self.inner_op):
-                formulae.append(formula.left)
-                formulae.append(formula.right)
-                formulae.pop(inner_index)
-
-            # inner generalised: merge into current
-            elif isinstance(formula, self.inner):
-                formulae.extend(formula)
-                formulae.pop(inner_index)
-
-            # outer generalised: split across
-            elif isinstance(formula, self.outer):
-                self.split_formula(formula, outer_formulae, outer_index, inner_index)
-                formulae.pop(inner_index)
+    def get_clauses(self, formula: Formula) -> set[Clause]:
+        """ Return the inner groups of the formula's normal form as clauses of literals (see `Clause`). Clauses are
+        distributed bottom-up, once per distinct sub-formula; repeated literals and clauses are merged, and clauses
+        containing complementary literals (equal to the outer group's neutral element) are dropped. """
+        # Distribute when the kind of formula matches the inner group, e.g., a disjunction of conjunctions in CNF
+        distribute_kind = ALPHA_FORMULA if self.inner is GeneralisedConjunction else BETA_FORMULA
 
-            else:
-                inner_index += 1
-
-    def process_formula(self, outer_formulae: list[GeneralisedOperator], outer_index: int,
-                        inner_formulae: list[Formula], inner_index: int,
-                        extract_fn: Callable[[Formula], tuple[Formula | None, Formula | None]],
-                        do_split: bool) -> tuple[bool, bool | None]:
-        """ Handle alpha or beta formula, splitting or cloning as necessary,
-        return (was action taken, requires break). """
-        formula: Formula = outer_formulae[outer_index][inner_index]
-        p1, p2 = extract_fn(formula)
-
-        if p1 is not None:
-            if do_split:
-                # Split formula, remove current part
-                self.split_formula([p1, p2], outer_formulae, outer_index, inner_index)
-                outer_formulae.pop(outer_index)
-                return True, True
-            else:
-                # Add both to current clause, remove old formula
-                inner_formulae.append(p1)
-                inner_formulae.append(p2)
-                inner_formulae.pop(inner_index)
-                self.prepare_formula(outer_formulae, outer_index, len(inner_formulae) - 2)
-                return True, False
+        clauses: dict[Formula, set[Clause]] = {}
+        expanded: dict[Formula, tuple[int, list[Formula] | tuple[str, bool] | None]] = {}
+        stack = [formula]
 
-        return False, None
+        while stack:
+            current = stack[-1]
+            if current in clauses:
+                stack.pop()
+                continue
 
-    def transform(self, original: Formula) -> GeneralisedOperator:
-        """ Run normal form given loaded configuration. Return result. """
+            if current not in expanded:
+                kind, parts = classify(current)
 
-        # Place in inner/outer groups to seed
-        outer_formulae = [self.inner(original)]
-        self.prepare_formula(outer_formulae, 0)
+                # Top is an alpha formula with no components
+                if kind == LITERAL_FORMULA and parts is None:
+                    kind, parts = ALPHA_FORMULA, []
 
-        # Split alpha formula: alpha formulae involve conjunction, so split if inner is disjunction
-        alpha_split = self.inner == GeneralisedDisjunction
+                expanded[current] = kind, parts
 
-        i = 0
-        while i < len(outer_formulae):
-            inner_formulae = outer_formulae[i]
-            j = 0
-
-            while j < len(inner_formulae):
-                formula = inner_formulae[j]
-
-                # neg top = bottom
-                if isinstance(formula, Negation) and isinstance(formula.data, Top):
-                    inner_formulae[j] = Bottom()
-                    j += 1
+                if kind != LITERAL_FORMULA:
+                    stack.extend(part for part in parts if part not in clauses)
                     continue
 
-                # neg bottom = top
-                if isinstance(formula, Negation) and isinstance(formula.data, Bottom):
-                    inner_formulae[j] = Top()
-                    j += 1
-                    continue
+            kind, parts = expanded.pop(current)
+            stack.pop()
 
-                # neg neg X = X
-                if isinstance(formula, Negation) and isinstance(formula.data, Negation):
-                    inner_formulae[j] = formula.data.data
-                    continue
+            if kind == LITERAL_FORMULA:
+                symbol, value = parts
+                literal = self.table.add(symbol) + 1
+                clauses[current] = {frozenset((literal if value else -literal,))}
 
-                # Break up any generalised operators to make them decomposable
-                if isinstance(formula, GeneralisedOperator):
-                    inner_formulae[j] = formula.decompose(True)
-                    break
+            elif kind == distribute_kind:
+                result = {frozenset()}
+                for part in parts:
+                    result = {clause | other for clause in result for other in clauses[part]
+                              if not any(-literal in clause for literal in other)}
 
-                if isinstance(formula, Negation) and isinstance(formula.data, GeneralisedOperator):
-                    inner_formulae[j] = Negation(formula.data.decompose(True))
-                    break
+                clauses[current] = result
 
-                # alpha formula
-                ok, requires_break = self.process_formula(outer_formulae, i, inner_formulae, j,
-                                                          extract_alpha_formula, alpha_split)
-                if ok:
-                    if requires_break:
-                        break
+            else:
+                clauses[current] = set().union(*(clauses[part] for part in parts))
 
-                    continue
+        return clauses[formula]
 
-                # beta formula
-                ok, requires_break = self.process_formula(outer_formulae, i, inner_formulae, j,
-                                                          extract_beta_formula, not alpha_split)
-                if ok:
-                    if requires_break:
-                        break
+    def get_literal(self, literal: int) -> Formula:
+        """ Convert a literal of a clause to a symbol or negated symbol. """
+        symbol = Symbol(self.table.get_name(abs(literal) - 1))
+        return symbol if literal > 0 else Negation(symbol)
 
-                    continue
+    def transform(self, original: Formula) -> GeneralisedOperator:
+        """ Run normal form given loaded configuration. Return result. """
+        self.table = SymbolTable.from_formula(original)
 
-                j += 1
+        # Order literals by variable, positive first, and clauses by their literals
+        def key(literal: int) -> tuple[int, bool]:
+            return abs(literal), literal < 0
 
-            else:
-                i += 1
+        clauses = [sorted(clause, key=key) for clause in self.get_clauses(original)]
+        clauses.sort(key=lambda clause: [key(literal) for literal in clause])
 
-        # Remove empty clauses
-        normal_formula = self.outer(*outer_formulae)
-        normal_formula.remove_empty_nested()
-        return normal_formula
+        return self.outer(*(self.inner(*map(self.get_literal, clause)) for clause in clauses))
 
     @staticmethod
     def conjunctive_normal_form(formula: Formula) -> GeneralisedOperator:
@@ -180,3 +117,267 @@ class NormalForm:
         nf = NormalForm()
         nf.configure_disjunctive_normal_form()
         return nf.transform(formula)
+
+    @staticmethod
+    def tseitin_conjunctive_normal_form(formula: Formula, polarity=True, prefix='t') \
+            -> tuple[GeneralisedConjunction, dict[Symbol, Formula]]:
+        """ Return an equisatisfiable CNF of linear size, introducing an auxiliary symbol per sub-formula, and a map of
+        auxiliary symbols to the sub-formulae they stand for. `polarity` - if True, only emit the implications a
+        sub-formula's polarity requires (Plaisted-Greenbaum). Otherwise, emit full equivalences (Tseitin), which also
+        preserves the number of models. """
+        encoder = TseitinEncoder(prefix, polarity, formula.get_variables())
+        encoder.encode(formula)
+        return encoder.get_formula(), encoder.definitions
+
+
+class TseitinEncoder:
+    # Polarities a sub-formula occurs in, as bit flags
+    POSITIVE = 1
+    NEGATIVE = 2
+    BOTH = POSITIVE | NEGATIVE
+
+    def __init__(self, prefix='t', polarity=True, reserved: set[str] | None = None):
+        """ Encode formulae as definitional CNF clauses. Auxiliary symbols are named `<prefix><n>`, skipping any name
+        in `reserved`. `polarity` - see `NormalForm.tseitin_conjunctive_normal_form`. """
+        self.prefix = prefix
+        self.polarity = polarity
+        self.reserved = set() if reserved is None else set(reserved)
+        self.counter = 0
+        self.clauses: list[GeneralisedDisjunction] = []
+        self.definitions: dict[Symbol, Formula] = {}  # Auxiliary symbol => sub-formula
+        self.literals: dict[Formula, Formula] = {}  # Sub-formula => literal standing for it
+        self.emitted: dict[Formula, int] = {}  # Sub-formula => polarities whose clauses were emitted
+
+    def encode(self, formula: Formula):
+        """ Add clauses asserting the given formula. """
+        literal = self.get_literal(formula, TseitinEncoder.POSITIVE)
+        self.add_clause(literal)
+
+    def get_formula(self) -> GeneralisedConjunction:
+        """ Return the conjunction of all clauses emitted so far. """
+        return GeneralisedConjunction(*self.clauses)
+
+    def new_symbol(self, formula: Formula) -> Symbol:
+        """ Create a fresh auxiliary symbol standing for the given formula. """
+        while True:
+            self.counter += 1
+            name = self.prefix + str(self.counter)
+
+            if name not in self.reserved:
+                break
+
+        symbol = Symbol(name)
+        self.definitions[symbol] = formula
+        return symbol
+
+    def add_clause(self, *literals: Formula):
+        """ Add a clause of the given literals, dropping satisfied clauses, false and repeated literals. """
+        if any(isinstance(literal, Top) for literal in literals):
+            return
+
+        self.clauses.append(GeneralisedDisjunction(*dict.fromkeys(literal for literal in literals
+                                                                  if not isinstance(literal, Bottom))))
+
+    @staticmethod
+    def negate(literal: Formula) -> Formula:
+        """ Negate a literal (symbol, negated symbol, top or bottom). """
+        if isinstance(literal, Negation):
+            return literal.data
+
+        if isinstance(literal, Top) or isinstance(literal, Bottom):
+            return Literal.from_bool(not literal.eval_const())
+
+        return Negation(literal)
+
+    @staticmethod
+    def flip(polarity: int) -> int:
+        """ Swap positive and negative polarity. """
+        return ((polarity & TseitinEncoder.POSITIVE) << 1) | ((polarity & TseitinEncoder.NEGATIVE) >> 1)
+
+    def get_literal(self, formula: Formula, polarity: int) -> Formula:
+        """ Return a literal equisatisfiably standing for `formula`, emitting its definition for the given polarity.
+        The polarities each sub-formula occurs in are found top-down, then sub-formulae are encoded bottom-up, so the
+        depth of a formula is bounded only by memory. """
+        order = formula.post_order()
+
+        # Polarities each sub-formula occurs in, then (once its parents are visited) those not yet emitted. Parents
+        # precede their children in reverse post-order.
+        polarities: dict[Formula, int] = {formula: polarity}
+        for node in reversed(order):
+            node_polarity = polarities.get(node, 0)
+
+            if isinstance(node, Literal):
+                continue
+
+            if not isinstance(node, Negation):
+                if not self.polarity:
+                    node_polarity = TseitinEncoder.BOTH
+
+                # Only emit definitions for polarities not seen before
+                node_polarity &= ~self.emitted.get(node, 0)
+                polarities[node] = node_polarity
+
+            for child, child_polarity in zip(node.get_children(), self.get_child_polarities(node, node_polarity)):
+                polarities[child] = polarities.get(child, 0) | child_polarity
+
+        for node in order:
+            node_polarity = polarities.get(node, 0)
+
+            if isinstance(node, Literal) or isinstance(node, Negation) or node_polarity == 0:
+                continue
+
+            self.emitted[node] = self.emitted.get(node, 0) | node_polarity
+
+            if isinstance(node, BinaryOperator):
+                self.literals[node] = self.get_binary_literal(node, node_polarity)
+            else:
+                self.literals[node] = self.get_generalised_literal(node, node_polarity)
+
+        return self.get_encoded(formula)
+
+    def get_encoded(self, formula: Formula) -> Formula:
+        """ Return the literal standing for an already encoded sub-formula. """
+        negated = False
+        while isinstance(formula, Negation):
+            formula = formula.data
+            negated = not negated
+
+        literal = formula if isinstance(formula, Literal) else self.literals[formula]
+        return TseitinEncoder.negate(literal) if negated else literal
+
+    @staticmethod
+    def get_child_polarities(formula: Formula, polarity: int) -> list[int]:
+        """ Return the polarities the children of a formula occurring in the given polarity occur in. """
+        if isinstance(formula, Negation):
+            return [TseitinEncoder.flip(polarity)]
+
+        if isinstance(formula, GeneralisedOperator):
+            # Monotonic in every argument
+            return [polarity] * len(formula.get_children())
+
+        if not isinstance(formula, BinaryOperator):
+            raise ValueError(f"cannot encode formula: {formula}")
+
+        op = formula.op
+
+        # Children inherit our polarity where op is monotonic in them, the flipped polarity where anti-monotonic
+        left_polarity, right_polarity = TseitinEncoder.BOTH, TseitinEncoder.BOTH
+        if all(op(False, b) <= op(True, b) for b in (False, True)):
+            left_polarity = polarity
+        elif all(op(False, b) >= op(True, b) for b in (False, True)):
+            left_polarity = TseitinEncoder.flip(polarity)
+
+        if all(op(a, False) <= op(a, True) for a in (False, True)):
+            right_polarity = polarity
+        elif all(op(a, False) >= op(a, True) for a in (False, True)):
+            right_polarity = TseitinEncoder.flip(polarity)
+
+        return [left_polarity, right_polarity]
+
+    def get_binary_literal(self, formula: BinaryOperator, polarity: int) -> Formula:
+        """ Encode a binary operator, x <-> op(a, b), given its truth function. Its children must already be encoded. """
+        op = formula.op
+        left = self.get_encoded(formula.left)
+        right = self.get_encoded(formula.right)
+
+        # Fold constant arguments
+        left_value, right_value = left.eval_const(), right.eval_const()
+        if left_value is not None and right_value is not None:
+            return Literal.from_bool(op(left_value, right_value))
+
+        if left_value is not None or right_value is not None:
+            literal = right if left_value is not None else left
+            on_false = op(False, right_value) if left_value is None else op(left_value, False)
+            on_true = op(True, right_value) if left_value is None else op(left_value, True)
+
+            if on_false == on_true:
+                return Literal.from_bool(on_true)
+
+            return literal if on_true else TseitinEncoder.negate(literal)
+
+        symbol = self.literals[formula] if formula in self.literals else self.new_symbol(formula)
+        arguments = (left, right)
+
+        # x -> op(a, b): rule out every assignment making op false
+        if polarity & TseitinEncoder.POSITIVE:
+            falsifying = {(a, b) for a in (False, True) for b in (False, True) if not op(a, b)}
+            for cube in TseitinEncoder.cover(falsifying):
+                self.add_clause(Negation(symbol), *(TseitinEncoder.negate(arguments[i]) if value else arguments[i]
+                                                    for i, value in cube))
+
+        # op(a, b) -> x: every assignment making op true implies x
+        if polarity & TseitinEncoder.NEGATIVE:
+            satisfying = {(a, b) for a in (False, True) for b in (False, True) if op(a, b)}
+            for cube in TseitinEncoder.cover(satisfying):
+                self.add_clause(symbol, *(TseitinEncoder.negate(arguments[i]) if value else arguments[i]
+                                          for i, value in cube))
+
+        return symbol
+
+    @staticmethod
+    def cover(points: set[tuple[bool, bool]]) -> list[tuple[tuple[int, bool], ...]]:
+        """ Return a minimal list of cubes, each a tuple of (argument index, value) conditions, covering exactly the
+        given points of a two-argument truth table. """
+        cubes = []
+        covered = set()
+
+        # Single conditions, i.e., an entire row or column of the truth table
+        for index in (0, 1):
+            for value in (False, True):
+                cube_points = {point for point in ((False, False), (False, True), (True, False), (True, True))
+                               if point[index] == value}
+
+                if cube_points <= points:
+                    cubes.append(((index, value),))
+                    covered |= cube_points
+
+        # Remaining single points
+        for point in sorted(points - covered):
+            cubes.append(((0, point[0]), (1, point[1])))
+
+        return cubes
+
+    def get_generalised_literal(self, formula: GeneralisedOperator, polarity: int) -> Formula:
+        """ Encode a generalised con- or disjunction, which is monotonic in every argument. Its arguments must already be
+        encoded. """
+        neutral = formula.get_neutral()
+
+        # Fold constant arguments
+        arguments = []
+        for argument in formula:
+            literal = self.get_encoded(argument)
+            value = literal.eval_const()
+
+            if value is None:
+                if literal not in arguments:
+                    arguments.append(literal)
+            elif value != neutral:
+                return Literal.from_bool(value)
+
+        if len(arguments) == 0:
+            return Literal.from_bool(neutral)
+
+        if len(arguments) == 1:
+            return arguments[0]
+
+        symbol = self.literals[formula] if formula in self.literals else self.new_symbol(formula)
+
+        # Conjunction: x -> each argument, all arguments -> x
+        if neutral:
+            if polarity & TseitinEncoder.POSITIVE:
+                for argument in arguments:
+                    self.add_clause(Negation(symbol), argument)
+
+            if polarity & TseitinEncoder.NEGATIVE:
+                self.add_clause(symbol, *map(TseitinEncoder.negate, arguments))
+
+        # Disjunction: x -> some argument, each argument -> x
+        else:
+            if polarity & TseitinEncoder.POSITIVE:
+                self.add_clause(Negation(symbol), *arguments)
+
+            if polarity & TseitinEncoder.NEGATIVE:
+                for argument in arguments:
+                    self.add_clause(symbol, TseitinEncoder.negate(argument))
+
+        return symbol
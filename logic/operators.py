@@ -1,29 +1,43 @@
 from __future__ import annotations
 from typing import override
 
-from logic.formula import Formula
+from logic.formula import Formula, CompileContext
 from logic.literals import Bottom, Top, Literal
 
 
 class Operator(Formula):
-    pass
+    __slots__ = ()
 
 
 class BinaryOperator(Operator):
-    def __init__(self, symbol: str, left, right):
+    __slots__ = ('left', 'right')
+    symbol: str  # Display symbol; set by each operator
+
+    def __init__(self, left, right):
         super().__init__()
-        self.symbol = symbol
         self.left = left
         self.right = right
 
     @override
-    def eval(self, symbols: dict[str, bool]):
-        return self.op(self.left.eval(symbols), self.right.eval(symbols))
+    def get_children(self) -> tuple[Formula, ...]:
+        return self.left, self.right
 
     @override
-    def eval_const(self):
-        left = self.left.eval_const()
-        right = self.right.eval_const()
+    def eval_node(self, arguments: list[bool], symbols: dict[str, bool]) -> bool:
+        return self.op(*arguments)
+
+    @override
+    def eval_bitwise_node(self, arguments: list[int], symbols: dict[str, int], mask: int) -> int:
+        return self.op_bitwise(*arguments, mask)
+
+    @override
+    def compile_node(self, arguments: list[tuple[str, int]], context: CompileContext) -> tuple[str, int]:
+        (left, left_depth), (right, right_depth) = arguments
+        return context.expression(self.op_source(left, right), 1 + max(left_depth, right_depth))
+
+    @override
+    def eval_const_node(self, arguments: list[bool | None]) -> bool | None:
+        left, right = arguments
 
         # left=T/F, right=T/F
         if left is not None and right is not None:
@@ -44,19 +58,12 @@ class BinaryOperator(Operator):
         return eval_true if eval_true == eval_false else None
 
     @override
-    def substitute(self, symbol: str, formula: Formula) -> Formula:
-        return self.__class__(self.left.substitute(symbol, formula), self.right.substitute(symbol, formula))
-
-    def __str__(self):
-        return f"({self.left} {self.symbol} {self.right})"
-
-    @override
-    def equals(self, other: Formula) -> bool:
-        return isinstance(other, self.__class__) and self.left.equals(other.left) and self.right.equals(other.right)
+    def get_string_parts(self) -> list[str | Formula]:
+        return ['(', self.left, f' {self.symbol} ', self.right, ')']
 
     @override
-    def get_variables(self):
-        return self.left.get_variables() | self.right.get_variables()
+    def get_arguments(self) -> tuple:
+        return self.left, self.right
 
     def negate(self) -> type(BinaryOperator):
         """ Negate this operator """
@@ -66,15 +73,10 @@ class BinaryOperator(Operator):
         return self.negate()
 
     @override
-    def simplify(self) -> Formula:
+    def simplify_node(self, arguments: list[Formula]) -> Formula:
         """ Simplify the given formula (basic only; no fancy expansions). """
-        # Check if constant; that'd be silly
-        value = self.eval_const()
-        if value is not None:
-            return Literal.from_bool(value)
-
         # Call __simplify with simplified arguments
-        left, right = self.left.simplify(), self.right.simplify()
+        left, right = arguments
         simplified = self._simplify(left, right)
 
         # Pass with simplified arguments, or return fully simplified stub
@@ -84,21 +86,42 @@ class BinaryOperator(Operator):
         """ Helper for simplify(): Default is to negate the simplified negated variant, so override
         lest a stack overflow ensue. Note, this method assumes that this operator does not return a constant value. """
         # Please override in at least one negation pair for each operator
-        return Negation(self.negate()).simplify()
+        negated = self.get_negated()
+        simplified = negated._simplify(self, left, right)
+        return Negation.negate_simplified(negated(left, right) if simplified is None else simplified)
 
     def op(self, a, b):
         # Please override
         raise NotImplementedError
 
+    def op_bitwise(self, a: int, b: int, mask: int) -> int:
+        """ Apply `op` to every bit of the packed columns `a` and `b` at once. `mask` has a bit set for every row;
+        use it to complement a column (`x ^ mask`). """
+        # Please override
+        raise NotImplementedError
+
+    def op_source(self, a: str, b: str) -> str:
+        """ Return Python source applying `op` to the boolean expressions `a` and `b`. """
+        # Please override
+        raise NotImplementedError
+
 
 class AndOperator(BinaryOperator):
-    def __init__(self, left, right):
-        super().__init__('∧', left, right)
+    __slots__ = ()
+    symbol = '∧'
 
     @override
     def op(self, a, b):
         return a and b
 
+    @override
+    def op_bitwise(self, a: int, b: int, mask: int) -> int:
+        return a & b
+
+    @override
+    def op_source(self, a: str, b: str) -> str:
+        return f'({a} and {b})'
+
     @override
     def _simplify(self, left: Formula, right: Formula) -> Formula | None:
         # L = R
@@ -127,13 +150,21 @@ class AndOperator(BinaryOperator):
 
 
 class NandOperator(BinaryOperator):
-    def __init__(self, left, right):
-        super().__init__('↑', left, right)
+    __slots__ = ()
+    symbol = '↑'
 
     @override
     def op(self, a, b):
         return not (a and b)
 
+    @override
+    def op_bitwise(self, a: int, b: int, mask: int) -> int:
+        return (a & b) ^ mask
+
+    @override
+    def op_source(self, a: str, b: str) -> str:
+        return f'(not ({a} and {b}))'
+
     @override
     def negate(self) -> type(BinaryOperator):
         return AndOperator(self.left, self.right)
@@ -143,13 +174,21 @@ class NandOperator(BinaryOperator):
         return AndOperator
 
 class OrOperator(BinaryOperator):
-    def __init__(self, left, right):
-        super().__init__('∨', left, right)
+    __slots__ = ()
+    symbol = '∨'
 
     @override
     def op(self, a, b):
         return a or b
 
+    @override
+    def op_bitwise(self, a: int, b: int, mask: int) -> int:
+        return a | b
+
+    @override
+    def op_source(self, a: str, b: str) -> str:
+        return f'({a} or {b})'
+
     @override
     def _simplify(self, left: Formula, right: Formula) -> Formula | None:
         # L = R
@@ -178,13 +217,21 @@ class OrOperator(BinaryOperator):
 
 
 class NorOperator(BinaryOperator):
-    def __init__(self, left, right):
-        super().__init__('↓', left, right)
+    __slots__ = ()
+    symbol = '↓'
 
     @override
     def op(self, a, b):
         return not (a or b)
 
+    @override
+    def op_bitwise(self, a: int, b: int, mask: int) -> int:
+        return (a | b) ^ mask
+
+    @override
+    def op_source(self, a: str, b: str) -> str:
+        return f'(not ({a} or {b}))'
+
     @override
     def negate(self) -> type(BinaryOperator):
         return OrOperator(self.left, self.right)
@@ -195,13 +242,21 @@ class NorOperator(BinaryOperator):
 
 
 class ImpliesOperator(BinaryOperator):
-    def __init__(self, left, right):
-        super().__init__('→', left, right)
+    __slots__ = ()
+    symbol = '→'
 
     @override
     def op(self, a, b):
         return not a or b
 
+    @override
+    def op_bitwise(self, a: int, b: int, mask: int) -> int:
+        return (a ^ mask) | b
+
+    @override
+    def op_source(self, a: str, b: str) -> str:
+        return f'(not {a} or {b})'
+
     @override
     def negate(self) -> type(BinaryOperator):
         return NotImpliesOperator(self.left, self.right)
@@ -234,12 +289,18 @@ class ImpliesOperator(BinaryOperator):
 
 
 class NotImpliesOperator(BinaryOperator):
-    def __init__(self, left, right):
-        super().__init__('↛', left, right)
+    __slots__ = ()
+    symbol = '↛'
 
     def op(self, a, b):
         return not (not a or b)
 
+    def op_bitwise(self, a: int, b: int, mask: int) -> int:
+        return a & (b ^ mask)
+
+    def op_source(self, a: str, b: str) -> str:
+        return f'({a} and not {b})'
+
     def negate(self) -> type(BinaryOperator):
         return ImpliesOperator(self.left, self.right)
 
@@ -249,13 +310,21 @@ class NotImpliesOperator(BinaryOperator):
 
 
 class ReverseImpliesOperator(BinaryOperator):
-    def __init__(self, left, right):
-        super().__init__('←', left, right)
+    __slots__ = ()
+    symbol = '←'
 
     @override
     def op(self, a, b):
         return a or not b
 
+    @override
+    def op_bitwise(self, a: int, b: int, mask: int) -> int:
+        return a | (b ^ mask)
+
+    @override
+    def op_source(self, a: str, b: str) -> str:
+        return f'({a} or not {b})'
+
     @override
     def negate(self) -> type(BinaryOperator):
         return ReverseNotImpliesOperator(self.left, self.right)
@@ -288,12 +357,18 @@ class ReverseImpliesOperator(BinaryOperator):
 
 
 class ReverseNotImpliesOperator(BinaryOperator):
-    def __init__(self, left, right):
-        super().__init__('↚', left, right)
+    __slots__ = ()
+    symbol = '↚'
 
     def op(self, a, b):
         return not (a or not b)
 
+    def op_bitwise(self, a: int, b: int, mask: int) -> int:
+        return (a ^ mask) & b
+
+    def op_source(self, a: str, b: str) -> str:
+        return f'(not {a} and {b})'
+
     def negate(self) -> type(BinaryOperator):
         return ReverseImpliesOperator(self.left, self.right)
 
@@ -303,13 +378,21 @@ class ReverseNotImpliesOperator(BinaryOperator):
 
 
 class EqualityOperator(BinaryOperator):
-    def __init__(self, left, right):
-        super().__init__('=', left, right)
+    __slots__ = ()
+    symbol = '='
 
     @override
     def op(self, a, b):
         return a == b
 
+    @override
+    def op_bitwise(self, a: int, b: int, mask: int) -> int:
+        return (a ^ b) ^ mask
+
+    @override
+    def op_source(self, a: str, b: str) -> str:
+        return f'({a} == {b})'
+
     @override
     def negate(self) -> type(BinaryOperator):
         return NonEqualityOperator(self.left, self.right)
@@ -331,13 +414,21 @@ class EqualityOperator(BinaryOperator):
 
 
 class NonEqualityOperator(BinaryOperator):
-    def __init__(self, left, right):
-        super().__init__('≠', left, right)
+    __slots__ = ()
+    symbol = '≠'
 
     @override
     def op(self, a, b):
         return a != b
 
+    @override
+    def op_bitwise(self, a: int, b: int, mask: int) -> int:
+        return a ^ b
+
+    @override
+    def op_source(self, a: str, b: str) -> str:
+        return f'({a} != {b})'
+
     @override
     def negate(self) -> type(BinaryOperator):
         return EqualityOperator(self.left, self.right)
@@ -348,53 +439,55 @@ class NonEqualityOperator(BinaryOperator):
 
 
 class Negation(Operator):
+    __slots__ = ('data',)
+
     def __init__(self, data):
         self.data = data
 
-    def __str__(self):
-        return '¬' + str(self.data)
+    @override
+    def get_string_parts(self) -> list[str | Formula]:
+        return ['¬', self.data]
 
     @override
-    def get_variables(self):
-        return self.data.get_variables()
+    def get_children(self) -> tuple[Formula, ...]:
+        return self.data,
 
     @override
-    def eval(self, symbols: dict[str, bool]):
-        return not self.data.eval(symbols)
+    def eval_node(self, arguments: list[bool], symbols: dict[str, bool]) -> bool:
+        return not arguments[0]
 
     @override
-    def eval_const(self):
-        ans = self.data.eval_const()
-        return None if ans is None else not ans
+    def eval_bitwise_node(self, arguments: list[int], symbols: dict[str, int], mask: int) -> int:
+        return arguments[0] ^ mask
 
     @override
-    def substitute(self, symbol: str, formula: Formula) -> Formula:
-        return Negation(self.data.substitute(symbol, formula))
+    def compile_node(self, arguments: list[tuple[str, int]], context: CompileContext) -> tuple[str, int]:
+        source, depth = arguments[0]
+        return context.expression(f'(not {source})', depth + 1)
 
     @override
-    def equals(self, other: Formula) -> bool:
-        return isinstance(other, Negation) and self.data.equals(other.data)
+    def eval_const_node(self, arguments: list[bool | None]) -> bool | None:
+        ans = arguments[0]
+        return None if ans is None else not ans
 
     @override
-    def simplify(self) -> Formula:
-        # Double negation? We can be slightly more efficient.
-        if isinstance(self.data, Negation):
-            simplified = self.data.data.simplify()
-            value = simplified.eval_const()
+    def get_arguments(self) -> tuple:
+        return self.data,
+
+    @override
+    def simplify_node(self, arguments: list[Formula]) -> Formula:
+        return Negation.negate_simplified(arguments[0])
+
+    @staticmethod
+    def negate_simplified(simplified: Formula) -> Formula:
+        """ Return the simplified negation of the given simplified formula. """
+        value = simplified.eval_const()
 
-            if value is None:
-                return simplified
-            else:
-                return Literal.from_bool(value)
+        if value is None:
+            # Double negation
+            return simplified.data if isinstance(simplified, Negation) else Negation(simplified)
         else:
-            simplified = self.data.simplify()
-            value = simplified.eval_const()
-
-            if value is None:
-                # Check for last-minute double-negation
-                return simplified.data if isinstance(simplified, Negation) else Negation(simplified)
-            else:
-                return Literal.from_bool(not value)
+            return Literal.from_bool(not value)
 
     @staticmethod
     def nest(formula: Formula, n: int) -> Formula:
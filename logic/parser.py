@@ -1,225 +1,244 @@
-from typing import Any, Callable
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, BrokenExecutor
+from itertools import islice
+from typing import Iterable, Iterator
 
 from logic.formula import Formula
 from logic.generalised_operators import GeneralisedDisjunction, GeneralisedConjunction
-from logic.literals import Symbol, Top, Bottom
-from logic.operators import AndOperator, OrOperator, ImpliesOperator, ReverseImpliesOperator, EqualityOperator, \
-    Negation, BinaryOperator, NonEqualityOperator
+from logic.lexer import Lexer, Token
+from logic.operators import Negation, BinaryOperator
 
 
-class Parser:
-    # Map of binary operators; string => operator
-    binary_operators: dict[str, type(BinaryOperator)] = {
-        '&': AndOperator,
-        '.': AndOperator,
-        '^': AndOperator,
-        '|': OrOperator,
-        '+': OrOperator,
-        'v': OrOperator,
-        '->': ImpliesOperator,
-        '<-': ReverseImpliesOperator,
-        '=': EqualityOperator,
-        '(+)': NonEqualityOperator,
-    }
-
-    def __init__(self):
-        self.index = 0
-        self.string = ""
-
-    def eat_whitespace(self):
-        """ Each whitespace from string[index]. """
-        while self.index < len(self.string) and self.string[self.index] == ' ':
-            self.index += 1
-
-    def parse_negation(self, limit: int = None) -> int:
-        """ Return number of negations encountered. """
-        count = 0
-
-        while self.index < len(self.string) and (limit is None or count < limit) \
-                and self.string[self.index] in ('!', '¬', '~'):
-            count += 1
-            self.index += 1
-
-        return count
-
-    def parse_operator(self) -> type(BinaryOperator) | None:
-        """ Parse operator and return it, or None if no operator found. """
-        negations = self.parse_negation(1)
-
-        for symbol, op in Parser.binary_operators.items():
-            if self.string[self.index:].startswith(symbol):
-                self.index += len(symbol)
-                return op.get_negated() if negations else op
-
-        return None
-
-    def parse_literal(self) -> tuple[bool, Formula | str]:
-        """ Parse a literal: top, bottom, symbol. """
-        # Is literal negated?
-        negations = self.parse_negation()
-        self.eat_whitespace()
-
-        # Literal: top
-        if self.string[self.index] in (Top.symbol, 'T', '1'):
-            self.index += 1
-            literal = Top()
-
-        # Literal: bottom
-        elif self.string[self.index] in (Bottom.symbol, 'F', '0'):
-            self.index += 1
-            literal = Bottom()
-
-        # Literal: symbol
-        elif self.string[self.index].isalpha():
-            start = self.index
-            while self.index < len(self.string) and self.string[self.index].isalnum():
-                self.index += 1
-
-            literal = Symbol(self.string[start:self.index])
-
-        else:
-            return False, f"Index {self.index}: expected literal, got '{self.string[self.index:self.index + 5]}'"
-
-        return True, Negation.nest(literal, negations)
-
-    def parse_surrounded_clause(self, close_tag: str, parse_fn: Callable[[], Any], default=None) \
-            -> tuple[bool, Any | str]:
-        """ Parse a group surrounded by tags. Assumes that open_tag has already been encountered and consumed -
-        group ends in `close_tag` """
-        self.eat_whitespace()
-
-        # Does this group immediately close?
-        if default is not None and self.string[self.index:].startswith(close_tag):
-            self.index += len(close_tag)
-            return True, default
-
-        ok, res = parse_fn()
-
-        if not ok:
-            return ok, res
-
-        if self.index >= len(self.string):
-            return False, f"Index {self.index}: unexpected end of input, expected '{close_tag}'"
-
-        if not self.string[self.index:].startswith(close_tag):
-            return False, f"Index {self.index}: expected '{close_tag}', got '{self.string[self.index:self.index + 5]}'"
+class ParseError:
+    def __init__(self, line: int, column: int, message: str):
+        """ Error parsing the given line (from 1) at the given column (index into the line, from 0). """
+        self.line = line
+        self.column = column
+        self.message = message
 
-        self.index += len(close_tag)
+    def __str__(self):
+        return f"Index {self.column}: {self.message}"
 
-        return True, res
+    def __repr__(self):
+        return f"ParseError(line={self.line}, column={self.column}, message={self.message!r})"
 
-    def parse_group(self) -> tuple[bool, Formula | str]:
-        """ Parse group (bracketed) or literal or generalised con- or disjunction. """
-        negations = self.parse_negation()
 
-        if self.index >= len(self.string):
-            return False, f"Index {self.index}: expected '(', '[', '<' or literal, got end of input"
+class Group:
+    def __init__(self, open_tag: str | None, negations: int):
+        """ Group being parsed: bracketed if `open_tag` is '(', generalised if '[' or '<', or the whole input if None.
+        `negations` - number of negations preceding the group. """
+        self.open_tag = open_tag
+        self.negations = negations
+        self.formulae: list[Formula] = []  # Completed formulae of a generalised group
+        self.left: Formula | None = None  # Left operand of `operator`
+        self.operator: type(BinaryOperator) | None = None  # Operator awaiting its right operand
 
-        if self.string[self.index] == '(':
-            # Group
-            self.index += 1
-            ok, res = self.parse_surrounded_clause(')', lambda: self.parse_formula({')'}))
-            if not ok:
-                return ok, res
 
-            group = res
-
-        elif self.string[self.index] == '[':
-            self.index += 1
-            ok, res = self.parse_surrounded_clause(']', lambda: self.parse_comma_seperated(']'), [])
-            if not ok:
-                return ok, res
-
-            group = GeneralisedDisjunction(*res)
-
-        elif self.string[self.index] == '<':
-            self.index += 1
-            ok, res = self.parse_surrounded_clause('>', lambda: self.parse_comma_seperated('>'), [])
-            if not ok:
-                return ok, res
-
-            group = GeneralisedConjunction(*res)
-
-        else:
-            # Literal
-            ok, res = self.parse_literal()
-            if not ok:
-                return ok, res
+class Parser:
+    # Map of binary operators; string => operator
+    binary_operators = Lexer.binary_operators
 
-            group = res
+    # Map of generalised operators; open tag => (close tag, operator)
+    generalised_operators = {
+        '[': (']', GeneralisedDisjunction),
+        '<': ('>', GeneralisedConjunction),
+    }
 
-        return True, Negation.nest(group, negations)
+    def __init__(self):
+        self.string = ""
+        self.tokens: list[Token] = []
+
+    @staticmethod
+    def parse_many(lines: Iterable[str], processes: int | None = 0, chunk_size=1000) \
+            -> Iterator[tuple[int, bool, Formula | ParseError]]:
+        """ Parse one formula per line, yielding (line number, ok, formula or error) in order. Blank lines are skipped.
+        Lines are read lazily and parsed in chunks of `chunk_size` lines by a pool of worker processes (0 for one per
+        CPU), with a bounded number of chunks in flight. A chunk whose worker fails is parsed again in this process.
+        `processes` - if None, parse in this process. """
+        lines = ((number, line.rstrip('\r\n')) for number, line in enumerate(lines, 1))
+        lines = ((number, line) for number, line in lines if line.strip())
+
+        if processes is None:
+            yield from parse_lines_locally(lines)
+            return
+
+        processes = processes or os.cpu_count()
+        with ProcessPoolExecutor(processes) as executor:
+            pending: deque[tuple[list[tuple[int, str]], Future]] = deque()
+
+            while True:
+                # Keep each worker busy, without reading the whole input
+                while len(pending) < 2 * processes:
+                    chunk = list(islice(lines, chunk_size))
+                    if not chunk:
+                        break
+
+                    try:
+                        future = executor.submit(parse_lines, chunk)
+                    except BrokenExecutor as error:
+                        # Once a worker has died, the pool takes no more chunks
+                        future = Future()
+                        future.set_exception(error)
+
+                    pending.append((chunk, future))
+
+                if not pending:
+                    break
+
+                chunk, future = pending.popleft()
+                try:
+                    results = future.result()
+                except Exception:
+                    # E.g., a worker died, or its results could not be sent back: parse the chunk here, so the lines
+                    # already parsed, and those to come, are not lost
+                    results = parse_lines_locally(chunk)
+
+                yield from results
+
+    @staticmethod
+    def parse_file(path: str, processes: int | None = 0, chunk_size=1000, encoding='utf-8') \
+            -> Iterator[tuple[int, bool, Formula | ParseError]]:
+        """ Parse a file of formulae, one per line. See `parse_many`. """
+        with open(path, encoding=encoding) as file:
+            yield from Parser.parse_many(file, processes, chunk_size)
+
+    def got(self, token: Token) -> str:
+        """ Describe the input at the given token, for error messages. """
+        return f"got '{self.string[token.index:token.index + 5]}'"
+
+    @staticmethod
+    def is_terminal(group: Group, token: Token) -> bool:
+        """ Does the token end a formula in the given group? """
+        if token.kind == Token.END:
+            return True
+
+        if group.open_tag is None:
+            return False
+
+        if group.open_tag in Parser.generalised_operators:
+            close_tag, _ = Parser.generalised_operators[group.open_tag]
+            return token.kind == Token.COMMA or (token.kind == Token.CLOSE and token.value in (close_tag, ')'))
+
+        return token.kind == Token.CLOSE and token.value == ')'
+
+    def parse(self, string: str, line=1) -> tuple[bool, Formula | ParseError]:
+        """ Given a string, return parsed Formula, or error: X [op Y]. `line` - line number reported by errors.
+        Groups are tracked on an explicit stack, so nesting is bounded only by memory. """
+        self.string = string
+        self.tokens = tokens = Lexer(string).tokenize()
 
-    def parse_comma_seperated(self, close_tag: str) -> tuple[bool, list[Formula] | str]:
-        """ Parse a comma-seperated list of formulae. List ends with end-of-input or `close`. """
-        formulae = []
+        groups = [Group(None, 0)]
+        index = 0
 
         while True:
-            # Parse formula
-            ok, res = self.parse_formula({close_tag, ')', ','})
-            if not ok:
-                return ok, res
-
-            formulae.append(res)
-            self.eat_whitespace()
-
-            # End of input?
-            if self.index >= len(self.string) or self.string[self.index:].startswith(close_tag):
-                break
-
-            # Comma: expected next formula
-            if self.string[self.index] == ',':
-                self.index += 1
-                self.eat_whitespace()
-                continue
-
-            return False, f"Index {self.index}: expected ',' or '{close_tag}' or end of input, got '{self.string[self.index:self.index + 5]}'"
-
-        return True, formulae
-
-    def parse_formula(self, terminal: set[str] = None) -> tuple[bool, Formula | str]:
-        """ Parse a group in the form `[lit/formula] [[op] [lit/formula]]`. """
-        # Literal/Group 1
-        ok, res = self.parse_group()
-        if not ok:
-            return ok, res
-
-        arg1 = res
-        self.eat_whitespace()
-
-        # EOL?
-        if self.index >= len(self.string):
-            return True, arg1
-        elif terminal is not None and any(self.string[self.index:].startswith(s) for s in terminal):
-            return True, arg1
-
-        # Operator
-        op = self.parse_operator()
-        if op is None:
-            return False, f"Index {self.index}: expected operator, got '{self.string[self.index:self.index + 5]}'"
-
-        self.eat_whitespace()
-
-        # Literal 2
-        ok, res = self.parse_group()
-        if not ok:
-            return ok, res
-
-        arg2 = res
-        self.eat_whitespace()
-
-        return True, op(arg1, arg2)
-
-    def parse(self, string: str) -> tuple[bool, Formula | str]:
-        """ Given a string, return parsed Formula, or error message: X [op Y]. """
-        self.index = 0
-        self.string = string
+            # Operand: negations, followed by a group or literal
+            negations = 0
+            while tokens[index].kind == Token.NEGATION:
+                negations += 1
+                index += 1
 
-        # Driver: start parsing as formula
-        ok, res = self.parse_formula()
+            token = tokens[index]
+            index += 1
+
+            if token.kind == Token.OPEN:
+                # Does this group immediately close?
+                if token.value in Parser.generalised_operators:
+                    close_tag, operator = Parser.generalised_operators[token.value]
+
+                    if tokens[index].kind == Token.CLOSE and tokens[index].value == close_tag:
+                        index += 1
+                        operand = Negation.nest(operator(), negations)
+                    else:
+                        groups.append(Group(token.value, negations))
+                        continue
+                else:
+                    groups.append(Group(token.value, negations))
+                    continue
+
+            elif token.kind == Token.LITERAL:
+                operand = Negation.nest(token.value, negations)
+
+            elif token.kind == Token.END:
+                return False, ParseError(line, token.index, "expected '(', '[', '<' or literal, got end of input")
+
+            else:
+                return False, ParseError(line, token.index, f"expected literal, {self.got(token)}")
+
+            # Complete formulae with the operand, closing groups, until another operand is expected
+            while True:
+                group = groups[-1]
+                token = tokens[index]
+
+                if group.operator is not None:
+                    # Second operand
+                    formula = group.operator(group.left, operand)
+                    group.left = group.operator = None
+
+                elif token.kind == Token.OPERATOR:
+                    # First operand, followed by an operator
+                    group.left = operand
+                    group.operator = token.value
+                    index += 1
+                    break
+
+                elif self.is_terminal(group, token):
+                    # First operand, followed by the end of the formula
+                    formula = operand
+
+                else:
+                    # A negation here must negate an operator, so the error is after it
+                    if token.kind == Token.NEGATION:
+                        token = tokens[index + 1]
+
+                    return False, ParseError(line, token.index, f"expected operator, {self.got(token)}")
+
+                # The whole input
+                if group.open_tag is None:
+                    if token.kind != Token.END:
+                        return False, ParseError(line, token.index, f"expected end of input, {self.got(token)}")
+
+                    return True, formula
+
+                close_tag, operator = Parser.generalised_operators.get(group.open_tag, (')', None))
+
+                # Generalised group: comma-separated formulae
+                if operator is not None:
+                    group.formulae.append(formula)
+
+                    if token.kind == Token.COMMA:
+                        index += 1
+                        break
+
+                    formula = operator(*group.formulae)
+
+                if token.kind == Token.END:
+                    return False, ParseError(line, token.index, f"unexpected end of input, expected '{close_tag}'")
+
+                if token.kind != Token.CLOSE or token.value != close_tag:
+                    if operator is not None:
+                        return False, ParseError(line, token.index, f"expected ',' or '{close_tag}' or end of input, "
+                                                                    f"{self.got(token)}")
+
+                    return False, ParseError(line, token.index, f"expected '{close_tag}', {self.got(token)}")
+
+                index += 1
+                groups.pop()
+                operand = Negation.nest(formula, group.negations)
+
+
+def parse_lines_locally(lines: Iterable[tuple[int, str]]) -> Iterator[tuple[int, bool, Formula | ParseError]]:
+    """ Parse the given numbered lines in this process, for `Parser.parse_many`. A line which cannot be parsed at all
+    (e.g., for lack of memory) is reported as an error at its first column, rather than ending the stream. """
+    parser = Parser()
+    for number, line in lines:
+        try:
+            yield number, *parser.parse(line, number)
+        except Exception as error:
+            yield number, False, ParseError(number, 0, f"could not parse line: {error!r}")
 
-        # Expect end of input
-        if ok and self.index < len(string):
-            return False, f"Index {self.index}: expected end of input, got '{string[self.index:self.index + 5]}'"
 
-        return ok, res
+def parse_lines(lines: list[tuple[int, str]]) -> list[tuple[int, bool, Formula | ParseError]]:
+    """ Parse the given numbered lines, in a worker process of `Parser.parse_many`. """
+    parser = Parser()
+    return [(number, *parser.parse(line, number)) for number, line in lines]
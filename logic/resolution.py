@@ -0,0 +1,243 @@
+import heapq
+import time
+
+from logic.formula import Formula
+from logic.generalised_operators import GeneralisedDisjunction
+from logic.literals import Symbol
+from logic.normal_form import NormalForm
+from logic.operators import Negation
+
+# A clause is a set of literals: variable `v` has literals `v` (positive) and `-v` (negative), for v >= 1
+Clause = frozenset[int]
+
+
+class Resolution:
+    # Outcomes of a refutation
+    PROOF = 'proof'  # The empty clause was derived
+    SATURATION = 'saturation'  # No new clauses can be derived
+    LIMIT = 'limit'  # The limit on generated clauses was reached
+
+    def __init__(self, axioms: Formula | None = None, limit: int | None = None):
+        """ Resolution prover using the set-of-support strategy: clauses of `axioms` (assumed consistent) are only
+        resolved against clauses descending from the goal. `limit` - maximum number of clauses to generate. """
+        self.limit = limit
+        self.variables: dict[str, int] = {}  # Symbol => variable
+        self.names: list[str] = ['']  # Variable => symbol
+        self.axioms: list[Clause] = [] if axioms is None else self.get_clauses(axioms)
+
+        self.reset()
+
+    def reset(self):
+        """ Discard the clauses and statistics of the last refutation, keeping the axioms. """
+        self.usable: set[Clause] = set()  # Clauses which have been resolved against
+        self.support: set[Clause] = set()  # Set of support, clauses waiting to be resolved
+        self.queue: list[tuple[int, int, Clause]] = []  # Support clauses by (size, age), lazily updated
+        self.occurrences: dict[int, set[Clause]] = {}  # Literal => usable and support clauses containing it
+        self.parents: dict[Clause, tuple[Clause, Clause] | None] = {}  # Clause => the clauses it was resolved from
+
+        self.status: str | None = None
+        self.refutation: Clause | None = None
+
+        # Statistics
+        self.generated = 0
+        self.subsumed = 0
+        self.tautologies = 0
+        self.time = 0.0
+
+        for clause in self.axioms:
+            self.add_clause(clause, False)
+
+    def get_clauses(self, formula: Formula) -> list[Clause]:
+        """ Convert the formula to clauses via `NormalForm.conjunctive_normal_form`. Clauses containing top are
+        dropped, as are bottom literals. """
+        clauses = []
+
+        for clause in NormalForm.conjunctive_normal_form(formula):
+            literals = set()
+            for literal in (clause if isinstance(clause, GeneralisedDisjunction) else [clause]):
+                value = literal.eval_const()
+
+                if value is True:
+                    break
+
+                if value is None:
+                    literals.add(self.get_literal(literal))
+            else:
+                clauses.append(frozenset(literals))
+
+        return clauses
+
+    def get_literal(self, literal: Formula) -> int:
+        """ Convert a symbol or negated symbol to a literal. """
+        if isinstance(literal, Negation):
+            return -self.get_literal(literal.data)
+
+        if not isinstance(literal, Symbol):
+            raise ValueError(f"expected literal, got {literal}")
+
+        if literal.symbol not in self.variables:
+            self.variables[literal.symbol] = len(self.names)
+            self.names.append(literal.symbol)
+
+        return self.variables[literal.symbol]
+
+    def to_formula(self, clause: Clause) -> GeneralisedDisjunction:
+        """ Convert a clause back to a formula. """
+        return GeneralisedDisjunction(*(Symbol(self.names[literal]) if literal > 0
+                                        else Negation(Symbol(self.names[-literal]))
+                                        for literal in sorted(clause, key=abs)))
+
+    @staticmethod
+    def is_tautology(clause: Clause) -> bool:
+        return any(-literal in clause for literal in clause)
+
+    def is_subsumed(self, clause: Clause) -> bool:
+        """ Forward subsumption: is the clause a superset of a kept clause? Counts, for each kept clause sharing a
+        literal with `clause`, how many of its literals are shared. """
+        counts: dict[Clause, int] = {}
+
+        for literal in clause:
+            for other in self.occurrences.get(literal, ()):
+                count = counts.get(other, 0) + 1
+                if count == len(other):
+                    return True
+
+                counts[other] = count
+
+        return False
+
+    def subsume_backward(self, clause: Clause):
+        """ Backward subsumption: remove kept clauses which are supersets of the given clause. """
+        literals = sorted(clause, key=lambda literal: len(self.occurrences.get(literal, ())))
+        candidates = set(self.occurrences.get(literals[0], ()))
+
+        for literal in literals[1:]:
+            if not candidates:
+                break
+
+            candidates &= self.occurrences.get(literal, set())
+
+        candidates.discard(clause)
+        for other in candidates:
+            self.remove_clause(other)
+            self.subsumed += 1
+
+    def add_clause(self, clause: Clause, support: bool) -> bool:
+        """ Add a clause to the usable set or set of support unless it is a tautology or subsumed. Return whether it
+        was added. """
+        if Resolution.is_tautology(clause):
+            self.tautologies += 1
+            return False
+
+        if clause in self.usable or clause in self.support or self.is_subsumed(clause):
+            self.subsumed += 1
+            return False
+
+        if len(clause) == 0:
+            self.status = Resolution.PROOF
+            self.refutation = clause
+
+        self.parents.setdefault(clause, None)
+        for literal in clause:
+            self.occurrences.setdefault(literal, set()).add(clause)
+
+        if support:
+            self.support.add(clause)
+            heapq.heappush(self.queue, (len(clause), len(self.parents), clause))
+        else:
+            self.usable.add(clause)
+
+        return True
+
+    def remove_clause(self, clause: Clause):
+        self.usable.discard(clause)
+        self.support.discard(clause)
+
+        for literal in clause:
+            self.occurrences[literal].discard(clause)
+
+    def refute(self, support: Formula) -> str:
+        """ Attempt to derive the empty clause from the axioms and the given formula, the set of support. Return the
+        outcome: PROOF (unsatisfiable), SATURATION (satisfiable) or LIMIT. Each call starts afresh from the axioms. """
+        self.reset()
+        start = time.perf_counter()
+
+        for clause in self.get_clauses(support):
+            self.add_clause(clause, True)
+
+        while self.status is None:
+            if not self.queue:
+                self.status = Resolution.SATURATION
+                break
+
+            if self.limit is not None and self.generated >= self.limit:
+                self.status = Resolution.LIMIT
+                break
+
+            # Given clause: the smallest, then oldest, support clause
+            _, _, given = heapq.heappop(self.queue)
+            if given not in self.support:
+                continue
+
+            self.support.remove(given)
+            self.subsume_backward(given)
+            self.usable.add(given)
+
+            for literal in given:
+                for other in list(self.occurrences.get(-literal, ())):
+                    if other not in self.usable:
+                        continue
+
+                    self.generated += 1
+                    resolvent = (given - {literal}) | (other - {-literal})
+
+                    if self.add_clause(resolvent, True):
+                        self.parents[resolvent] = (given, other)
+
+                        if self.status is not None:
+                            break
+
+                if self.status is not None:
+                    break
+
+        self.time += time.perf_counter() - start
+        return self.status
+
+    def prove(self, goal: Formula) -> bool | None:
+        """ Return whether the axioms entail `goal` (with no axioms, whether `goal` is valid), by refuting its negation.
+        Return None if the limit was reached. """
+        status = self.refute(Negation(goal))
+        return None if status == Resolution.LIMIT else status == Resolution.PROOF
+
+    def get_proof(self) -> list[tuple[GeneralisedDisjunction, GeneralisedDisjunction, GeneralisedDisjunction]]:
+        """ Return the refutation found as a list of resolution steps (resolvent, parent, parent), ending with the
+        empty clause. Empty if no proof was found or the input contained the empty clause. """
+        if self.refutation is None:
+            return []
+
+        # Collect derived clauses in post-order, so parents precede resolvents
+        steps = []
+        visited = set()
+        stack = [(self.refutation, False)]
+        while stack:
+            clause, expanded = stack.pop()
+            parents = self.parents.get(clause)
+
+            if expanded:
+                steps.append((self.to_formula(clause), self.to_formula(parents[0]), self.to_formula(parents[1])))
+            elif clause not in visited and parents is not None:
+                visited.add(clause)
+                stack.append((clause, True))
+                stack.extend((parent, False) for parent in parents)
+
+        return steps
+
+    def get_statistics(self) -> dict[str, str | int | float | None]:
+        """ Return the outcome and counters of the last refutation. """
+        return {
+            'status': self.status,
+            'generated': self.generated,
+            'subsumed': self.subsumed,
+            'tautologies': self.tautologies,
+            'time': self.time,
+        }
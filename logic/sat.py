@@ -0,0 +1,516 @@
+from __future__ import annotations
+import heapq
+
+from logic.formula import Formula
+from logic.generalised_operators import GeneralisedConjunction, GeneralisedDisjunction
+from logic.literals import Symbol, Literal
+from logic.normal_form import TseitinEncoder
+from logic.operators import Negation, AndOperator, NonEqualityOperator
+
+
+class Clause:
+    def __init__(self, literals: list[int], learnt=False):
+        """ Solver clause. The first two literals are watched; the first literal of a reason clause is the literal it
+        implied. """
+        self.literals = literals
+        self.learnt = learnt
+        self.activity = 0.0
+        self.deleted = False
+
+
+class Solver:
+    """ Incremental CDCL SAT solver: two watched literals, VSIDS variable activity with phase saving, Luby restarts and
+    activity-based deletion of learnt clauses. Clauses may be added between calls to `solve`, which may be given
+    assumptions; learnt clauses are kept between calls.
+
+    Internally, variable `v` has literals `2v` (positive) and `2v + 1` (negative). """
+
+    var_decay = 0.95  # Variable activity decay per conflict
+    clause_decay = 0.999  # Learnt clause activity decay per conflict
+    restart_base = 100  # Number of conflicts per unit of the Luby restart sequence
+    learnt_ratio = 1 / 3  # Initial number of learnt clauses to keep, relative to the number of problem clauses
+    learnt_growth = 1.1  # Growth of the above limit after each clause deletion
+
+    def __init__(self):
+        self.variables: dict[str, int] = {}  # Symbol => variable
+        self.names: list[str] = []  # Variable => symbol
+        self.encoder = TseitinEncoder('#')  # '#' cannot occur in parsed symbols
+        self.encoded = 0  # Number of the encoder's clauses already added
+
+        self.clauses: list[Clause] = []
+        self.learnts: list[Clause] = []
+        self.watches: list[list[Clause]] = []  # Literal => clauses watching it
+        self.values: list[int] = []  # Literal => 1 (true), -1 (false) or 0 (unassigned)
+        self.levels: list[int] = []  # Variable => decision level of assignment
+        self.reasons: list[Clause | None] = []  # Variable => clause which implied its assignment
+        self.activity: list[float] = []  # Variable => VSIDS activity
+        self.phases: list[bool] = []  # Variable => last assigned polarity
+        self.seen: list[bool] = []  # Variable => scratch flag for conflict analysis
+        self.heap: list[tuple[float, int]] = []  # (-activity, variable), lazily updated
+        self.trail: list[int] = []  # Assigned literals, in order
+        self.trail_limits: list[int] = []  # Decision level => start index in trail
+        self.head = 0  # Index in trail of the next literal to propagate
+
+        self.var_inc = 1.0
+        self.clause_inc = 1.0
+        self.max_learnts = 0.0
+        self.ok = True  # False once the clauses are unsatisfiable without any assumptions
+        self.model: dict[str, bool] = {}
+
+        # Statistics
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.restarts = 0
+
+    def get_variable(self, symbol: str) -> int:
+        """ Get the variable of the given symbol, creating one if needed. """
+        if symbol in self.variables:
+            return self.variables[symbol]
+
+        variable = len(self.names)
+        self.variables[symbol] = variable
+        self.names.append(symbol)
+
+        self.watches += [[], []]
+        self.values += [0, 0]
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phases.append(False)
+        self.seen.append(False)
+        heapq.heappush(self.heap, (0.0, variable))
+        return variable
+
+    def get_literal(self, literal: Formula) -> int:
+        """ Convert a symbol or negated symbol to the solver's literal. """
+        if isinstance(literal, Negation):
+            return self.get_literal(literal.data) ^ 1
+
+        if isinstance(literal, Symbol):
+            return 2 * self.get_variable(literal.symbol)
+
+        raise ValueError(f"expected literal, got {literal}")
+
+    def add_formula(self, formula: Formula) -> bool:
+        """ Assert the given formula. A formula in CNF (as given by `NormalForm`) is added clause by clause, otherwise
+        it is encoded via `NormalForm.tseitin_conjunctive_normal_form`. Return False if now unsatisfiable. """
+        clauses = Solver.get_clauses(formula)
+
+        if clauses is None:
+            self.encoder.encode(formula)
+            clauses = self.encoder.clauses[self.encoded:]
+            self.encoded = len(self.encoder.clauses)
+
+        for clause in clauses:
+            self.add_clause(list(clause) if isinstance(clause, GeneralisedDisjunction) else [clause])
+
+        return self.ok
+
+    @staticmethod
+    def get_clauses(formula: Formula) -> list[Formula] | None:
+        """ Return the clauses of a formula in CNF, or None if it is not in CNF. """
+        clauses = formula if isinstance(formula, GeneralisedConjunction) else [formula]
+
+        for clause in clauses:
+            literals = clause if isinstance(clause, GeneralisedDisjunction) else [clause]
+            if not all(isinstance(literal, Literal) or
+                       (isinstance(literal, Negation) and isinstance(literal.data, Literal)) for literal in literals):
+                return None
+
+        return clauses
+
+    def add_clause(self, literals: list[Formula]) -> bool:
+        """ Add a clause of literals (symbols, negated symbols or constants). Return False if now unsatisfiable. """
+        clause = []
+        for literal in literals:
+            value = literal.eval_const()
+
+            # Clause is satisfied
+            if value is True:
+                return self.ok
+
+            if value is None:
+                clause.append(self.get_literal(literal))
+
+        return self.attach_literals(clause)
+
+    def attach_literals(self, literals: list[int]) -> bool:
+        """ Add a clause of solver literals at decision level 0. Return False if now unsatisfiable. """
+        if not self.ok:
+            return False
+
+        literals = set(literals)
+        clause = []
+        for literal in literals:
+            # Tautology, or satisfied at level 0
+            if literal ^ 1 in literals or self.values[literal] == 1:
+                return True
+
+            if self.values[literal] == 0:
+                clause.append(literal)
+
+        if len(clause) == 0:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            clause = Clause(clause)
+            self.watches[clause.literals[0]].append(clause)
+            self.watches[clause.literals[1]].append(clause)
+            self.clauses.append(clause)
+
+        return self.ok
+
+    def assign(self, literal: int, reason: Clause | None):
+        """ Make the given literal true at the current decision level. """
+        variable = literal >> 1
+        self.values[literal] = 1
+        self.values[literal ^ 1] = -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self) -> Clause | None:
+        """ Unit propagate all pending assignments. Return a conflicting clause, or None. """
+        values, watches, trail = self.values, self.watches, self.trail
+
+        while self.head < len(trail):
+            false_literal = trail[self.head] ^ 1
+            self.head += 1
+            self.propagations += 1
+
+            watchers = watches[false_literal]
+            watches[false_literal] = kept = []
+
+            for i, clause in enumerate(watchers):
+                # Deleted clauses are removed from watch lists lazily
+                if clause.deleted:
+                    continue
+
+                # Make sure the false literal is the second watch
+                literals = clause.literals
+                if literals[0] == false_literal:
+                    literals[0], literals[1] = literals[1], false_literal
+
+                first = literals[0]
+                if values[first] == 1:
+                    kept.append(clause)
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(literals)):
+                    if values[literals[k]] != -1:
+                        literals[1], literals[k] = literals[k], false_literal
+                        watches[literals[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+
+                    # Conflict: keep remaining watchers
+                    if values[first] == -1:
+                        kept.extend(watchers[i + 1:])
+                        self.head = len(trail)
+                        return clause
+
+                    self.assign(first, clause)
+
+        return None
+
+    def analyze(self, conflict: Clause) -> tuple[list[int], int]:
+        """ Derive the first-UIP learnt clause from a conflict. Return the clause, asserting literal first, and the
+        level to backjump to. """
+        seen, levels, trail = self.seen, self.levels, self.trail
+        level = len(self.trail_limits)
+        learnt = [-1]
+        pending = 0  # Number of current-level literals still to resolve on
+        literal = None
+        clause = conflict
+        index = len(trail) - 1
+
+        while True:
+            if clause.learnt:
+                self.bump_clause(clause)
+
+            # The implied literal (first) of a reason clause is the one being resolved on
+            for other in clause.literals[0 if literal is None else 1:]:
+                variable = other >> 1
+                if not seen[variable] and levels[variable] > 0:
+                    seen[variable] = True
+                    self.bump_variable(variable)
+
+                    if levels[variable] >= level:
+                        pending += 1
+                    else:
+                        learnt.append(other)
+
+            # Next literal on the trail to resolve on
+            while not seen[trail[index] >> 1]:
+                index -= 1
+
+            literal = trail[index]
+            index -= 1
+            clause = self.reasons[literal >> 1]
+            seen[literal >> 1] = False
+            pending -= 1
+
+            if pending == 0:
+                break
+
+        learnt[0] = literal ^ 1
+
+        # Drop literals implied by the rest of the clause
+        minimised = [learnt[0]]
+        for other in learnt[1:]:
+            reason = self.reasons[other >> 1]
+            if reason is None or not all(seen[q >> 1] or levels[q >> 1] == 0 for q in reason.literals[1:]):
+                minimised.append(other)
+
+        for other in learnt:
+            seen[other >> 1] = False
+
+        if len(minimised) == 1:
+            return minimised, 0
+
+        # Watch the literal of the highest level below the current one
+        highest = max(range(1, len(minimised)), key=lambda i: levels[minimised[i] >> 1])
+        minimised[1], minimised[highest] = minimised[highest], minimised[1]
+        return minimised, levels[minimised[1] >> 1]
+
+    def cancel_until(self, level: int):
+        """ Backtrack to the given decision level. """
+        if len(self.trail_limits) <= level:
+            return
+
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = literal >> 1
+            self.values[literal] = 0
+            self.values[literal ^ 1] = 0
+            self.reasons[variable] = None
+            self.phases[variable] = not literal & 1
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def bump_variable(self, variable: int):
+        self.activity[variable] += self.var_inc
+
+        # Rescale to avoid overflow
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.var_inc *= 1e-100
+            self.rebuild_heap()
+        elif self.values[2 * variable] == 0:
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+    def bump_clause(self, clause: Clause):
+        clause.activity += self.clause_inc
+
+        # Rescale to avoid overflow
+        if clause.activity > 1e20:
+            for learnt in self.learnts:
+                learnt.activity *= 1e-20
+
+            self.clause_inc *= 1e-20
+
+    def rebuild_heap(self):
+        """ Rebuild the heap from the unassigned variables, dropping stale entries. """
+        self.heap = [(-self.activity[variable], variable) for variable in range(len(self.names))
+                     if self.values[2 * variable] == 0]
+        heapq.heapify(self.heap)
+
+    def pick_branch_variable(self) -> int | None:
+        """ Return the unassigned variable of highest activity, or None if all are assigned. """
+        heap = self.heap
+
+        # Avoid the heap growing without bound due to stale entries
+        if len(heap) > 8 * len(self.names) + 64:
+            self.rebuild_heap()
+            heap = self.heap
+
+        while heap:
+            activity, variable = heapq.heappop(heap)
+            if self.values[2 * variable] == 0 and -activity == self.activity[variable]:
+                return variable
+
+        return None
+
+    def reduce_learnts(self):
+        """ Delete the less active half of the learnt clauses, except binary clauses and those which are reasons. """
+        self.learnts.sort(key=lambda clause: clause.activity)
+        half = len(self.learnts) // 2
+        kept = []
+
+        for i, clause in enumerate(self.learnts):
+            first = clause.literals[0]
+            locked = self.values[first] == 1 and self.reasons[first >> 1] is clause
+
+            if i < half and len(clause.literals) > 2 and not locked:
+                clause.deleted = True
+            else:
+                kept.append(clause)
+
+        self.learnts = kept
+        self.max_learnts *= Solver.learnt_growth
+
+    def search(self, max_conflicts: int, assumptions: list[int]) -> bool | None:
+        """ Search for a model until `max_conflicts` conflicts occur. Return True if satisfiable, False if
+        unsatisfiable (under the assumptions), or None to restart. """
+        conflicts = 0
+
+        while True:
+            conflict = self.propagate()
+
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+
+                if len(self.trail_limits) == 0:
+                    self.ok = False
+                    return False
+
+                learnt, level = self.analyze(conflict)
+                self.cancel_until(level)
+
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    clause = Clause(learnt, True)
+                    self.watches[learnt[0]].append(clause)
+                    self.watches[learnt[1]].append(clause)
+                    self.learnts.append(clause)
+                    self.bump_clause(clause)
+                    self.assign(learnt[0], clause)
+
+                self.var_inc /= Solver.var_decay
+                self.clause_inc /= Solver.clause_decay
+                continue
+
+            if conflicts >= max_conflicts:
+                self.cancel_until(0)
+                return None
+
+            if len(self.learnts) - len(self.trail) >= self.max_learnts:
+                self.reduce_learnts()
+
+            # Decide assumptions first, each on its own decision level
+            decision = None
+            while len(self.trail_limits) < len(assumptions):
+                assumption = assumptions[len(self.trail_limits)]
+
+                if self.values[assumption] == 1:
+                    self.trail_limits.append(len(self.trail))
+                elif self.values[assumption] == -1:
+                    return False
+                else:
+                    decision = assumption
+                    break
+
+            if decision is None:
+                variable = self.pick_branch_variable()
+                if variable is None:
+                    return True
+
+                self.decisions += 1
+                decision = 2 * variable + (0 if self.phases[variable] else 1)
+
+            self.trail_limits.append(len(self.trail))
+            self.assign(decision, None)
+
+    @staticmethod
+    def luby(i: int) -> int:
+        """ Return the `i`th term (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ... """
+        size, exponent = 1, 0
+        while size < i + 1:
+            exponent += 1
+            size = 2 * size + 1
+
+        while size - 1 != i:
+            size = (size - 1) >> 1
+            exponent -= 1
+            i %= size
+
+        return 1 << exponent
+
+    def solve(self, assumptions: dict[str, bool] | None = None) -> bool:
+        """ Return whether the clauses are satisfiable, given the assumed values of symbols. If so, `get_model` returns
+        a satisfying assignment. """
+        self.model = {}
+        if not self.ok:
+            return False
+
+        literals = [2 * self.get_variable(symbol) + (0 if value else 1)
+                    for symbol, value in ({} if assumptions is None else assumptions).items()]
+
+        self.max_learnts = max(self.max_learnts, len(self.clauses) * Solver.learnt_ratio, 100)
+
+        status, restarts = None, 0
+        while status is None:
+            status = self.search(Solver.luby(restarts) * Solver.restart_base, literals)
+            restarts += 1
+
+        self.restarts += restarts - 1
+
+        if status:
+            auxiliary = {symbol.symbol for symbol in self.encoder.definitions}
+            self.model = {symbol: self.values[2 * variable] == 1 for symbol, variable in self.variables.items()
+                          if symbol not in auxiliary}
+
+        self.cancel_until(0)
+        return status
+
+    def get_model(self) -> dict[str, bool]:
+        """ Return the model found by the last successful call to `solve`. """
+        return self.model
+
+
+def is_satisfiable(formula: Formula, bindings: dict[str, bool] | None = None) -> bool:
+    """ Return whether the formula is satisfiable, given the bound symbols. """
+    solver = Solver()
+    solver.add_formula(formula)
+    return solver.solve(bindings)
+
+
+def is_tautology(formula: Formula, bindings: dict[str, bool] | None = None) -> bool:
+    """ Return whether the formula is true under every assignment, given the bound symbols. """
+    return not is_satisfiable(Negation(formula), bindings)
+
+
+def get_model(formula: Formula, bindings: dict[str, bool] | None = None) -> dict[str, bool] | None:
+    """ Return an assignment satisfying the formula (given the bound symbols), or None if unsatisfiable. """
+    solver = Solver()
+    solver.add_formula(formula)
+    return solver.get_model() if solver.solve(bindings) else None
+
+
+def get_counterexample(formula: Formula, variables: set[str], bindings: dict[str, bool] | None = None) \
+        -> dict[str, bool] | None:
+    """ Return an assignment of the given unbound variables satisfying the formula (given the bound symbols), or None if
+    unsatisfiable. Variables the solver did not need are false. """
+    model = get_model(formula, bindings)
+    if model is None:
+        return None
+
+    return {symbol: model.get(symbol, False) for symbol in sorted(variables)
+            if bindings is None or symbol not in bindings}
+
+
+def equivalent(a: Formula, b: Formula, bindings: dict[str, bool] | None = None) \
+        -> tuple[bool, dict[str, bool] | None]:
+    """ Return whether the formulae have the same value under every assignment, given the bound symbols. If not, also
+    return an assignment of their unbound variables under which they differ. """
+    counterexample = get_counterexample(NonEqualityOperator(a, b), a.get_variables() | b.get_variables(), bindings)
+    return counterexample is None, counterexample
+
+
+def entails(premise: Formula, conclusion: Formula, bindings: dict[str, bool] | None = None) \
+        -> tuple[bool, dict[str, bool] | None]:
+    """ Return whether the conclusion is true under every assignment making the premise true, given the bound symbols.
+    If not, also return an assignment of their unbound variables making the premise true and the conclusion false. """
+    counterexample = get_counterexample(AndOperator(premise, Negation(conclusion)),
+                                        premise.get_variables() | conclusion.get_variables(), bindings)
+    return counterexample is None, counterexample
@@ -0,0 +1,79 @@
+from typing import Callable, Iterable, Iterator
+
+from logic.formula import Formula
+
+
+class SymbolTable:
+    def __init__(self, symbols: Iterable[str] = ()):
+        """ Assigns dense integer ids to variables, in order of addition, so assignments may be given as a list or a
+        bitmask indexed by id (see `Formula.eval_assignment`). """
+        self.ids: dict[str, int] = {}  # Symbol => id
+        self.names: list[str] = []  # Id => symbol
+        self.functions: dict[tuple[Formula, bool], Callable[..., bool]] = {}  # Compiled formulae, see `get_function`
+
+        for symbol in symbols:
+            self.add(symbol)
+
+    @staticmethod
+    def from_formula(formula: Formula) -> 'SymbolTable':
+        """ Create a symbol table of the formula's variables, sorted. """
+        return SymbolTable(sorted(formula.get_variables()))
+
+    def add(self, symbol: str) -> int:
+        """ Return the id of the given symbol, assigning the next id if it is new. """
+        if symbol not in self.ids:
+            self.ids[symbol] = len(self.names)
+            self.names.append(symbol)
+
+            # Compiled functions take exactly the previous symbols
+            self.functions.clear()
+
+        return self.ids[symbol]
+
+    def add_formula(self, formula: Formula):
+        """ Assign ids to the formula's new variables, sorted. """
+        for symbol in sorted(formula.get_variables()):
+            self.add(symbol)
+
+    def get_id(self, symbol: str) -> int:
+        return self.ids[symbol]
+
+    def get_name(self, id: int) -> str:
+        return self.names[id]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, symbol: str):
+        return symbol in self.ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def to_list(self, symbols: dict[str, bool]) -> list[bool]:
+        """ Convert an assignment keyed by symbol to a list indexed by id. """
+        return [symbols[name] for name in self.names]
+
+    def to_bitmask(self, symbols: dict[str, bool]) -> int:
+        """ Convert an assignment keyed by symbol to a bitmask, whose bit `i` is the value of variable `i`. """
+        mask = 0
+        for name, i in self.ids.items():
+            if symbols[name]:
+                mask |= 1 << i
+
+        return mask
+
+    def from_bitmask(self, mask: int) -> dict[str, bool]:
+        """ Convert a bitmask to an assignment keyed by symbol. """
+        return {name: bool(mask >> i & 1) for i, name in enumerate(self.names)}
+
+    def get_function(self, formula: Formula, bitmask=False) -> Callable[..., bool]:
+        """ Return the formula compiled over this table's variables, in order of id (see `Formula.compile`). Cached
+        until a variable is added. """
+        key = (formula, bitmask)
+        function = self.functions.get(key)
+
+        if function is None:
+            function = self.functions[key] = formula.compile(self.names, bitmask)
+
+        return function
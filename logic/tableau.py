@@ -0,0 +1,125 @@
+from logic.algorithm import rank, classify, LITERAL_FORMULA, ALPHA_FORMULA, BETA_FORMULA
+from logic.formula import Formula
+from logic.operators import Negation
+
+
+class Tableau:
+    # Kinds of formula, see `classify`
+    LITERAL = LITERAL_FORMULA
+    ALPHA = ALPHA_FORMULA
+    BETA = BETA_FORMULA
+
+    def __init__(self, formula: Formula):
+        """ Semantic tableau for the given formula. """
+        self.formula = formula
+        self.model: dict[str, bool] | None = None
+        self.ranks: dict[Formula, int] = {}  # Cache of ranks, of beta formulae and their sub-formulae
+
+        # Statistics
+        self.expansions = 0
+        self.closed_branches = 0
+
+    @staticmethod
+    def classify(formula: Formula) -> tuple[int, list[Formula] | tuple[str, bool] | None]:
+        """ Classify a formula as a literal, alpha or beta formula; see `logic.algorithm.classify`. """
+        return classify(formula)
+
+    def get_rank(self, formula: Formula) -> int:
+        return rank(formula, self.ranks)
+
+    def expand(self) -> bool:
+        """ Expand the tableau depth-first until a branch remains open (return True, the formula is satisfiable) or
+        every branch closes (return False). Alpha rules are applied before beta rules, and beta rules are applied in
+        order of increasing rank. """
+        self.model = None
+
+        # Branch: literals, formulae still to expand, pending beta formulae (rank, formula, components)
+        branches: list[tuple[dict[str, bool], list[Formula], list[tuple[int, Formula, list[Formula]]]]] = [
+            ({}, [self.formula], [])
+        ]
+
+        while branches:
+            literals, formulae, betas = branches.pop()
+            closed = False
+
+            # Apply alpha rules and collect literals, closing the branch on a complementary pair
+            while formulae and not closed:
+                formula = formulae.pop()
+                self.expansions += 1
+                kind, result = Tableau.classify(formula)
+
+                if kind == Tableau.LITERAL:
+                    if result is not None:
+                        symbol, value = result
+                        closed = literals.setdefault(symbol, value) != value
+
+                elif kind == Tableau.ALPHA:
+                    formulae.extend(result)
+
+                else:
+                    betas.append((self.get_rank(formula), formula, result))
+
+            if closed:
+                self.closed_branches += 1
+                continue
+
+            # Choose the beta formula of lowest rank whose components are not yet decided by the branch
+            while betas:
+                index = min(range(len(betas)), key=lambda i: betas[i][0])
+                _, _, components = betas.pop(index)
+                components = self.prune(literals, components)
+
+                if components is not None:
+                    break
+            else:
+                # Fully expanded open branch: any extension of its literals is a model
+                self.model = {symbol: literals.get(symbol, False) for symbol in self.formula.get_variables()}
+                return True
+
+            if len(components) == 0:
+                self.closed_branches += 1
+                continue
+
+            # Branch on each component, exploring the first component first
+            for component in reversed(components):
+                branches.append((dict(literals), [component], list(betas)))
+
+        return False
+
+    @staticmethod
+    def prune(literals: dict[str, bool], components: list[Formula]) -> list[Formula] | None:
+        """ Prune the components of a beta formula given a branch's literals: return None if a component literal is
+        already true, else the components which are not already false literals. """
+        pruned = []
+
+        for component in components:
+            kind, result = Tableau.classify(component)
+
+            if kind == Tableau.LITERAL and result is None:
+                return None
+
+            if kind == Tableau.LITERAL:
+                symbol, value = result
+                if symbol in literals:
+                    if literals[symbol] == value:
+                        return None
+
+                    continue
+
+            pruned.append(component)
+
+        return pruned
+
+    def get_model(self) -> dict[str, bool] | None:
+        """ Return the model read off the open branch found by `expand`, or None if the tableau closed. """
+        return self.model
+
+    @staticmethod
+    def is_satisfiable(formula: Formula) -> bool:
+        """ Return whether the given formula is satisfiable. """
+        return Tableau(formula).expand()
+
+    @staticmethod
+    def is_valid(formula: Formula) -> bool:
+        """ Return whether the given formula is valid (a tautology), i.e., the tableau of its negation closes. """
+        return not Tableau(Negation(formula)).expand()
@@ -1,13 +1,22 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Iterable, TextIO
+
 from logic.formula import Formula
 
 
 class TruthTable:
+    # Number of variables evaluated together, as packed columns, when streaming rows
+    block_variables = 12
+
     def __init__(self, formula: Formula = None):
         """ Create a wrapper for a truth table. """
         self.formula = formula
         self.bindings = {}  # Existing bindings
         self.variables: list[str] = []  # List of variables
         self.results: list[tuple[list[bool], bool]] = []  # List of results: boolean assignments, result
+        self.packed_results: int | None = None  # Bit-parallel results: bit `i` is the result of row `i`
 
     def set_formula(self, formula: Formula):
         """ Set the formula to generate a truth table for. Return `self` for chaining. """
@@ -25,19 +34,42 @@ class TruthTable:
         """ Get the formula the truth table represents. """
         return self.formula
 
-    def generate(self):
-        """ Generate the truth table for the provided formula. Return `self` for chaining. """
-        self.variables = sorted([variable for variable in self.formula.get_variables()
-                                 if variable not in self.bindings])
+    def generate(self, bitwise=False, processes: int | None = None, prefix_variables: int | None = None, gray=False):
+        """ Generate the truth table for the provided formula. Return `self` for chaining.
+        `bitwise` - if True, evaluate every row at once over packed columns and store the result column in
+        `packed_results` rather than populating `results`.
+        `processes` - if given, generate in parallel using this many worker processes (0 for one per CPU), see
+        `generate_parallel`.
+        `gray` - if True, populate `results` incrementally, see `generate_gray`. """
+        self.find_variables()
         self.results.clear()
+        self.packed_results = None
+
+        if processes is not None:
+            self.generate_parallel(processes or os.cpu_count(), prefix_variables)
+
+            # Expand the packed results locally, rather than receiving rows from the workers
+            if not bitwise:
+                self.results = list(self.get_rows())
+                self.packed_results = None
+
+            return self
+
+        if bitwise:
+            return self.generate_bitwise()
+
+        if gray:
+            return self.generate_gray()
+
+        # Bindings are passed first, followed by the current assignment
+        function = self.formula.compile([*self.bindings.keys(), *self.variables])
+        bound = list(self.bindings.values())
 
         # Stores the current assignment
         state = [False] * len(self.variables)
 
         while True:
-            # Bind variables and calculate result
-            assignment = {**{self.variables[i]: state[i] for i in range(len(state))}, **self.bindings}
-            result = self.formula.eval(assignment)
+            result = function(*bound, *state)
             self.results.append((state[:], result))
 
             # Next Boolean iteration (boolean addition)
@@ -53,12 +85,142 @@ class TruthTable:
 
         return self
 
-    def print(self, true_symbol='T', false_symbol='F', result_symbol='φ'):
-        """ Print the generated truth table. """
+    def find_variables(self) -> list[str]:
+        """ Set and return the table's variables: the formula's unbound variables, sorted. """
+        self.variables = sorted([variable for variable in self.formula.get_variables()
+                                 if variable not in self.bindings])
+        return self.variables
+
+    def generate_bitwise(self):
+        """ Generate the truth table by evaluating the formula once over packed columns, where bit `i` of a column is
+        the value in row `i`. Return `self` for chaining. """
+        n = len(self.variables)
+        mask = (1 << (1 << n)) - 1
+
+        # Bound variables are constant columns
+        columns = {symbol: mask if value else 0 for symbol, value in self.bindings.items()}
+        for i, variable in enumerate(self.variables):
+            columns[variable] = TruthTable.column(i, n)
+
+        self.packed_results = self.formula.eval_bitwise(columns, mask)
+        return self
+
+    def generate_gray(self):
+        """ Generate the truth table by visiting the rows in Gray-code order, so one variable changes between rows and
+        only the sub-formulae depending on it are evaluated again (see `FlatFormula.iter_gray`). Suits wide formulae,
+        where each variable affects few sub-formulae. Return `self` for chaining. """
+        from logic.flat import FlatFormula
+
+        n = len(self.variables)
+        results: list[tuple[list[bool], bool] | None] = [None] * (1 << n)
+
+        for row, result in FlatFormula(self.formula).iter_gray(self.variables, self.bindings):
+            results[row] = ([bool(row >> (n - 1 - i) & 1) for i in range(n)], result)
+
+        self.results = results
+        return self
+
+    def generate_parallel(self, processes: int, prefix_variables: int | None = None):
+        """ Generate the packed results using a pool of worker processes. The rows are split into sub-cubes by
+        assignments to the first `prefix_variables` variables (by default, enough for several sub-cubes per process),
+        each evaluated as one block (see `evaluate_block`). Workers receive the formula once, when started, and return
+        each sub-cube's packed results, which are concatenated in order. Return `self` for chaining. """
+        n = len(self.variables)
+
+        if prefix_variables is None:
+            prefix_variables = (4 * processes - 1).bit_length()
+
+        prefix_variables = min(n, prefix_variables)
+        k = n - prefix_variables
+
+        # Sub-cubes are concatenated as whole bytes, so need at least 8 rows; smaller tables are evaluated directly
+        if k < 3:
+            self.packed_results = self.evaluate_block(0, n)
+            return self
+
+        size = (1 << k) // 8
+
+        with ProcessPoolExecutor(processes, initializer=init_worker,
+                                 initargs=(self.formula, self.bindings, self.variables)) as executor:
+            blocks = executor.map(evaluate_worker_block, range(1 << prefix_variables), [k] * (1 << prefix_variables))
+            self.packed_results = int.from_bytes(b''.join(block.to_bytes(size, 'little') for block in blocks), 'little')
 
-        if len(self.results) == 0:
+        return self
+
+    @staticmethod
+    def column(index: int, n: int) -> int:
+        """ Return the packed column of the `index`-th of `n` variables. The first variable is the most significant, so
+        a column is a repeating block of 0s then 1s, each run being half the block's length. """
+        period = 1 << (n - index)
+        half = period >> 1
+        block = ((1 << half) - 1) << half
+
+        # Repeat the block by multiplying with 0b...0001 0001 (one set bit every `period` bits)
+        rows = 1 << n
+        return block * (((1 << rows) - 1) // ((1 << period) - 1))
+
+    def evaluate_block(self, prefix: int, k: int) -> int:
+        """ Evaluate the rows `prefix << k` to `(prefix << k) + 2^k - 1` at once, i.e., the first `n - k` variables are
+        fixed by `prefix` and the last `k` variables are packed columns. Return the packed result column of the block. """
+        n = len(self.variables)
+        mask = (1 << (1 << k)) - 1
+
+        # Bound and prefix variables are constant columns
+        columns = {symbol: mask if value else 0 for symbol, value in self.bindings.items()}
+        for i in range(n - k):
+            columns[self.variables[i]] = mask if prefix >> (n - k - 1 - i) & 1 else 0
+
+        for i in range(k):
+            columns[self.variables[n - k + i]] = TruthTable.column(i, k)
+
+        return self.formula.eval_bitwise(columns, mask)
+
+    def iter_rows(self, only: bool | None = None) -> Iterator[tuple[list[bool], bool]]:
+        """ Lazily evaluate the truth table, yielding rows (assignment, result) in order, without storing them.
+        Blocks of rows are evaluated at once over packed columns, so memory use is constant.
+        `only` - if given, only yield rows whose result is this value. """
+        n = len(self.find_variables())
+        k = min(n, TruthTable.block_variables)
+
+        def rows():
+            # Assignments of the last k variables, shared by every block
+            suffixes = [[bool(j >> (k - 1 - i) & 1) for i in range(k)] for j in range(1 << k)]
+
+            for prefix in range(1 << (n - k)):
+                block = self.evaluate_block(prefix, k)
+                head = [bool(prefix >> (n - k - 1 - i) & 1) for i in range(n - k)]
+
+                # Iterate over the rows wanted: set bits of the block (or of its complement)
+                if only is not None:
+                    bits = block if only else block ^ ((1 << (1 << k)) - 1)
+                    while bits:
+                        low = bits & -bits
+                        bits ^= low
+                        yield head + suffixes[low.bit_length() - 1], only
+                else:
+                    for j in range(1 << k):
+                        yield head + suffixes[j], bool(block >> j & 1)
+
+        return rows()
+
+    def get_rows(self) -> Iterator[tuple[list[bool], bool]]:
+        """ Iterate over the generated rows (assignment, result), whichever way they were generated. """
+        if self.packed_results is None:
+            yield from self.results
             return
 
+        n = len(self.variables)
+        for row in range(1 << n):
+            assignment = [bool(row >> (n - 1 - i) & 1) for i in range(n)]
+            yield assignment, bool(self.packed_results >> row & 1)
+
+    def print(self, true_symbol='T', false_symbol='F', result_symbol='φ',
+              rows: Iterable[tuple[list[bool], bool]] | None = None):
+        """ Print the truth table. `rows` - rows to print, e.g., from `iter_rows`. Defaults to the generated rows, or
+        streams every row if the table has not been generated. """
+        if rows is None:
+            rows = self.iter_rows() if len(self.results) == 0 and self.packed_results is None else self.get_rows()
+
         # Max length of true/false symbols
         max_tf_len = max(len(true_symbol), len(false_symbol))
 
@@ -74,7 +236,7 @@ class TruthTable:
 
         print('||-' + '-' * max_tf_len + '-|')
 
-        for assignment, result in self.results:
+        for assignment, result in rows:
             assignment_info = [(self.variables[i], assignment[i]) for i in range(len(assignment))]
             for i, (symbol, boolean) in enumerate([*self.bindings.items(), *assignment_info]):
                 print('| ' + str(true_symbol if boolean else false_symbol).center(max(max_tf_len, len(
@@ -82,3 +244,40 @@ class TruthTable:
 
             print('|| ' + str(true_symbol if result else false_symbol).center(max(max_tf_len, len(
                 result_symbol))) + ' |')
+
+    def export_csv(self, file: TextIO, true_symbol='T', false_symbol='F', result_symbol='φ',
+                   rows: Iterable[tuple[list[bool], bool]] | None = None):
+        """ Write the truth table to a CSV file, one row at a time. `rows` - see `print`. """
+        if rows is None:
+            rows = self.iter_rows() if len(self.results) == 0 and self.packed_results is None else self.get_rows()
+
+        writer = csv.writer(file)
+        writer.writerow([*self.bindings.keys(), *self.variables, result_symbol])
+
+        bound = [true_symbol if value else false_symbol for value in self.bindings.values()]
+        for assignment, result in rows:
+            writer.writerow([*bound, *(true_symbol if value else false_symbol for value in assignment),
+                             true_symbol if result else false_symbol])
+
+    def save(self, path: str, block_variables=20):
+        """ Write the truth table to a bit-packed file, which may be reopened via `TruthTableFile`. The table is
+        evaluated in blocks of `2^block_variables` rows, so need not be generated first. """
+        from logic.truth_table_file import TruthTableFile
+        TruthTableFile.write(self, path, block_variables)
+
+
+# Truth table evaluated by a worker process of `TruthTable.generate_parallel`
+worker_table: TruthTable | None = None
+
+
+def init_worker(formula: Formula, bindings: dict[str, bool], variables: list[str]):
+    """ Initialise a worker process with the table to evaluate. """
+    global worker_table
+    worker_table = TruthTable(formula)
+    worker_table.bindings = bindings
+    worker_table.variables = variables
+
+
+def evaluate_worker_block(prefix: int, k: int) -> int:
+    """ Evaluate a sub-cube of the worker's table, see `TruthTable.evaluate_block`. """
+    return worker_table.evaluate_block(prefix, k)
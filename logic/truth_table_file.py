@@ -0,0 +1,129 @@
+from __future__ import annotations
+import json
+import mmap
+import struct
+from typing import Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from logic.truth_table import TruthTable
+
+
+class TruthTableFile:
+    """ Truth table stored on disk as a result column of 2^n bits, opened via `mmap` so rows are looked up without
+    loading the table.
+
+    Format: magic, version and header length (see `header_format`), then a UTF-8 JSON header (variables in order,
+    bindings, formula), padded to a multiple of 8 bytes, then the results: row `i` is bit `i % 8` of byte `i // 8`.
+    As in `TruthTable`, the first variable is the most significant bit of the row index. """
+
+    magic = b'LGTT'
+    version = 1
+    header_format = '<4sBI'
+    chunk_size = 1 << 20  # Bytes read at once when scanning the results
+
+    def __init__(self, path: str):
+        """ Open a truth table file written by `TruthTable.save`. """
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, length = struct.unpack_from(TruthTableFile.header_format, self.data)
+        if magic != TruthTableFile.magic or version != TruthTableFile.version:
+            self.close()
+            raise ValueError(f"not a truth table file: {path}")
+
+        start = struct.calcsize(TruthTableFile.header_format)
+        header = json.loads(self.data[start:start + length].decode('utf-8'))
+        self.variables: list[str] = header['variables']
+        self.bindings: dict[str, bool] = header['bindings']
+        self.formula: str = header['formula']
+        self.rows = 1 << len(self.variables)
+        self.offset = TruthTableFile.get_data_offset(length)
+
+    @staticmethod
+    def get_data_offset(header_length: int) -> int:
+        """ Offset of the results, given the JSON header's length. """
+        return (struct.calcsize(TruthTableFile.header_format) + header_length + 7) // 8 * 8
+
+    @staticmethod
+    def write(table: TruthTable, path: str, block_variables=20):
+        """ Evaluate the table's formula and write it to a file, `2^block_variables` rows at a time (see
+        `TruthTable.evaluate_block`). """
+        n = len(table.find_variables())
+        header = json.dumps({
+            'variables': table.variables,
+            'bindings': table.bindings,
+            'formula': str(table.formula),
+        }).encode('utf-8')
+
+        # Blocks are written as whole bytes, so have at least 8 rows per block unless the table is smaller
+        k = min(n, max(block_variables, 3))
+        block_bytes = max(1, (1 << k) // 8)
+
+        with open(path, 'wb') as file:
+            file.write(struct.pack(TruthTableFile.header_format, TruthTableFile.magic, TruthTableFile.version,
+                                   len(header)))
+            file.write(header)
+            file.write(b'\0' * (TruthTableFile.get_data_offset(len(header)) - file.tell()))
+
+            for prefix in range(1 << (n - k)):
+                file.write(table.evaluate_block(prefix, k).to_bytes(block_bytes, 'little'))
+
+    def get(self, row: int) -> bool:
+        """ Return the result of the given row. """
+        if not 0 <= row < self.rows:
+            raise IndexError(f"row {row} out of range")
+
+        return bool(self.data[self.offset + (row >> 3)] >> (row & 7) & 1)
+
+    def get_row_index(self, assignment: dict[str, bool]) -> int:
+        """ Return the index of the row of the given assignment to the table's variables. """
+        row = 0
+        for variable in self.variables:
+            row = row << 1 | assignment[variable]
+
+        return row
+
+    def get_assignment(self, row: int) -> list[bool]:
+        """ Return the assignment (in order of variables) of the given row. """
+        n = len(self.variables)
+        return [bool(row >> (n - 1 - i) & 1) for i in range(n)]
+
+    def lookup(self, assignment: dict[str, bool]) -> bool:
+        """ Return the result under the given assignment to the table's variables. """
+        return self.get(self.get_row_index(assignment))
+
+    def iter_chunks(self) -> Iterator[tuple[int, int]]:
+        """ Iterate over (first row, packed results) of consecutive chunks of the results. """
+        size = (self.rows + 7) // 8
+
+        for start in range(0, size, TruthTableFile.chunk_size):
+            chunk = int.from_bytes(self.data[self.offset + start:self.offset + min(size, start + TruthTableFile.chunk_size)],
+                                   'little')
+
+            # Tables of fewer than 8 rows share their byte with padding
+            if self.rows < 8:
+                chunk &= (1 << self.rows) - 1
+
+            yield start * 8, chunk
+
+    def count_true(self) -> int:
+        """ Return the number of rows whose result is true. """
+        return sum(chunk.bit_count() for _, chunk in self.iter_chunks())
+
+    def iter_minterms(self) -> Iterator[int]:
+        """ Iterate over the indices of rows whose result is true, in order. """
+        for start, chunk in self.iter_chunks():
+            while chunk:
+                low = chunk & -chunk
+                chunk ^= low
+                yield start + low.bit_length() - 1
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,55 @@
+import itertools
+import random
+
+from logic.formula import Formula
+from logic.generalised_operators import GeneralisedConjunction, GeneralisedDisjunction
+from logic.literals import Symbol, Top, Bottom
+from logic.operators import AndOperator, NandOperator, OrOperator, NorOperator, ImpliesOperator, NotImpliesOperator, \
+    ReverseImpliesOperator, ReverseNotImpliesOperator, EqualityOperator, NonEqualityOperator, Negation
+
+binary_operators = [AndOperator, NandOperator, OrOperator, NorOperator, ImpliesOperator, NotImpliesOperator,
+                    ReverseImpliesOperator, ReverseNotImpliesOperator, EqualityOperator, NonEqualityOperator]
+
+
+def random_formula(rng: random.Random, depth: int, symbols: str = 'abcde', constants=True,
+                   operators: list[type] | None = None) -> Formula:
+    """ Return a random formula of at most the given depth over the given symbols, using every kind of node.
+    `operators` - binary operators to use (default: all). """
+    if depth == 0 or rng.random() < 0.2:
+        if constants and rng.random() < 0.1:
+            return rng.choice([Top(), Bottom()])
+
+        return Symbol(rng.choice(symbols))
+
+    choice = rng.random()
+    if choice < 0.15:
+        return Negation(random_formula(rng, depth - 1, symbols, constants, operators))
+
+    if choice < 0.3:
+        operator = rng.choice([GeneralisedConjunction, GeneralisedDisjunction])
+        return operator(*(random_formula(rng, depth - 1, symbols, constants, operators)
+                          for _ in range(rng.randint(0, 3))))
+
+    return rng.choice(operators or binary_operators)(random_formula(rng, depth - 1, symbols, constants, operators),
+                                                     random_formula(rng, depth - 1, symbols, constants, operators))
+
+
+def random_formulae(seed: int, count: int, depth: int, symbols: str = 'abcde', constants=True,
+                    operators: list[type] | None = None) -> list[Formula]:
+    rng = random.Random(seed)
+    return [random_formula(rng, depth, symbols, constants, operators) for _ in range(count)]
+
+
+def assignments(variables: list[str]) -> list[dict[str, bool]]:
+    """ Return every assignment of the given variables, in truth table order (the first variable is most
+    significant). """
+    return [dict(zip(variables, values)) for values in itertools.product([False, True], repeat=len(variables))]
+
+
+def truth_table(formula: Formula, variables: list[str] | None = None) -> list[bool]:
+    """ Return the formula's value under each assignment of the given variables (default: its sorted variables), by
+    evaluating it row by row. """
+    if variables is None:
+        variables = sorted(formula.get_variables())
+
+    return [formula.eval(symbols) for symbols in assignments(variables)]
@@ -0,0 +1,106 @@
+import pytest
+
+from logic.bdd import BDD
+from logic.generalised_operators import GeneralisedDisjunction
+from logic.literals import Symbol
+from logic.operators import AndOperator
+from tests.formulae import random_formulae, assignments, truth_table
+
+variables = list('abcde')
+formulae = random_formulae(4, 200, 5)
+
+
+def check(function, table: list[bool]):
+    """ Check the function against the truth table over `variables`. """
+    assert [function.eval(symbols) for symbols in assignments(variables)] == table
+    assert function.count_models() == sum(table)
+    assert function.is_true() == all(table) and function.is_false() == (not any(table))
+
+    model = function.get_model()
+    if model is None:
+        assert not any(table)
+    else:
+        assert all(function.eval({**symbols, **model}) for symbols in assignments(variables))
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_from_formula(formula):
+    function = BDD(variables).from_formula(formula)
+    table = truth_table(formula, variables)
+    check(function, table)
+    assert truth_table(function.to_formula(), variables) == table
+
+
+@pytest.mark.parametrize('a, b', list(zip(formulae[:100], formulae[100:])), ids=str)
+def test_operations(a, b):
+    manager = BDD(variables)
+    f, g = manager.from_formula(a), manager.from_formula(b)
+    x, y = truth_table(a, variables), truth_table(b, variables)
+
+    check(f & g, [p and q for p, q in zip(x, y)])
+    check(f | g, [p or q for p, q in zip(x, y)])
+    check(f ^ g, [p != q for p, q in zip(x, y)])
+    check(~f, [not p for p in x])
+
+    # Reduced ordered BDDs are canonical
+    assert (f == g) == (x == y)
+
+
+def test_sift(monkeypatch):
+    """ Functions keep their values after garbage collection and reordering. """
+    monkeypatch.setattr(BDD, 'gc_threshold', 16)
+    manager = BDD(variables)
+    functions = [(manager.from_formula(formula), truth_table(formula, variables)) for formula in formulae]
+    assert manager.collections > 0
+
+    # Half of the functions die, and their nodes are collected when sifting
+    functions = functions[::2]
+
+    manager.sift()
+    assert sorted(manager.get_order()) == variables
+    for function, table in functions:
+        check(function, table)
+
+    # Sifting only ever shrinks the BDD
+    size = manager.size
+    manager.sift()
+    assert manager.size <= size
+    for function, table in functions:
+        check(function, table)
+
+
+def test_sift_interleaved():
+    """ The BDD of a1 = b1 ∧ a2 = b2 ∧ ... is exponential in the order a1, a2, ..., b1, b2, ... and linear once sifted
+    so that each ai is next to bi. """
+    n = 6
+    names = [f'a{i}' for i in range(n)] + [f'b{i}' for i in range(n)]
+    manager = BDD(names)
+    function = manager.constant(True)
+    for i in range(n):
+        function = function & ~(manager.variable(f'a{i}') ^ manager.variable(f'b{i}'))
+
+    manager.collect_garbage()
+    before = manager.size
+    manager.sift()
+    assert manager.size == 3 * n < before
+    assert function.count_models() == 1 << n
+
+
+def test_deep():
+    """ Formulae deeper than the recursion limit, and BDDs with more levels than it, are built without recursion. Each
+    symbol of the chain is above the previous ones in the order, so building is linear, but negating and combining
+    the results visits every level. """
+    n = 1500
+    symbols = [Symbol(f'x{n - i:04}') for i in range(n)]
+    chain = symbols[0]
+    for symbol in symbols[1:]:
+        chain = AndOperator(chain, symbol)
+
+    manager = BDD()
+    conjunction = manager.from_formula(chain)
+    assert conjunction.count_models() == 1 and conjunction.get_model() == {symbol.symbol: True for symbol in symbols}
+
+    disjunction = manager.from_formula(GeneralisedDisjunction(*symbols))
+    assert (~disjunction).count_models() == 1
+    assert (conjunction & ~disjunction).is_false() and (conjunction | ~disjunction).count_models() == 2
+    assert (conjunction ^ disjunction).eval({symbol.symbol: symbol is symbols[0] for symbol in symbols})
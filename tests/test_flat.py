@@ -0,0 +1,42 @@
+import pytest
+
+from logic.flat import FlatFormula
+from tests.formulae import random_formulae, assignments, truth_table
+
+formulae = random_formulae(10, 200, 6)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_eval(formula):
+    flat = FlatFormula(formula)
+    variables = sorted(formula.get_variables())
+    table = truth_table(formula, variables)
+
+    assert [flat.eval(symbols) for symbols in assignments(variables)] == table
+    assert flat.get_truth_table(variables) == sum(result << row for row, result in enumerate(table))
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_iter_gray(formula):
+    """ Rows are visited in Gray-code order, over extra variables too, with the other variables fixed. """
+    flat = FlatFormula(formula)
+    variables = sorted(formula.get_variables() - {'a'}) + ['z']
+    rows = list(flat.iter_gray(variables, {'a': True}))
+
+    assert sorted(row for row, _ in rows) == list(range(1 << len(variables)))
+    assert all((row ^ next_row).bit_count() == 1 for (row, _), (next_row, _) in zip(rows, rows[1:]))
+    assert [result for _, result in sorted(rows)] == [formula.eval({**symbols, 'a': True})
+                                                      for symbols in assignments(variables)]
+
+
+def test_iter_gray_missing():
+    formula = next(formula for formula in formulae if len(formula.get_variables()) > 1)
+    with pytest.raises(ValueError):
+        next(FlatFormula(formula).iter_gray(sorted(formula.get_variables())[1:]))
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_to_formula(formula):
+    flat = FlatFormula(formula)
+    assert flat.to_formula() is formula
+    assert len(flat) == len(formula.post_order())
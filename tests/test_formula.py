@@ -0,0 +1,143 @@
+import copy
+import pickle
+
+import pytest
+
+from logic.literals import Symbol, Top, Bottom
+from logic.operators import AndOperator, NonEqualityOperator, Negation
+from logic.truth_table import TruthTable
+from tests.formulae import random_formulae, assignments, truth_table
+
+formulae = random_formulae(12, 300, 6)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_compile(formula):
+    variables = sorted(formula.get_variables())
+    table = truth_table(formula, variables)
+    assert [formula.compile()(*symbols.values()) for symbols in assignments(variables)] == table
+
+    # Other orders, taking extra variables
+    order = ['z', *variables[::-1]]
+    function = formula.compile(order)
+    bitmask = formula.compile(order, True)
+    for symbols in assignments(order):
+        mask = sum(symbols[variable] << i for i, variable in enumerate(order))
+        assert function(*(symbols[variable] for variable in order)) == bitmask(mask) == formula.eval(symbols)
+
+
+def test_compile_missing():
+    formula = next(formula for formula in formulae if formula.get_variables())
+    with pytest.raises(ValueError):
+        formula.compile(sorted(formula.get_variables())[1:])
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_interned(formula):
+    """ Copies, and formulae built again from the same parts, are the same object. """
+    assert pickle.loads(pickle.dumps(formula)) is formula
+    assert copy.deepcopy(formula) is formula
+    assert formula.__class__(*formula.get_arguments()) is formula
+    assert formula.equals(formula.__class__(*formula.get_arguments()))
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_eval_bitwise(formula):
+    variables = sorted(formula.get_variables())
+    n = len(variables)
+    columns = {variable: TruthTable.column(i, n) for i, variable in enumerate(variables)}
+    packed = formula.eval_bitwise(columns, (1 << (1 << n)) - 1)
+    assert [bool(packed >> row & 1) for row in range(1 << n)] == truth_table(formula, variables)
+
+
+@pytest.mark.parametrize('formula, replacement', list(zip(formulae[:150], formulae[150:])), ids=str)
+def test_substitute(formula, replacement):
+    substituted = formula.substitute('a', replacement)
+    variables = sorted(formula.get_variables() | replacement.get_variables())
+    for symbols in assignments(variables):
+        assert substituted.eval(symbols) == formula.eval({**symbols, 'a': replacement.eval(symbols)})
+
+
+def test_deep():
+    """ Traversals are iterative, so formulae may be deeper than the recursion limit. """
+    n = 5000
+    formula = Symbol('x0')
+    for i in range(1, n):
+        formula = NonEqualityOperator(formula, Symbol(f'x{i}'))
+
+    symbols = {f'x{i}': i % 3 == 0 for i in range(n)}
+    assert formula.eval(symbols) == (sum(symbols.values()) % 2 == 1)
+    assert formula.eval_bitwise({symbol: int(value) for symbol, value in symbols.items()}, 1) == \
+           sum(symbols.values()) % 2
+    assert str(formula).count('≠') == n - 1
+    assert formula.substitute('x0', Negation(Symbol('x0'))).eval(symbols) != formula.eval(symbols)
+    assert formula.simplify().eval(symbols) == formula.eval(symbols)
+
+
+@pytest.mark.parametrize('formula', formulae[:20], ids=str)
+def test_immutable(formula):
+    """ Nodes have no instance dictionary, and fields may not be changed once constructed. """
+    assert not hasattr(formula, '__dict__')
+    with pytest.raises(AttributeError):
+        formula.extra = None
+
+    slots = [slot for cls in formula.__class__.__mro__ for slot in getattr(cls, '__slots__', ())]
+    for slot in slots:
+        if hasattr(formula, slot) and slot != '__weakref__':
+            with pytest.raises(AttributeError):
+                setattr(formula, slot, None)
+
+            with pytest.raises(AttributeError):
+                delattr(formula, slot)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_get_variables(formula):
+    symbols = {node.symbol for node in formula.post_order() if isinstance(node, Symbol)}
+
+    # Cached variables of sub-formulae are reused
+    for child in formula.get_children()[:1]:
+        child.get_variables()
+
+    assert formula.get_variables() == symbols
+    for variable in 'abcdef':
+        assert formula.depends_on(variable) == (variable in symbols)
+
+        # A formula's value cannot depend on a variable not occurring in it
+        if variable not in symbols:
+            variables = sorted(symbols)
+            assert all(formula.eval({**row, variable: False}) == formula.eval({**row, variable: True})
+                       for row in assignments(variables))
+
+
+def test_get_variables_cached():
+    """ Variables are cached on the formula asked, not on each of its sub-formulae. """
+    formula = Symbol('w0')
+    for i in range(1, 100):
+        formula = NonEqualityOperator(formula, Symbol(f'w{i}'))
+
+    assert formula.depends_on('w0') and not formula.depends_on('y')
+    assert len(formula.get_variables()) == 100
+    assert not any(hasattr(node, '_variables') for node in formula.post_order() if node is not formula)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_simplify(formula):
+    simplified = formula.simplify()
+    variables = sorted(formula.get_variables())
+    assert simplified.get_variables() <= set(variables)
+    assert truth_table(simplified, variables) == truth_table(formula, variables)
+
+    # Simplification reaches a fixpoint, and constant sub-formulae are folded
+    assert simplified.simplify() is simplified
+    assert formula.eval_const() is None or isinstance(simplified, (Top, Bottom))
+
+
+def test_pickle_deep():
+    """ Formulae deeper than the recursion limit may be pickled, e.g., to send them to worker processes. """
+    formula = Symbol('x0')
+    for i in range(1, 5000):
+        formula = AndOperator(formula, Symbol(f'x{i % 10}'))
+
+    assert pickle.loads(pickle.dumps(formula)) is formula
+    assert copy.deepcopy(formula) is formula
@@ -0,0 +1,63 @@
+import pytest
+
+from logic.generalised_operators import GeneralisedConjunction
+from logic.minimizer import Minimizer
+from logic.operators import Negation
+from logic.truth_table import TruthTable
+from tests.formulae import random_formulae, truth_table
+
+variables = list('abcde')
+formulae = random_formulae(6, 200, 5)
+
+
+def is_implicant(term: GeneralisedConjunction, ones: list[bool], dont_cares: list[bool]) -> bool:
+    """ Return whether the term is only true on rows which are true or don't care. """
+    return all(one or dont_care or not value
+               for one, dont_care, value in zip(ones, dont_cares, truth_table(term, variables)))
+
+
+def check_prime(term: GeneralisedConjunction, ones: list[bool], dont_cares: list[bool]):
+    """ Check that the term is an implicant, but would not be with any literal removed. """
+    literals = list(term)
+    assert is_implicant(term, ones, dont_cares)
+    for i in range(len(literals)):
+        assert not is_implicant(GeneralisedConjunction(*literals[:i], *literals[i + 1:]), ones, dont_cares)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_from_formula(formula):
+    minimizer = Minimizer.from_formula(formula, variables=variables)
+    table = truth_table(formula, variables)
+    assert truth_table(minimizer.disjunctive_normal_form(), variables) == table
+    assert truth_table(minimizer.conjunctive_normal_form(), variables) == table
+
+    for term in minimizer.disjunctive_normal_form():
+        check_prime(term, table, [False] * len(table))
+
+
+@pytest.mark.parametrize('formula, dont_care', list(zip(formulae[:100], formulae[100:])), ids=str)
+def test_dont_cares(formula, dont_care):
+    minimizer = Minimizer.from_formula(formula, dont_care, variables)
+    table, dont_cares = truth_table(formula, variables), truth_table(dont_care, variables)
+
+    for normal_form in (minimizer.disjunctive_normal_form(), minimizer.conjunctive_normal_form()):
+        assert all(dont_care or value == result
+                   for dont_care, value, result in zip(dont_cares, table, truth_table(normal_form, variables)))
+
+    for term in minimizer.disjunctive_normal_form():
+        check_prime(term, table, dont_cares)
+
+    # Clauses of the CNF are negations of prime implicants of the complement
+    zeros = [not value and not dont_care for value, dont_care in zip(table, dont_cares)]
+    for clause in minimizer.conjunctive_normal_form():
+        check_prime(GeneralisedConjunction(*(literal.data if isinstance(literal, Negation) else Negation(literal)
+                                              for literal in clause)), zeros, dont_cares)
+
+
+@pytest.mark.parametrize('bitwise', [False, True])
+@pytest.mark.parametrize('formula', formulae[:50], ids=str)
+def test_from_truth_table(formula, bitwise):
+    table = TruthTable(formula)
+    table.generate(bitwise)
+    minimizer = Minimizer.from_truth_table(table)
+    assert truth_table(minimizer.disjunctive_normal_form(), table.variables) == truth_table(formula, table.variables)
@@ -0,0 +1,53 @@
+from fractions import Fraction
+
+import pytest
+
+from logic.generalised_operators import GeneralisedConjunction
+from logic.literals import Symbol
+from logic.model_counter import ModelCounter, count_models, get_model_fraction
+from logic.operators import AndOperator, NonEqualityOperator, OrOperator
+from tests.formulae import random_formulae, assignments, truth_table
+
+formulae = random_formulae(7, 300, 6)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_count_models(formula):
+    table = truth_table(formula)
+    assert count_models(formula) == sum(table)
+    assert get_model_fraction(formula) == Fraction(sum(table), len(table))
+
+
+@pytest.mark.parametrize('formula', formulae[:100], ids=str)
+def test_bindings(formula):
+    bindings = {'a': False, 'b': True}
+    variables = sorted(formula.get_variables() - bindings.keys())
+    assert count_models(formula, bindings) == sum(formula.eval({**symbols, **bindings})
+                                                  for symbols in assignments(variables))
+
+
+def test_components():
+    """ Independent parts are counted separately and multiplied. """
+    parts = [OrOperator(Symbol(f'a{i}'), Symbol(f'b{i}')) for i in range(40)]
+    assert count_models(GeneralisedConjunction(*parts)) == 3 ** 40
+
+
+def test_deep_chain():
+    """ Deep formulae are encoded and counted without recursion. """
+    n = 2000
+    formula = Symbol('x0')
+    for i in range(1, n):
+        formula = NonEqualityOperator(formula, Symbol(f'x{i}'))
+
+    assert count_models(formula) == 1 << (n - 1)
+
+
+def test_reuse():
+    """ A counter may count several formulae, keeping its cache, and only counts each formula's own variables. """
+    counter = ModelCounter()
+    for formula in formulae[:100]:
+        assert counter.count_formula(formula) == sum(truth_table(formula))
+
+    a, b, c, d = map(Symbol, 'abcd')
+    assert counter.count_formula(AndOperator(a, b)) == 1
+    assert counter.count_formula(OrOperator(c, d)) == 3
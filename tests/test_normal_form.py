@@ -0,0 +1,90 @@
+import pytest
+
+from logic.formula import Formula
+from logic.generalised_operators import GeneralisedConjunction, GeneralisedDisjunction
+from logic.literals import Symbol
+from logic.normal_form import NormalForm, TseitinEncoder
+from logic.operators import NonEqualityOperator, Negation
+from logic.sat import is_satisfiable
+from tests.formulae import random_formulae, assignments, truth_table
+
+formulae = random_formulae(8, 200, 6)
+
+
+def is_literal(formula: Formula) -> bool:
+    return isinstance(formula, Symbol) or isinstance(formula, Negation) and isinstance(formula.data, Symbol)
+
+
+def check_equivalent(normal_form: Formula, formula: Formula):
+    """ Check the normal form against the formula's truth table, over the formula's variables, as the normal form may
+    lack those the formula does not depend on. """
+    variables = sorted(formula.get_variables())
+    assert normal_form.get_variables() <= set(variables)
+    assert truth_table(normal_form, variables) == truth_table(formula, variables)
+
+
+def extend(symbols: dict[str, bool], definitions: dict) -> dict[str, bool]:
+    """ Extend an assignment with the value of each auxiliary symbol's sub-formula. """
+    return {**symbols, **{symbol.symbol: formula.eval(symbols) for symbol, formula in definitions.items()}}
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_tseitin(formula):
+    """ Full equivalences hold exactly when auxiliary symbols take the values of their sub-formulae, so the encoding is
+    true under each such extension of a row exactly when the formula is. """
+    encoded, definitions = NormalForm.tseitin_conjunctive_normal_form(formula, False)
+    for symbols in assignments(sorted(formula.get_variables())):
+        assert encoded.eval(extend(symbols, definitions)) == formula.eval(symbols)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_plaisted_greenbaum(formula):
+    """ Implications are weaker than equivalences, but the encoding remains satisfiable under a row exactly when the
+    formula is true. """
+    encoded, definitions = NormalForm.tseitin_conjunctive_normal_form(formula)
+    for symbols in assignments(sorted(formula.get_variables())):
+        value = formula.eval(symbols)
+        if value:
+            assert encoded.eval(extend(symbols, definitions))
+
+        assert is_satisfiable(encoded, symbols) == value
+
+
+def test_encoder_incremental():
+    """ Formulae encoded by one encoder share the definitions of common sub-formulae. """
+    encoder = TseitinEncoder(reserved=set('abcde'))
+    for formula in formulae[:20]:
+        encoder.encode(formula)
+
+    variables = sorted(set().union(*(formula.get_variables() for formula in formulae[:20])))
+    for symbols in assignments(variables):
+        expected = all(formula.eval(symbols) for formula in formulae[:20])
+        assert is_satisfiable(encoder.get_formula(), symbols) == expected
+
+
+def test_deep():
+    """ Deep formulae are encoded without recursion. """
+    formula = Symbol('x0')
+    for i in range(1, 5000):
+        formula = NonEqualityOperator(formula, Symbol(f'x{i}'))
+
+    encoded, definitions = NormalForm.tseitin_conjunctive_normal_form(formula)
+    assert len(definitions) == 4999
+
+
+@pytest.mark.parametrize('formula', formulae[:100], ids=str)
+def test_conjunctive_normal_form(formula):
+    cnf = NormalForm.conjunctive_normal_form(formula)
+    assert isinstance(cnf, GeneralisedConjunction)
+    assert all(isinstance(clause, GeneralisedDisjunction) and all(is_literal(literal) for literal in clause)
+               for clause in cnf)
+    check_equivalent(cnf, formula)
+
+
+@pytest.mark.parametrize('formula', formulae[:100], ids=str)
+def test_disjunctive_normal_form(formula):
+    dnf = NormalForm.disjunctive_normal_form(formula)
+    assert isinstance(dnf, GeneralisedDisjunction)
+    assert all(isinstance(term, GeneralisedConjunction) and all(is_literal(literal) for literal in term)
+               for term in dnf)
+    check_equivalent(dnf, formula)
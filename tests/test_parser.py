@@ -0,0 +1,152 @@
+import os
+import random
+
+import pytest
+
+from logic.formula import Formula
+from logic.generalised_operators import GeneralisedConjunction, GeneralisedDisjunction
+from logic.literals import Symbol, Top, Bottom
+from logic.operators import AndOperator, OrOperator, ImpliesOperator, ReverseImpliesOperator, EqualityOperator, \
+    NonEqualityOperator, Negation
+from logic import parser
+from logic.parser import Parser, ParseError
+from tests.formulae import random_formulae
+
+# Each parsed operator and its spellings
+spellings = {
+    AndOperator: ['&', '.', '^'],
+    OrOperator: ['|', '+'],
+    ImpliesOperator: ['->'],
+    ReverseImpliesOperator: ['<-'],
+    EqualityOperator: ['='],
+    NonEqualityOperator: ['(+)'],
+}
+
+formulae = random_formulae(13, 300, 5, operators=list(spellings))
+
+
+def to_source(formula: Formula, rng: random.Random) -> str:
+    """ Write the formula in the parser's syntax, spelling operators and constants at random and adding spaces at
+    random wherever the parser allows them: around operators and commas, inside brackets, and between a negation and
+    a literal. """
+    def space() -> str:
+        return rng.choice(['', ' ', '  '])
+
+    if isinstance(formula, Symbol):
+        return formula.symbol
+
+    if isinstance(formula, Top):
+        return rng.choice(['⊤', 'T', '1'])
+
+    if isinstance(formula, Bottom):
+        return rng.choice(['⊥', 'F', '0'])
+
+    if isinstance(formula, Negation):
+        operand = to_source(formula.data, rng)
+        negation = rng.choice(['!', '¬', '~'])
+        return negation + (space() if operand[0] not in '!¬~([<' else '') + operand
+
+    if isinstance(formula, (GeneralisedConjunction, GeneralisedDisjunction)):
+        open_tag, close_tag = ('<', '>') if isinstance(formula, GeneralisedConjunction) else ('[', ']')
+        parts = [to_source(part, rng) for part in formula]
+        return open_tag + space() + (space() + ',' + space()).join(parts) + space() + close_tag
+
+    return '(' + space() + to_source(formula.left, rng) + space() + rng.choice(spellings[formula.__class__]) + \
+        space() + to_source(formula.right, rng) + space() + ')'
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_round_trip(formula):
+    """ Parsing a formula's source gives the same interned formula. """
+    rng = random.Random(str(formula))
+    for _ in range(5):
+        ok, parsed = Parser().parse(to_source(formula, rng) + rng.choice(['', ' ']))
+        assert ok and parsed is formula
+
+
+a, b = Symbol('a'), Symbol('b')
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('a & b', AndOperator(a, b)),
+    (' a&b ', AndOperator(a, b)),
+    ('a  &  b', AndOperator(a, b)),
+    ('¬ a', Negation(a)),
+    ('( a )', a),
+    ('a & ¬ b', AndOperator(a, Negation(b))),
+    ('[ a , b ]', GeneralisedDisjunction(a, b)),
+    ('< a, b >', GeneralisedConjunction(a, b)),
+    ('a (+) b', NonEqualityOperator(a, b)),
+    ('T & F', AndOperator(Top(), Bottom())),
+    ('<>', GeneralisedConjunction()),
+], ids=str)
+def test_parse(source, expected):
+    ok, formula = Parser().parse(source)
+    assert ok and formula is expected
+
+
+@pytest.mark.parametrize('source, column', [
+    ('', 0),
+    ('  ', 2),
+    ('a b', 2),
+    ('a ¬b', 3),
+    ('(a) (b)', 4),
+    ('¬ (a & b)', 2),
+    ('¬ ¬ a', 2),
+    (' (a & b)', 1),
+    ('a  &  b)', 7),
+    ('a & (b', 6),
+    ('a - > b', 2),
+    ('[a,]', 3),
+])
+def test_errors(source, column):
+    """ Spaces are only skipped where the grammar allows them, and errors are reported at their column in the
+    input. """
+    ok, error = Parser().parse(source)
+    assert not ok and isinstance(error, ParseError) and error.column == column
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+def test_parse_file(processes, tmp_path):
+    """ Formulae are parsed one per line, in order, skipping blank lines, whether in this process or by workers. """
+    rng = random.Random(processes)
+    lines = []
+    for formula in formulae:
+        lines.append(to_source(formula, rng))
+        if rng.random() < 0.1:
+            lines.append(rng.choice(['', '  ', 'a b']))
+
+    path = tmp_path / 'formulae.txt'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    results = list(Parser.parse_file(str(path), processes, chunk_size=7))
+    assert [number for number, _, _ in results] == [number for number, line in enumerate(lines, 1) if line.strip()]
+
+    parsed = iter(formulae)
+    for number, ok, result in results:
+        if lines[number - 1] == 'a b':
+            assert not ok and result.line == number
+        else:
+            assert ok and result is next(parsed)
+
+
+def exit_worker(lines):
+    """ Stand-in for `parse_lines` whose worker process dies. """
+    os._exit(1)
+
+
+@pytest.mark.parametrize('fail', [False, True])
+def test_parse_many_deep(fail, monkeypatch):
+    """ Lines nested deeper than the recursion limit are sent back from workers, and chunks whose worker died are
+    parsed in this process, without losing any line. """
+    if fail:
+        monkeypatch.setattr(parser, 'parse_lines', exit_worker)
+
+    deep = '(' * 4999 + 'a' + ' & b)' * 4999
+    lines = [to_source(formula, random.Random(0)) for formula in formulae[:20]] + [deep, 'a b']
+    results = list(Parser.parse_many(lines, 1, chunk_size=3))
+
+    assert [number for number, _, _ in results] == list(range(1, len(lines) + 1))
+    assert [result for _, _, result in results[:20]] == formulae[:20]
+    assert results[20][1] and results[20][2] is Parser().parse(deep)[1]
+    assert not results[21][1] and results[21][2].line == 22
@@ -0,0 +1,70 @@
+import pytest
+
+from logic.generalised_operators import GeneralisedConjunction, GeneralisedDisjunction
+from logic.literals import Symbol
+from logic.operators import Negation, OrOperator, ImpliesOperator, EqualityOperator, NonEqualityOperator
+from logic.resolution import Resolution
+from tests.formulae import random_formulae, truth_table
+
+
+def get_literals(clause: GeneralisedDisjunction) -> set[tuple[str, bool]]:
+    return {(literal.data.symbol, False) if isinstance(literal, Negation) else (literal.symbol, True)
+            for literal in clause}
+
+
+def check_proof(resolution: Resolution):
+    """ Check that each step resolves its parents on a complementary pair of literals. """
+    for resolvent, left, right in resolution.get_proof():
+        resolvent, left, right = get_literals(resolvent), get_literals(left), get_literals(right)
+        assert any((symbol, not value) in right and
+                   resolvent == (left - {(symbol, value)}) | (right - {(symbol, not value)}) for symbol, value in left)
+
+
+formulae = random_formulae(2, 300, 4)
+axioms = [formula for formula in random_formulae(3, 100, 3) if any(truth_table(formula))]
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_prove(formula):
+    resolution = Resolution()
+    assert resolution.prove(formula) == all(truth_table(formula))
+    check_proof(resolution)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_refute(formula):
+    resolution = Resolution()
+    status = resolution.refute(formula)
+    assert status == (Resolution.SATURATION if any(truth_table(formula)) else Resolution.PROOF)
+    check_proof(resolution)
+
+
+@pytest.mark.parametrize('axiom', axioms, ids=str)
+def test_entailment(axiom):
+    """ One prover answers several goals from the same axioms. """
+    resolution = Resolution(axiom)
+    for goal in formulae[:20]:
+        variables = sorted(axiom.get_variables() | goal.get_variables())
+        expected = all(not premise or conclusion
+                       for premise, conclusion in zip(truth_table(axiom, variables), truth_table(goal, variables)))
+        assert resolution.prove(goal) == expected
+
+
+def test_limit():
+    a, b = Symbol('a'), Symbol('b')
+    resolution = Resolution(limit=1)
+    assert resolution.prove(OrOperator(EqualityOperator(a, b), NonEqualityOperator(a, b))) is None
+    assert resolution.status == Resolution.LIMIT
+
+
+def test_chain():
+    symbols = [Symbol(f'a{i}') for i in range(6)]
+    resolution = Resolution(GeneralisedConjunction(*(ImpliesOperator(a, b) for a, b in zip(symbols, symbols[1:]))))
+    assert resolution.prove(ImpliesOperator(symbols[0], symbols[-1]))
+
+    proof = resolution.get_proof()
+    assert len(proof) >= len(symbols) - 1 and len(proof[-1][0]) == 0
+    check_proof(resolution)
+
+    assert not resolution.prove(ImpliesOperator(symbols[-1], symbols[0]))
+    assert resolution.get_proof() == []
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from logic.normal_form import NormalForm
+from logic.generalised_operators import GeneralisedConjunction, GeneralisedDisjunction
+from logic.literals import Symbol
+from logic.operators import Negation
+from logic.sat import Solver, is_satisfiable, is_tautology, get_model, equivalent, entails
+from tests.formulae import random_formulae, assignments, truth_table
+
+formulae = random_formulae(0, 300, 5)
+pairs = list(zip(formulae[:150], formulae[150:]))
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_satisfiable(formula):
+    table = truth_table(formula)
+    assert is_satisfiable(formula) == any(table)
+    assert is_tautology(formula) == all(table)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_model(formula):
+    model = get_model(formula)
+    if model is None:
+        assert not any(truth_table(formula))
+    else:
+        assert formula.eval({variable: model.get(variable, False) for variable in formula.get_variables()})
+
+
+@pytest.mark.parametrize('formula', formulae[:100], ids=str)
+def test_conjunctive_normal_form(formula):
+    """ Clauses of a formula in CNF are added directly rather than encoded. """
+    cnf = NormalForm.conjunctive_normal_form(formula)
+    assert Solver.get_clauses(cnf) is not None
+    assert is_satisfiable(cnf) == any(truth_table(formula))
+
+
+@pytest.mark.parametrize('formula', formulae[:100], ids=str)
+def test_assumptions(formula):
+    variables = sorted(formula.get_variables())
+    if not variables:
+        return
+
+    solver = Solver()
+    solver.add_formula(formula)
+    for value in (False, True):
+        bindings = {variables[0]: value}
+        expected = any(formula.eval({**symbols, **bindings}) for symbols in assignments(variables[1:]))
+        assert solver.solve(bindings) == expected
+        if expected:
+            assert solver.get_model()[variables[0]] == value
+
+
+@pytest.mark.parametrize('a, b', pairs, ids=str)
+def test_equivalent(a, b):
+    variables = sorted(a.get_variables() | b.get_variables())
+    same, counterexample = equivalent(a, b)
+    assert same == (truth_table(a, variables) == truth_table(b, variables))
+    if not same:
+        assert a.eval(counterexample) != b.eval(counterexample)
+
+
+@pytest.mark.parametrize('a, b', pairs, ids=str)
+def test_entails(a, b):
+    variables = sorted(a.get_variables() | b.get_variables())
+    holds, counterexample = entails(a, b)
+    assert holds == all(not x or y for x, y in zip(truth_table(a, variables), truth_table(b, variables)))
+    if not holds:
+        assert a.eval(counterexample) and not b.eval(counterexample)
+
+
+def test_incremental():
+    """ Formulae may be added between calls, and each call sees all of them. """
+    solver = Solver()
+    conjunction = []
+    for formula in formulae[:40]:
+        conjunction.append(formula)
+        solver.add_formula(formula)
+        expected = any(all(row) for row in zip(*(truth_table(f, list('abcde')) for f in conjunction)))
+        assert solver.solve() == expected
+        if not expected:
+            break
+
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_3_cnf(seed):
+    """ Random 3-CNF near the satisfiability threshold, which needs conflict analysis and learning. """
+    rng = random.Random(seed)
+    variables = [f'x{i}' for i in range(12)]
+    literals = [Symbol(variable) for variable in variables] + [Negation(Symbol(variable)) for variable in variables]
+    formula = GeneralisedConjunction(*(GeneralisedDisjunction(*rng.sample(literals, 3)) for _ in range(52)))
+
+    model = get_model(formula)
+    if model is None:
+        assert not any(truth_table(formula, variables))
+    else:
+        assert formula.eval({variable: model.get(variable, False) for variable in variables})
@@ -0,0 +1,32 @@
+import pytest
+
+from logic.symbol_table import SymbolTable
+from tests.formulae import random_formulae, assignments
+
+formulae = random_formulae(11, 200, 6)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_eval_assignment(formula):
+    """ Ids need not follow the formula's variables: the table may be shared, and have other variables. """
+    table = SymbolTable(['z', 'c'])
+    table.add_formula(formula)
+
+    for symbols in assignments(list(table)):
+        expected = formula.eval(symbols)
+        assert formula.eval_assignment(table.to_list(symbols), table) == expected
+        assert formula.eval_assignment(table.to_bitmask(symbols), table) == expected
+        assert table.from_bitmask(table.to_bitmask(symbols)) == symbols
+
+
+def test_add():
+    """ Adding a variable invalidates the compiled functions, which take every variable. """
+    formula = formulae[0]
+    table = SymbolTable.from_formula(formula)
+    function = table.get_function(formula)
+    assert table.get_function(formula) is function
+
+    table.add('z')
+    assert table.get_function(formula) is not function
+    for symbols in assignments(list(table)):
+        assert table.get_function(formula)(*table.to_list(symbols)) == formula.eval(symbols)
@@ -0,0 +1,42 @@
+import pytest
+
+from logic.algorithm import rank
+from logic.generalised_operators import GeneralisedConjunction
+from logic.literals import Symbol
+from logic.operators import AndOperator, OrOperator, Negation
+from logic.tableau import Tableau
+from tests.formulae import random_formulae, assignments, truth_table
+
+formulae = random_formulae(1, 300, 5)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_satisfiable(formula):
+    table = truth_table(formula)
+    assert Tableau.is_satisfiable(formula) == any(table)
+    assert Tableau.is_valid(formula) == all(table)
+
+
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_model(formula):
+    """ The literals of an open branch satisfy the formula, whatever the values of the other variables. """
+    tableau = Tableau(formula)
+    if not tableau.expand():
+        assert tableau.get_model() is None
+        return
+
+    model = tableau.get_model()
+    variables = sorted(formula.get_variables() - model.keys())
+    assert all(formula.eval({**symbols, **model}) for symbols in assignments(variables))
+
+
+def test_deep():
+    """ Ranks of deep beta formulae are computed without recursion. """
+    symbols = [Symbol(f'x{i}') for i in range(1500)]
+    chain = symbols[0]
+    for symbol in symbols[1:]:
+        chain = OrOperator(chain, symbol)
+
+    assert Tableau.is_satisfiable(chain)
+    assert not Tableau.is_satisfiable(AndOperator(chain, GeneralisedConjunction(*map(Negation, symbols))))
+    assert rank(chain) == len(symbols) - 1
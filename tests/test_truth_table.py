@@ -0,0 +1,67 @@
+import pytest
+
+from logic.formula import Formula
+from logic.truth_table import TruthTable
+from tests.formulae import random_formulae, assignments
+
+formulae = random_formulae(9, 200, 6, 'abcdefg')
+bindings = [{}, {'a': True}, {'b': False, 'd': True}]
+
+
+def expected_rows(formula: Formula, bound: dict[str, bool]) -> list[tuple[list[bool], bool]]:
+    """ Return the rows of the truth table of the formula, evaluated one by one. """
+    variables = sorted(formula.get_variables() - bound.keys())
+    return [(list(symbols.values()), formula.eval({**symbols, **bound})) for symbols in assignments(variables)]
+
+
+def make_table(formula: Formula, bound: dict[str, bool]) -> TruthTable:
+    table = TruthTable(formula)
+    table.set_bindings(bound)
+    return table
+
+
+@pytest.mark.parametrize('bound', bindings)
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_generate(formula, bound):
+    table = make_table(formula, bound).generate()
+    assert table.results == expected_rows(formula, bound)
+
+
+@pytest.mark.parametrize('bound', bindings)
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_bitwise(formula, bound):
+    table = make_table(formula, bound).generate(bitwise=True)
+    rows = expected_rows(formula, bound)
+    assert table.packed_results == sum(result << row for row, (_, result) in enumerate(rows))
+    assert list(table.get_rows()) == rows
+
+
+@pytest.mark.parametrize('block_variables', [0, 2, 12])
+@pytest.mark.parametrize('formula', formulae[:50], ids=str)
+def test_iter_rows(formula, block_variables, monkeypatch):
+    monkeypatch.setattr(TruthTable, 'block_variables', block_variables)
+    rows = expected_rows(formula, bindings[1])
+    table = make_table(formula, bindings[1])
+
+    assert list(table.iter_rows()) == rows
+    assert list(table.iter_rows(True)) == [row for row in rows if row[1]]
+    assert list(table.iter_rows(False)) == [row for row in rows if not row[1]]
+    assert table.results == []
+
+
+@pytest.mark.parametrize('prefix_variables', [None, 1, 3])
+@pytest.mark.parametrize('formula', [formula for formula in formulae if len(formula.get_variables()) == 7][:3], ids=str)
+def test_parallel(formula, prefix_variables):
+    """ Tables of 7 variables are split into sub-cubes of at least 8 rows, evaluated by workers. """
+    rows = expected_rows(formula, bindings[0])
+    table = make_table(formula, bindings[0])
+
+    assert table.generate(processes=2, prefix_variables=prefix_variables).results == rows
+    assert list(table.generate(True, 2, prefix_variables).get_rows()) == rows
+
+
+@pytest.mark.parametrize('bound', bindings)
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_gray(formula, bound):
+    table = make_table(formula, bound).generate(gray=True)
+    assert table.results == expected_rows(formula, bound)
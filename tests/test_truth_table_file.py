@@ -0,0 +1,64 @@
+import pytest
+
+from logic.truth_table import TruthTable
+from logic.truth_table_file import TruthTableFile
+from tests.formulae import random_formulae, assignments, truth_table
+
+formulae = random_formulae(5, 100, 6, 'abcdefgh')
+
+
+@pytest.mark.parametrize('block_variables', [0, 3, 20])
+@pytest.mark.parametrize('formula', formulae, ids=str)
+def test_save(formula, block_variables, tmp_path):
+    path = tmp_path / 'table.lgtt'
+    TruthTable(formula).save(str(path), block_variables)
+    variables = sorted(formula.get_variables())
+    table = truth_table(formula, variables)
+
+    with TruthTableFile(str(path)) as file:
+        assert file.variables == variables and file.rows == len(table)
+        assert [file.get(row) for row in range(file.rows)] == table
+        assert [file.lookup(symbols) for symbols in assignments(variables)] == table
+        assert [file.get_assignment(row) for row in range(file.rows)] == \
+               [list(symbols.values()) for symbols in assignments(variables)]
+        assert file.count_true() == sum(table)
+        assert list(file.iter_minterms()) == [row for row, result in enumerate(table) if result]
+
+        with pytest.raises(IndexError):
+            file.get(file.rows)
+
+
+@pytest.mark.parametrize('formula', formulae[:20], ids=str)
+def test_bindings(formula, tmp_path):
+    path = tmp_path / 'table.lgtt'
+    bindings = {'a': True, 'c': False}
+    table = TruthTable(formula)
+    table.set_bindings(bindings)
+    table.save(str(path), 3)
+    variables = sorted(formula.get_variables() - bindings.keys())
+
+    with TruthTableFile(str(path)) as file:
+        assert file.variables == variables and file.bindings == bindings
+        assert [file.lookup(symbols) for symbols in assignments(variables)] == \
+               [formula.eval({**symbols, **bindings}) for symbols in assignments(variables)]
+
+
+@pytest.mark.parametrize('formula', formulae[:20], ids=str)
+def test_chunks(formula, tmp_path, monkeypatch):
+    """ Results are scanned in chunks of whole bytes. """
+    monkeypatch.setattr(TruthTableFile, 'chunk_size', 1)
+    path = tmp_path / 'table.lgtt'
+    TruthTable(formula).save(str(path), 3)
+    table = truth_table(formula)
+
+    with TruthTableFile(str(path)) as file:
+        assert file.count_true() == sum(table)
+        assert list(file.iter_minterms()) == [row for row, result in enumerate(table) if result]
+
+
+def test_not_a_table(tmp_path):
+    path = tmp_path / 'table.lgtt'
+    path.write_bytes(b'\0' * 64)
+
+    with pytest.raises(ValueError):
+        TruthTableFile(str(path))